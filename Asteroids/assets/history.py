@@ -0,0 +1,81 @@
+"""
+Recent asteroid positions, for lag compensated hit tests.
+A remote player sees the world, and presses fire, a few ticks before the host hears about it,
+so their shots are judged against the asteroids as they were then. AsteroidHistory keeps the
+center and model space bounds of every asteroid for the last few ticks in NumPy arrays, which
+double when a tick has more asteroids than they hold; the frame of a tick is found with one
+modulo, and a frame is sorted by asteroid ID, so looking up where a group of asteroids were is a
+binary search. An asteroid never turns, so its bounds moved to a center are where it was.
+"""
+
+import numpy as np
+
+# AsteroidHistory is a ring of per-tick frames of asteroid IDs, centers and model space bounds.
+class AsteroidHistory:
+    def __init__(self, ticks=32, capacity=64):
+        """
+        :param ticks: How many of the latest ticks are kept.
+        :param capacity: Asteroid rows allocated per tick up front; the arrays double whenever a tick has more.
+        """
+        self.ticks = ticks
+        self.capacity = capacity
+        self.stamps = np.full(ticks, -1, dtype=np.int64)  # Tick held in each slot, -1 when empty.
+        self.counts = np.zeros(ticks, dtype=np.int64)
+        self.ids = np.zeros((ticks, capacity), dtype=np.int64)
+        self.positions = np.zeros((ticks, capacity, 2))
+        self.bounds = np.zeros((ticks, capacity, 4))  # left, top, right, bottom, around the center.
+
+    def grow(self, capacity):
+        """Reallocate the per-tick arrays with room for capacity asteroids, keeping the frames kept so far."""
+        for name in ("ids", "positions", "bounds"):
+            array = getattr(self, name)
+            grown = np.zeros((self.ticks, capacity) + array.shape[2:], dtype=array.dtype)
+            grown[:, :self.capacity] = array
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def record(self, tick, asteroids):
+        """
+        Keep the asteroids as they are at the end of a tick.
+        :param asteroids: The asteroid records of Asteroids.asteroids.
+        """
+        slot = tick % self.ticks
+        n = len(asteroids)
+        if n > self.capacity:
+            self.grow(max(n, 2*self.capacity))
+        ids = np.fromiter((asteroid[7] for asteroid in asteroids), dtype=np.int64, count=n)
+        positions = np.array([asteroid[0].center for asteroid in asteroids], dtype=float).reshape(-1, 2)
+        bounds = np.array([asteroid[0]._bounds for asteroid in asteroids], dtype=float).reshape(-1, 4)
+        order = np.argsort(ids)
+        self.ids[slot, :n] = ids[order]
+        self.positions[slot, :n] = positions[order]
+        self.bounds[slot, :n] = bounds[order]
+        self.counts[slot] = n
+        self.stamps[slot] = tick
+
+    def frame(self, tick):
+        """
+        The asteroids at the end of a tick.
+        :return: (IDs, centers, model space bounds) sorted by ID, or None if the tick is not kept.
+        """
+        slot = tick % self.ticks
+        if self.stamps[slot] != tick:
+            return None
+        n = self.counts[slot]
+        return self.ids[slot, :n], self.positions[slot, :n], self.bounds[slot, :n]
+
+    def lookup(self, tick, ids):
+        """
+        Rows of a frame that hold a group of asteroids.
+        :param ids: Asteroid IDs, shape (n,).
+        :return: (rows, found), where found marks the asteroids that were in the frame;
+                 or None if the tick is not kept.
+        """
+        frame = self.frame(tick)
+        if frame is None:
+            return None
+        frame_ids = frame[0]
+        if not len(frame_ids):
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+        rows = np.minimum(np.searchsorted(frame_ids, ids), len(frame_ids) - 1)
+        return rows, frame_ids[rows] == ids
\ No newline at end of file
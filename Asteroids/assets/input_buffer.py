@@ -0,0 +1,123 @@
+from collections import namedtuple
+
+# One coalesced command per device per simulation tick. tilt is the time-weighted mean
+# angle over the tick, thrust and fire are the latest button states, packets counts how
+# many packets were played out during the tick.
+Command = namedtuple("Command", ["tilt", "thrust", "fire", "packets"])
+
+# InputBuffer is a jitter buffer for one remote controller.
+# The network thread push()es packets into a fixed ring and the game loop coalesce()s them once
+# per tick. Only push() moves the write count and only coalesce() moves the read count, so the
+# two threads share the ring without a lock.
+# Each packet is played out at its sender timestamp plus a fixed delay, so packets that arrive
+# in bursts are spread back out to the rate they were sent at.
+class InputBuffer:
+    def __init__(self, playout_delay=0.05, capacity=32):
+        """
+        :param playout_delay: Seconds each packet is held back after the earliest it could have arrived.
+                              Larger values hide more jitter at the cost of latency.
+        :param capacity: Ring slots; up to capacity - 1 packets are kept between two ticks.
+        """
+        self.playout_delay = playout_delay
+        self.capacity = capacity
+        self.ring = [None] * capacity
+        self.written = 0  # Packets pushed so far; only the network thread writes it.
+        self.read = 0  # Packets taken from the ring so far; only the game loop writes it.
+        self.last_arrival = float("-inf")  # Arrival time of the newest packet, for timeouts.
+
+        # Played out state, owned by the game loop.
+        self.pending = []  # Packets taken from the ring but not yet due, oldest first.
+        self.angle = 0.0  # Tilt held since the last played out packet.
+        self.thrust = False
+        self.fire = False
+        self.cursor = None  # Time up to which the tilt has been integrated.
+        self.sequence = None  # Sequence number of the last played out packet.
+
+        # Statistics.
+        self.offset = None  # Smallest arrival time minus sender time seen, the best case transit.
+        self.transit = None  # Transit of the previous packet, for the jitter estimate.
+        self.jitter = 0.0  # Interarrival jitter in seconds, as defined in RFC 3550.
+        self.delay = 0.0  # Average seconds packets arrived after the best case transit.
+        self.received = 0
+        self.lost = 0  # Gaps in the sequence numbers.
+        self.late = 0  # Packets that arrived after their playout time.
+        self.dropped = 0  # Duplicates, packets older than one already played, and ring overflows.
+
+    def push(self, arrival, sequence, timestamp, angle, thrust, fire):
+        """
+        Add a packet; called from the network thread.
+        :param arrival: Local time.monotonic() the packet arrived at.
+        :param sequence: Sender's sequence number, or None if the packet has none.
+        :param timestamp: Sender's clock in seconds, or None to use the arrival time.
+        """
+        self.ring[self.written % self.capacity] = (arrival, sequence, timestamp, angle, thrust, fire)
+        self.last_arrival = arrival
+        self.written += 1
+
+    def _drain(self):
+        """Move new packets from the ring into the pending list and update the statistics."""
+        written = self.written  # Read once: push() may go on writing while the ring is drained.
+        # The slot push() writes next holds the oldest packet of a full ring, so only the newest
+        # capacity - 1 packets are safe to read; older ones are, or may be being, overwritten.
+        if written - self.read >= self.capacity:
+            self.dropped += written - self.read - (self.capacity - 1)  # The network thread lapped us.
+            self.read = written - (self.capacity - 1)
+        for i in range(self.read, written):
+            arrival, sequence, timestamp, angle, thrust, fire = self.ring[i % self.capacity]
+            if sequence is not None and self.sequence is not None and sequence + self.capacity < self.sequence:
+                # Far behind what was already played: the controller restarted its counters.
+                self.sequence = self.offset = self.transit = None
+            if timestamp is None:
+                timestamp = arrival
+            transit = arrival - timestamp
+            if self.offset is None or transit < self.offset:
+                self.offset = transit
+            if self.transit is not None:
+                self.jitter += (abs(transit - self.transit) - self.jitter) / 16
+            self.transit = transit
+            self.delay += (transit - self.offset - self.delay) / 16
+            self.received += 1
+            self.pending.append((timestamp + self.offset + self.playout_delay, sequence, arrival,
+                                 angle, thrust, fire))
+        self.read = written
+        self.pending.sort(key=lambda packet: packet[0])
+
+    def coalesce(self, now):
+        """
+        Play out every packet due by now and fold them into one command.
+        :param now: Current time.monotonic().
+        :return: Command for the time since the previous call.
+        """
+        self._drain()
+        start = self.cursor if self.cursor is not None else now
+        integral, released = 0.0, 0
+        while self.pending and self.pending[0][0] <= now:
+            due, sequence, arrival, angle, thrust, fire = self.pending.pop(0)
+            if sequence is not None and self.sequence is not None:
+                if sequence <= self.sequence:
+                    self.dropped += 1  # Duplicate, or reordered behind a packet already played.
+                    continue
+                self.lost += sequence - self.sequence - 1
+            if arrival > due:
+                self.late += 1
+            # The previous tilt was held until this packet's playout time.
+            due = min(max(due, start), now)
+            if self.cursor is not None:
+                integral += self.angle * (due - max(self.cursor, start))
+            self.cursor = due
+            self.angle, self.thrust, self.fire = angle, thrust, fire
+            self.sequence = sequence if sequence is not None else self.sequence
+            released += 1
+        if self.cursor is not None:
+            integral += self.angle * (now - max(self.cursor, start))
+        self.cursor = now
+        tilt = integral / (now - start) if now > start else self.angle
+        return Command(tilt, self.thrust, self.fire, released)
+
+    def stats(self):
+        """
+        Latency and jitter of the packets so far, with times in milliseconds.
+        latency is the playout delay plus how late packets arrived on average compared to the best case.
+        """
+        return {"received": self.received, "lost": self.lost, "late": self.late, "dropped": self.dropped,
+                "jitter_ms": 1000 * self.jitter, "latency_ms": 1000 * (self.delay + self.playout_delay)}
@@ -0,0 +1,205 @@
+"""
+Area of interest management: which entities each player needs to be told about.
+Every update the positions of all ships, asteroids and bullets are gathered into one NumPy array
+and sorted by their cell in a wrapping grid. The entities in the cells around every viewer's ship
+are then expanded into (viewer, entity) pairs and measured all at once, so the work per viewer
+follows how crowded its neighbourhood is rather than how many entities the whole world holds.
+Interest sets are kept as one sorted array of pair codes, and only turned back into keys for the
+events and for the viewers whose entities are asked for.
+Entities are keyed by (kind, id) with the kinds used by assets.snapshots: ("ships", device_id),
+("asteroids", asteroid id) and ("bullets", bullet id).
+"""
+
+from collections import namedtuple
+from math import ceil
+import numpy as np
+
+# Keys that came into and went out of one viewer's area of interest during an update.
+InterestEvents = namedtuple("InterestEvents", ["entered", "left"])
+
+# An entity's code is its ID (for ships, a number given to the device) shifted left by KIND_BITS
+# with its kind in the low bits. A pair's code is the viewer's number shifted left by VIEWER_SHIFT
+# with the entity's code in the low bits, so sorting pairs groups them by viewer.
+SHIP, ASTEROID, BULLET = 0, 1, 2
+KIND_NAMES = ("ships", "asteroids", "bullets")  # Indexed by kind.
+KIND_BITS = 2
+KIND_MASK = (1 << KIND_BITS) - 1
+VIEWER_SHIFT = 40
+ENTITY_MASK = (1 << VIEWER_SHIFT) - 1
+
+def contains(ordered, codes):
+    """Mask of the codes that are in a sorted array of codes."""
+    if not len(ordered):
+        return np.zeros(len(codes), dtype=bool)
+    return ordered[np.minimum(np.searchsorted(ordered, codes), len(ordered) - 1)] == codes
+
+# InterestManager keeps the set of relevant entities of every viewer from tick to tick.
+class InterestManager:
+    def __init__(self, width, height, radius=200, margin=30, leaders=5, cell_size=80):
+        """
+        :param width: Width of the wrapping play area.
+        :param height: Height of the wrapping play area.
+        :param radius: Entities whose center is within this many pixels of a viewer's ship
+                       (on each axis, across the screen edges) enter its area of interest.
+        :param margin: Extra distance an entity may drift before it leaves again, so entities on the
+                       border do not enter and leave on alternate ticks.
+        :param leaders: The ships with the highest scores are relevant to everyone, for the leaderboard.
+        :param cell_size: Approximate side length of a grid cell.
+        """
+        self.width, self.height = width, height
+        self.radius = radius
+        self.margin = margin
+        self.leaders = leaders
+        # A whole number of cells on each axis, so wrapping lines up exactly.
+        self.columns = max(1, ceil(width / cell_size))
+        self.rows = max(1, ceil(height / cell_size))
+        self.cell_width = width / self.columns
+        self.cell_height = height / self.rows
+        self.numbers = {}  # device_id -> number, of the ships and viewers seen recently.
+        self.next_number = 0  # Numbers are never reused, so old pairs cannot name a new device.
+        self.keys = {}  # Entity code -> key, of every entity in the last update.
+        self.codes = np.zeros(0, dtype=np.int64)  # Sorted codes of the entities in keys.
+        self.pairs = np.zeros(0, dtype=np.int64)  # Sorted pair codes of every viewer's relevant entities.
+
+    def _number(self, device_id):
+        number = self.numbers.get(device_id)
+        if number is None:
+            number = self.numbers[device_id] = self.next_number
+            self.next_number += 1
+        return number
+
+    def _cells(self, positions):
+        """Wrapped grid column and row of each of an array of positions."""
+        columns = (positions[:, 0] // self.cell_width).astype(np.intp) % self.columns
+        rows = (positions[:, 1] // self.cell_height).astype(np.intp) % self.rows
+        return columns, rows
+
+    @staticmethod
+    def _around(centers, reach, cell, count):
+        """
+        Wrapped cells on one axis that can hold entities within reach of each of an array of
+        coordinates, each cell once.
+        :return: Cell indices, shape (coordinates, cells).
+        """
+        span = ceil(2 * reach / cell) + 1
+        if span >= count:
+            return np.broadcast_to(np.arange(count), (len(centers), count))
+        return (np.floor((centers - reach) / cell).astype(np.intp)[:, None] + np.arange(span)) % count
+
+    def relevant(self, viewer):
+        """
+        Keys of the entities relevant to a viewer after the last update.
+        :return: List of (kind, id) keys; empty for a viewer the last update did not cover.
+        """
+        number = self.numbers.get(viewer)
+        if number is None:
+            return []
+        first, last = np.searchsorted(self.pairs, [number << VIEWER_SHIFT, (number + 1) << VIEWER_SHIFT]).tolist()
+        return [self.keys[code] for code in (self.pairs[first:last] & ENTITY_MASK).tolist()]
+
+    def update(self, game, viewers=None):
+        """
+        Gather the entities of the game and work out each viewer's relevant entities.
+        :param game: Asteroids_Game to read the entities from.
+        :param viewers: Device IDs to compute interest sets for; defaults to every player.
+        :return: dict of device_id -> InterestEvents since the previous update.
+        """
+        players = game.players
+        asteroids = game.asteroids.asteroids
+        pool = game.bullets.bullets
+        if viewers is None:
+            viewers = list(players)
+        codes = np.concatenate((
+            np.array([self._number(device_id) for device_id in players], dtype=np.int64) << KIND_BITS | SHIP,
+            np.array([asteroid[7] for asteroid in asteroids], dtype=np.int64) << KIND_BITS | ASTEROID,
+            pool.ids[:pool.count].astype(np.int64) << KIND_BITS | BULLET))
+        # Keys are made once per entity, not every update; those of entities that are gone are
+        # kept until the events are out.
+        ordered = np.sort(codes)
+        new = np.flatnonzero(~contains(self.codes, codes))
+        device_ids = list(players)
+        for index, code in zip(new.tolist(), codes[new].tolist()):
+            kind = code & KIND_MASK
+            self.keys[code] = ("ships", device_ids[index]) if kind == SHIP else (KIND_NAMES[kind], code >> KIND_BITS)
+        gone = self.codes[~contains(ordered, self.codes)]
+        self.codes = ordered
+        ship_rows = np.fromiter((player.row for player in players.values()), dtype=np.intp, count=len(players))
+        size = np.array([self.width, self.height], dtype=float)
+        positions = np.concatenate((game.ships.center[ship_rows],
+                                    np.array([asteroid[0].center for asteroid in asteroids],
+                                             dtype=float).reshape(-1, 2),
+                                    pool.positions)) % size  # Asteroids may be partly off the screen.
+
+        # Entities sorted by cell, with where each cell's run starts and how long it is.
+        columns, rows = self._cells(positions)
+        cells = rows * self.columns + columns
+        order = np.argsort(cells, kind="stable")
+        starts = np.searchsorted(cells[order], np.arange(self.columns * self.rows))
+        sizes = np.bincount(cells, minlength=self.columns * self.rows)
+
+        viewer_numbers = np.array([self._number(viewer) for viewer in viewers], dtype=np.int64)
+        present = [viewer for viewer in viewers if viewer in players]
+        present_numbers = np.array([self.numbers[viewer] for viewer in present], dtype=np.int64)
+        centers = game.ships.center[np.fromiter((players[viewer].row for viewer in present), dtype=np.intp,
+                                                count=len(present))] % size
+
+        # The cells around each viewer, shape (viewers, cells), and every entity in them as one
+        # (viewer, entity) pair, in viewer order.
+        reach = self.radius + self.margin
+        around = (self._around(centers[:, 1], reach, self.cell_height, self.rows)[:, :, None] * self.columns +
+                  self._around(centers[:, 0], reach, self.cell_width, self.columns)[:, None, :]
+                  ).reshape(len(present), -1)
+        counts = sizes[around].ravel()
+        first = np.repeat(starts[around].ravel() - (np.cumsum(counts) - counts), counts)
+        entities = order[first + np.arange(counts.sum())]
+        pair_viewers = np.repeat(np.arange(len(present)), counts.reshape(len(present), -1).sum(axis=1))
+
+        # Distance on each axis the short way round; both ends are inside the area.
+        offsets = np.abs(positions.take(entities, axis=0) - centers.take(pair_viewers, axis=0))
+        np.minimum(offsets, size - offsets, out=offsets)
+        distance = np.maximum(offsets[:, 0], offsets[:, 1])
+        pairs = present_numbers.take(pair_viewers) << VIEWER_SHIFT | codes.take(entities)
+        inside = distance <= self.radius
+        border = pairs[~inside & (distance <= reach)]
+
+        # The previous pairs of the viewers asked for; those of any other viewer are forgotten.
+        previous = self.pairs[contains(np.sort(viewer_numbers), self.pairs >> VIEWER_SHIFT)]
+        border.sort()
+        leaders = np.array([self._number(device_id) for device_id, score in game.leaderboard.top(self.leaders)],
+                           dtype=np.int64) << KIND_BITS | SHIP
+        current = np.sort(np.concatenate((
+            pairs[inside],
+            border[contains(previous, border)],  # Entities already known stay until they pass the margin.
+            present_numbers << VIEWER_SHIFT | present_numbers << KIND_BITS | SHIP,
+            (viewer_numbers[:, None] << VIEWER_SHIFT | leaders).ravel())))
+        # A viewer's own ship and the leaders may also be near it.
+        self.pairs = current[np.concatenate(([True], current[1:] != current[:-1]))]
+
+        # Merging the two sorted arrays puts a pair in both next to itself; of the others, those from
+        # the new pairs entered and those from the previous ones left. Both stay sorted, so each
+        # viewer's entered and left pairs are one slice of each.
+        both = np.concatenate((previous, self.pairs))
+        order = np.argsort(both, kind="stable")
+        merged = both[order]
+        kept = np.zeros(len(merged), dtype=bool)
+        kept[1:] = merged[1:] == merged[:-1]
+        kept[:-1] |= kept[1:]
+        fresh = order >= len(previous)
+        entered = merged[~kept & fresh]
+        left = merged[~kept & ~fresh]
+        bounds = np.stack((viewer_numbers << VIEWER_SHIFT, (viewer_numbers + 1) << VIEWER_SHIFT), axis=1)
+        entered_bounds = np.searchsorted(entered, bounds).tolist()
+        left_bounds = np.searchsorted(left, bounds).tolist()
+        keys = self.keys
+        entered = [keys[code] for code in (entered & ENTITY_MASK).tolist()]
+        left = [keys[code] for code in (left & ENTITY_MASK).tolist()]
+        events = {viewer: InterestEvents(set(entered[a:b]), set(left[c:d]))
+                  for viewer, (a, b), (c, d) in zip(viewers, entered_bounds, left_bounds)}
+        for code in gone.tolist():
+            del keys[code]
+        # Devices that have stopped playing and viewing are forgotten once they make up half the numbers.
+        if len(self.numbers) > 2 * (len(players) + len(viewers)):
+            viewing = set(viewers)
+            self.numbers = {device_id: number for device_id, number in self.numbers.items()
+                            if device_id in players or device_id in viewing}
+        return events
@@ -1,9 +1,10 @@
 import pygame
 
-pygame.font.init()
-
 class Label:
-    def __init__(self, font=pygame.font.SysFont("comicsansms", 15), text="", position: tuple=(0, 0), color=(0, 0, 0)):
+    def __init__(self, font=None, text="", position: tuple=(0, 0), color=(0, 0, 0)):
+        if font is None:
+            pygame.font.init()
+            font = pygame.font.SysFont("comicsansms", 15)
         self.text = font.render(text, True, color)
         self.position = position
     def draw(self, surface: pygame.Surface):
@@ -21,9 +22,9 @@ class Button:
     def draw(self, surface: pygame.Surface):
         mouse_position = pygame.mouse.get_pos()
         if self.rect.collidepoint(mouse_position):
-            surface.blit(self.icon_true, self.position)
+            return surface.blit(self.icon_true, self.position)
         else:
-            surface.blit(self.icon_false, self.position)
+            return surface.blit(self.icon_false, self.position)
     def execute(self, event: int=None):
         mouse_position = pygame.mouse.get_pos()
         if isinstance(event, int): 
@@ -0,0 +1,84 @@
+"""
+Leaderboard kept in score order as scores change.
+Reading the top of the table or a player's rank no longer needs every player sorted each frame.
+"""
+
+from bisect import bisect_left, insort
+
+# Leaderboard keeps one (-score, join order, device_id) entry per player in a sorted list.
+# A score change moves a single entry: a binary search finds it and its new place, so the
+# work per change does not grow with the number of players beyond shifting list items.
+# Equal scores stay in the order the players joined, as sorting the players dict did.
+class Leaderboard:
+    def __init__(self):
+        self.entries = []  # Sorted (-score, join order, device_id).
+        self.keys = {}  # device_id -> its entry in entries.
+        self.joined = 0  # Join order given to the next player.
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, device_id):
+        return device_id in self.keys
+
+    def add(self, device_id, score=0):
+        """Add a player, or set its score if it is already on the board."""
+        if device_id in self.keys:
+            self.update(device_id, score)
+            return
+        entry = self.keys[device_id] = (-score, self.joined, device_id)
+        self.joined += 1
+        insort(self.entries, entry)
+
+    def remove(self, device_id):
+        entry = self.keys.pop(device_id, None)
+        if entry is not None:
+            del self.entries[bisect_left(self.entries, entry)]
+
+    def update(self, device_id, score):
+        """
+        Record a player's new score.
+        :param device_id: Player whose score changed; unknown players are added.
+        """
+        entry = self.keys.get(device_id)
+        if entry is None:
+            self.add(device_id, score)
+            return
+        if -entry[0] == score:
+            return
+        del self.entries[bisect_left(self.entries, entry)]
+        entry = self.keys[device_id] = (-score, entry[1], device_id)
+        insort(self.entries, entry)
+
+    def score(self, device_id):
+        return -self.keys[device_id][0]
+
+    def rank(self, device_id):
+        """Position of a player on the board, 1 for the leader."""
+        return bisect_left(self.entries, self.keys[device_id]) + 1
+
+    def top(self, count):
+        """
+        The highest scoring players, best first.
+        :return: List of (device_id, score).
+        """
+        return [(device_id, -score) for score, joined, device_id in self.entries[:count]]
+
+    def ranking(self):
+        """Every player on the board, best first, as (device_id, score), e.g. for remote displays."""
+        return self.top(len(self.entries))
+
+    def sync(self, players):
+        """
+        Rebuild the board from a dict of device_id -> Player, after scores were changed directly.
+        Players keep their join order; new ones join in the dict's order.
+        """
+        for device_id in [device_id for device_id in self.keys if device_id not in players]:
+            del self.keys[device_id]
+        for device_id, player in players.items():
+            entry = self.keys.get(device_id)
+            if entry is None:
+                entry = (None, self.joined, device_id)
+                self.joined += 1
+            self.keys[device_id] = (-player.score, entry[1], device_id)
+        self.entries = sorted(self.keys.values())
@@ -0,0 +1,245 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections import namedtuple
+from assets.packets import PACKET, THRUST, FIRE, encode, decode_buffer, device_name, device_index
+from assets.input_buffer import InputBuffer
+
+# Latest state reported by one controller. angle is the tilt (about -15 to 15),
+# thrust and fire are the primary and secondary buttons, received is a time.monotonic() stamp.
+# sequence and timestamp come from binary packets and are None for JSON ones.
+ControllerInput = namedtuple("ControllerInput", ["angle", "thrust", "fire", "received", "sequence", "timestamp"],
+                             defaults=(None, None))
+
+def parse_packet(data):
+    """
+    Decode one JSON controller packet, the fallback to the binary format in assets.packets: an object such as
+    {"device_id": "device_1", "angle": 12.5, "thrust": true, "fire": false}.
+    :return: (device_id, angle, thrust, fire), or None if the packet is malformed.
+    """
+    try:
+        message = json.loads(data)
+        device_id = str(message["device_id"])
+        angle = float(message.get("angle", 0))
+        thrust = bool(message.get("thrust", False))
+        fire = bool(message.get("fire", False))
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+    if not device_id or angle != angle:  # Reject empty IDs and NaN tilts.
+        return None
+    return device_id, angle, thrust, fire
+
+def encode_packet(device_id, angle=0, thrust=False, fire=False):
+    """Encode a controller packet in the format parse_packet reads."""
+    return json.dumps({"device_id": device_id, "angle": angle, "thrust": thrust, "fire": fire}).encode()
+
+# Datagram protocol that writes every valid packet into the server's input table.
+class _ControllerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, address):
+        self.server.receive(data)
+
+# InputServer listens for controller packets on a background thread running an asyncio loop.
+# The network thread only ever replaces whole entries of a dict, and the game loop takes a
+# shallow copy once per tick, so the two threads never need a lock.
+# Every packet also goes into its device's InputBuffer, which the game loop turns into one
+# smoothed command per tick with commands().
+class InputServer:
+    def __init__(self, host="0.0.0.0", port=5005, tcp_port=None, max_devices=256, timeout=1.0,
+                 playout_delay=0.05):
+        """
+        :param host: Interface to listen on.
+        :param port: UDP port; 0 picks a free one (see address).
+        :param tcp_port: Optional TCP port taking newline separated packets, for networks that drop UDP.
+        :param max_devices: Packets from new devices are ignored once this many are known.
+        :param timeout: Seconds after which a silent controller is left out of snapshots and commands.
+        :param playout_delay: Seconds each device's jitter buffer holds packets back.
+        """
+        self.host, self.port, self.tcp_port = host, port, tcp_port
+        self.max_devices = max_devices
+        self.timeout = timeout
+        self.playout_delay = playout_delay
+        self.inputs = {}  # device_id -> ControllerInput, written only by the network thread.
+        self.buffers = {}  # device_id -> InputBuffer, created only by the network thread.
+        self.packets = 0  # Valid packets received.
+        self.dropped = 0  # Malformed packets and packets from devices over the limit.
+        self.address = None  # (host, port) actually bound, set once the server is running.
+        self._loop = None
+        self._stop = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def receive(self, data):
+        """
+        Parse a datagram and store each packet in it as its device's latest input.
+        A datagram holds either one JSON packet or any number of binary packets back to back.
+        """
+        received = time.monotonic()
+        if data.lstrip()[:1] == b"{":
+            packet = parse_packet(data)
+            if packet is None:
+                self.dropped += 1
+                return
+            device_id, angle, thrust, fire = packet
+            self.store(device_id, ControllerInput(angle, thrust, fire, received))
+            return
+
+        packets = decode_buffer(data)
+        self.dropped += -(-len(data) // PACKET.size) - len(packets)  # Invalid and partial packets.
+        for device, buttons, sequence, angle, timestamp in zip(
+                packets["device"].tolist(), packets["buttons"].tolist(), packets["sequence"].tolist(),
+                packets["angle"].tolist(), packets["timestamp"].tolist()):
+            self.store(device_name(device), ControllerInput(angle, bool(buttons & THRUST), bool(buttons & FIRE),
+                                                            received, sequence, timestamp))
+
+    def store(self, device_id, state):
+        """
+        Queue a controller's input in its jitter buffer, and keep it as the latest input
+        unless it is older than what is already held.
+        """
+        previous = self.inputs.get(device_id)
+        if previous is None and len(self.inputs) >= self.max_devices:
+            self.dropped += 1
+            return
+        buffer = self.buffers.get(device_id)
+        new = buffer is None
+        if new:
+            buffer = InputBuffer(self.playout_delay)
+        # The jitter buffer puts reordered packets back in order itself.
+        buffer.push(state.received, state.sequence,
+                    state.timestamp / 1000 if state.timestamp is not None else None,
+                    state.angle, state.thrust, state.fire)
+        if new:
+            # Only shared with the game loop once it holds a packet.
+            self.buffers[device_id] = buffer
+        if (previous is not None and state.sequence is not None and previous.sequence is not None
+              and state.sequence <= previous.sequence and state.received - previous.received < self.timeout):
+            self.dropped += 1  # Reordered or duplicated datagram.
+            return
+        self.inputs[device_id] = state
+        self.packets += 1
+
+    def snapshot(self):
+        """
+        Latest input of every controller heard from within the timeout.
+        Called by the game loop once per tick.
+        :return: dict of device_id -> ControllerInput.
+        """
+        inputs = self.inputs.copy()  # A single C call, so it cannot interleave with a write.
+        oldest = time.monotonic() - self.timeout
+        return {device_id: state for device_id, state in inputs.items() if state.received >= oldest}
+
+    def commands(self, now=None):
+        """
+        Coalesce each controller's packets into one command for the current tick.
+        Called by the game loop once per tick.
+        :param now: time.monotonic() of the tick; defaults to the current time.
+        :return: dict of device_id -> Command for every controller heard from within the timeout.
+        """
+        if now is None:
+            now = time.monotonic()
+        oldest = now - self.timeout
+        return {device_id: buffer.coalesce(now) for device_id, buffer in self.buffers.copy().items()
+                if buffer.last_arrival >= oldest}
+
+    def stats(self):
+        """Latency and jitter statistics of every controller; see InputBuffer.stats."""
+        return {device_id: buffer.stats() for device_id, buffer in self.buffers.copy().items()}
+
+    def forget(self, device_id):
+        """
+        Drop everything held for a controller, such as one that has timed out, so it no longer
+        counts towards max_devices. If it sends again it is treated as a new device.
+        Each entry is removed with a single pop, so this is safe to call from the game loop.
+        """
+        self.inputs.pop(device_id, None)
+        self.buffers.pop(device_id, None)
+
+    def latency(self, device_id):
+        """
+        How long after a controller's input was given it is played out, in seconds:
+        the playout delay plus how late its packets arrive on average. 0 for an unknown controller.
+        """
+        buffer = self.buffers.get(device_id)
+        return buffer.delay + buffer.playout_delay if buffer is not None else 0
+
+    def start(self):
+        """Start listening on a daemon thread and wait until the socket is bound."""
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),),
+                                        name="input-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self.address is None:
+            raise OSError(f"could not listen for controllers on {self.host}:{self.port}")
+        return self
+
+    def stop(self):
+        """Close the sockets and wait for the network thread to finish."""
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._thread.join()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        try:
+            transport, protocol = await self._loop.create_datagram_endpoint(
+                lambda: _ControllerProtocol(self), local_addr=(self.host, self.port))
+            tcp = None
+            if self.tcp_port is not None:
+                tcp = await asyncio.start_server(self._serve_stream, self.host, self.tcp_port)
+        except OSError:
+            self._ready.set()
+            return
+        self.address = transport.get_extra_info("sockname")[:2]
+        self._ready.set()
+        try:
+            await self._stop.wait()
+        finally:
+            transport.close()
+            if tcp is not None:
+                tcp.close()
+                await tcp.wait_closed()
+
+    async def _serve_stream(self, reader, writer):
+        # The stream carries newline separated JSON packets.
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.receive(line)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+# ControllerClient sends packets like a microcontroller would; used for loopback testing and load tests.
+class ControllerClient:
+    def __init__(self, address, device_id, binary=True):
+        """
+        :param address: (host, port) of the InputServer.
+        :param device_id: Identifier sent with every packet; binary packets need the "device_<index>" form.
+        :param binary: Send the binary format from assets.packets rather than JSON.
+        """
+        self.address = address
+        self.device_id = device_id
+        self.binary = binary
+        self.index = device_index(device_id) if binary else None
+        self.sequence = 0
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, angle=0, thrust=False, fire=False):
+        self.sequence += 1
+        if self.binary:
+            packet = encode(self.index, self.sequence, angle, thrust, fire, int(time.monotonic()*1000))
+        else:
+            packet = encode_packet(self.device_id, angle, thrust, fire)
+        self.socket.sendto(packet, self.address)
+
+    def close(self):
+        self.socket.close()
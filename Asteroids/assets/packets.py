@@ -0,0 +1,65 @@
+"""
+Binary wire format for controller packets.
+Every packet is 16 little-endian bytes:
+    version   uint8    PACKET_VERSION
+    buttons   uint8    THRUST and FIRE bits
+    device    uint16   device index, shown in game as "device_<index>"
+    sequence  uint32   counts up with every packet a controller sends
+    angle     float32  tilt, about -15 to 15
+    timestamp uint32   controller clock in milliseconds
+Several packets may be packed back to back in one datagram. A packet starting with "{"
+is JSON instead (see assets.network.parse_packet), which stays accepted as a fallback.
+"""
+
+import struct
+import numpy as np
+
+PACKET_VERSION = 1
+THRUST = 0x01
+FIRE = 0x02
+
+PACKET = struct.Struct("<BBHIfI")
+# The same layout as a NumPy record, for decoding a whole buffer at once.
+PACKET_DTYPE = np.dtype([("version", "<u1"), ("buttons", "<u1"), ("device", "<u2"),
+                         ("sequence", "<u4"), ("angle", "<f4"), ("timestamp", "<u4")])
+assert PACKET_DTYPE.itemsize == PACKET.size
+
+def device_name(index):
+    """Device ID used in game for a device index."""
+    return f"device_{index}"
+
+def device_index(device_id):
+    """Device index of an ID made by device_name."""
+    return int(device_id.rsplit("_", 1)[1])
+
+def encode(device, sequence, angle, thrust=False, fire=False, timestamp=0):
+    """
+    Pack one controller packet.
+    :param device: Device index, 0 to 65535.
+    :return: bytes of length PACKET.size.
+    """
+    buttons = (THRUST if thrust else 0) | (FIRE if fire else 0)
+    return PACKET.pack(PACKET_VERSION, buttons, device, sequence & 0xFFFFFFFF, angle, timestamp & 0xFFFFFFFF)
+
+def decode(data):
+    """
+    Unpack a single packet.
+    :return: (device, sequence, angle, thrust, fire, timestamp), or None if the packet is invalid.
+    """
+    if len(data) != PACKET.size:
+        return None
+    version, buttons, device, sequence, angle, timestamp = PACKET.unpack(data)
+    if version != PACKET_VERSION or angle != angle:
+        return None
+    return device, sequence, angle, bool(buttons & THRUST), bool(buttons & FIRE), timestamp
+
+def decode_buffer(buffer):
+    """
+    Decode every packet in a buffer of back to back packets without a Python loop per packet.
+    A trailing partial packet is ignored, as are packets of another version or with a NaN angle.
+    :return: NumPy record array with the fields of PACKET_DTYPE.
+    """
+    count = len(buffer) // PACKET.size
+    packets = np.frombuffer(buffer, dtype=PACKET_DTYPE, count=count)
+    valid = (packets["version"] == PACKET_VERSION) & ~np.isnan(packets["angle"])
+    return packets if valid.all() else packets[valid]
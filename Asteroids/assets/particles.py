@@ -0,0 +1,97 @@
+import pygame
+import numpy as np
+import random
+
+# ParticleSystem keeps explosion particles in preallocated NumPy arrays.
+# It is shared by the gameplay asteroids and the menu's background animation.
+class ParticleSystem:
+    def __init__(self, decay, capacity=1024, radius=2, color=(255, 255, 255), rng=random):
+        """
+        :param decay: Amount taken off every particle's timer each update.
+        :param capacity: Maximum number of particles alive at once.
+        :param radius: Radius of the dot drawn for each particle.
+        :param color: Color of the dots.
+        :param rng: Source of the particles' random velocities and lifetimes, e.g. a stream of RandomStreams.
+        """
+        self.DECAY = decay
+        self.capacity = capacity
+        self.radius = radius
+        self.color = color
+        self.rng = rng
+        self.count = 0  # Live particles occupy rows 0 to count-1.
+        # Columns: x, y, x velocity, y velocity, timer.
+        self.state = np.zeros((capacity, 5))
+        # Scratch buffers so expiring particles does not allocate.
+        self._scratch = np.zeros((capacity, 5))
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._dot = None  # Dot sprite, rendered on first draw.
+        self.dt = 1  # Length of the last update, used to interpolate drawing.
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, coord, number, speed=1.5, lifetime=(45, 60)):
+        """
+        Spawn a burst of particles with random, distinct velocities.
+        :param coord: The coordinate where the particles should originate.
+        :param number: How many particles to spawn.
+        :param speed: Maximum absolute value for each velocity component.
+        :param lifetime: Range of starting timer values.
+        """
+        x_vels = []
+        y_vels = []
+        for i in range(number):
+            # Velocities must not be too small or repeat one already used in this burst.
+            x_vel = self.rng.uniform(-speed, speed)
+            while (x_vel in x_vels) or -0.1 < x_vel < 0.1:
+                x_vel = self.rng.uniform(-speed, speed)
+            y_vel = self.rng.uniform(-speed, speed)
+            while (y_vel in y_vels) or -0.1 < y_vel < 0.1:
+                y_vel = self.rng.uniform(-speed, speed)
+            x_vels.append(x_vel)
+            y_vels.append(y_vel)
+            timer = self.rng.randint(*lifetime)
+            if self.count < self.capacity:
+                self.state[self.count] = (coord[0], coord[1], x_vel, y_vel, timer)
+                self.count += 1
+
+    def update(self, dt=1):
+        """
+        Move every particle, count down their timers and drop the expired ones in one pass.
+        :param dt: Length of the update in 60 Hz frames.
+        """
+        self.dt = dt
+        n = self.count
+        state = self.state[:n]
+        state[:, 0:2] += state[:, 2:4]*dt
+        state[:, 4] -= self.DECAY*dt
+        alive = self._alive[:n]
+        np.greater(state[:, 4], 0, out=alive)
+        k = int(np.count_nonzero(alive))
+        if k < n:
+            np.compress(alive, state, axis=0, out=self._scratch[:k])
+            self.state[:k] = self._scratch[:k]
+            self.count = k
+
+    def draw(self, surface, alpha=1.0):
+        """
+        Draw every particle by blitting one cached dot sprite in a single blits call.
+        :param alpha: How far between the previous and the latest update to draw, from 0 to 1.
+        :return: List of rects that were drawn to.
+        """
+        if not self.count:
+            return []
+        if self._dot is None:
+            size = 2*self.radius + 1
+            self._dot = pygame.Surface((size, size))
+            self._dot.set_colorkey((0, 0, 0))
+            pygame.draw.circle(self._dot, self.color, (self.radius, self.radius), self.radius)
+        positions = self.state[:self.count, 0:2]
+        if alpha != 1:
+            # Step back along each velocity to the interpolated position.
+            positions = positions - (1-alpha)*self.dt*self.state[:self.count, 2:4]
+        corners = np.floor(positions) - self.radius
+        return surface.blits([(self._dot, corner) for corner in corners.tolist()])
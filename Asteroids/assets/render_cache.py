@@ -0,0 +1,157 @@
+import pygame
+from math import floor, ceil
+from collections import OrderedDict
+
+# SpriteCache keeps pre-rendered surfaces so things that look the same every frame
+# are rasterized once and blitted afterwards.
+class SpriteCache:
+    def __init__(self):
+        self.surfaces = {}  # key -> whatever the render function returned.
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render, *args):
+        """
+        Return the cached entry for a key, rendering it on the first request.
+        :param key: Any hashable value identifying the look of the sprite.
+        :param render: Function called with *args to build a missing entry.
+        """
+        entry = self.surfaces.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self.surfaces[key] = render(*args)
+        else:
+            self.hits += 1
+        return entry
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+# TextCache is a bounded LRU cache of rendered text surfaces. HUD strings only change
+# when a score changes or the timer crosses a second, so most renders are repeats.
+class TextCache:
+    def __init__(self, capacity=128):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()  # (font, text, color, antialias) -> Surface, oldest first.
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """
+        Drop-in replacement for font.render(text, antialias, color) that reuses earlier results.
+        The returned surface is shared, so callers must not draw on it.
+        :param font: pygame.font.Font used to render the text.
+        :param text: String to render.
+        :param color: RGB tuple of the text.
+        :param antialias: Whether the text is anti-aliased.
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.surfaces[key] = font.render(text, antialias, color)
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)  # Evict the least recently used string.
+        return surface
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+# Text cache shared by the game HUD and the scenes.
+TEXT_CACHE = TextCache()
+
+def render_outline(polygon, color, width=2):
+    """
+    Rasterize a polygon's outline onto its own color-keyed surface.
+    :return: (surface, offset), where offset is the top-left corner of the surface
+             relative to the polygon's center.
+    """
+    center = polygon.center
+    local = [(x-center[0], y-center[1]) for x, y in polygon.coordinates]
+    left = floor(min(x for x, y in local)) - width
+    top = floor(min(y for x, y in local)) - width
+    right = ceil(max(x for x, y in local)) + width
+    bottom = ceil(max(y for x, y in local)) + width
+
+    surface = pygame.Surface((right-left+1, bottom-top+1))
+    surface.set_colorkey((0, 0, 0))
+    pygame.draw.polygon(surface, color, [(x-left, y-top) for x, y in local], width)
+    return surface, (left, top)
+
+# StaticLayer holds a scene's unchanging content on one baked surface. Each frame only the
+# regions covered by animated sprites are restored from it and pushed to the display.
+class StaticLayer:
+    def __init__(self):
+        self.background = None
+        self.drawn_rects = []  # Rects the animated sprites covered in the previous frame.
+        self.stale = True  # The window shows something else, so the next frame is pushed in full.
+
+    def bake(self, size, draw, *args):
+        """
+        Render the static content once.
+        :param size: Size of the scene surface.
+        :param draw: Function called as draw(background, *args) to paint the static content.
+        """
+        self.background = pygame.Surface(size)
+        draw(self.background, *args)
+        self.stale = True
+
+    def restore(self, surface):
+        """
+        Paint the background back over last frame's animated sprites, or over everything when stale.
+        """
+        if self.stale:
+            surface.blit(self.background, (0, 0))
+        else:
+            for rect in self.drawn_rects:
+                surface.blit(self.background, rect, rect)
+
+    def present(self, drawn):
+        """
+        Push the changed regions to the display.
+        :param drawn: Rects the animated sprites were drawn to this frame.
+        """
+        if self.stale:
+            pygame.display.update()
+            self.stale = False
+        else:
+            pygame.display.update(merge_rects(self.drawn_rects + drawn))
+        self.drawn_rects = drawn
+
+def merge_rects(rects):
+    """
+    Union overlapping rects so no region is pushed to the display twice.
+    Empty rects (from draws that were clipped away) are dropped.
+    :param rects: Iterable of pygame.Rect objects.
+    :return: List of non-overlapping pygame.Rect objects covering the same pixels.
+    """
+    merged = []
+    for rect in rects:
+        if not rect:
+            continue
+        rect = pygame.Rect(rect)
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
@@ -0,0 +1,227 @@
+"""
+Input recording and replay of whole matches.
+A Recorder attached to Asteroids_Game appends every input that changes the match to a binary
+log: the local player's buttons, remote players' tilts, buttons and view delays, joins, leaves,
+clock ticks, simulation steps and match resets, after a header holding the match seed. Controls are only
+logged when they change, so a held button or a steady tilt costs nothing from tick to tick.
+Together with the seeded RandomStreams these decide the whole match, so a Replay calls the same
+methods on a new game with the same seed and plays the match out bit for bit, headless and as
+fast as the CPU allows, drawing only every so many ticks when asked to.
+
+The log is a header followed by events, each an opcode byte and its arguments. Events are only
+ever appended, so a log cut short by a crash still replays up to its last complete event.
+"""
+
+import struct
+import pygame
+from assets.sprites import Player
+
+REPLAY_MAGIC = b"ASTR"
+REPLAY_VERSION = 2  # Version 1 logs, without remote fire and view delays, replay too.
+HEADER = struct.Struct("<4sBqH")  # Magic, version, match seed, simulation ticks per second.
+
+# Opcodes.
+TIMER = 0  # update_timer() was called.
+STEP = 1  # step() was called.
+BUTTONS = 2  # u8 button bits: the local controls changed.
+JOIN = 3  # u8 name length and UTF-8 name: add_player() was called.
+LEAVE = 4  # u16 player number: remove_player() was called.
+STEER = 5  # u16 player number, f64 tilt, u8 button bits: a remote controller's command changed.
+RELEASE = 6  # u16 player number: a remote controller stopped sending commands.
+TILT = 7  # u16 player number, f64 tilt: apply_remote_tilt() was called.
+RESET = 8  # i64 seed: reset_game() started a new match.
+VIEW_DELAY = 9  # u16 player number, u16 ticks: how late a remote player sees the world changed.
+
+# Button bits, of the local controls and of remote commands.
+THRUST, FIRE, LEFT, RIGHT = 0x01, 0x02, 0x04, 0x08
+
+PLAYER = struct.Struct("<H")
+STEER_ARGS = struct.Struct("<HdB")
+TILT_ARGS = struct.Struct("<Hd")
+VIEW_DELAY_ARGS = struct.Struct("<HH")
+SEED = struct.Struct("<q")
+
+# Recorder appends a game's inputs to a replay log. Asteroids_Game calls its methods
+# from the places those inputs change the game.
+# Players are numbered in the order they joined, so events name them with two bytes.
+class Recorder:
+    def __init__(self, path):
+        """
+        :param path: File the log is written to; an existing file is replaced.
+        """
+        self.path = path
+        self.file = open(path, "wb")
+        self.numbers = {}  # device_id -> player number.
+        self.joined = 0  # Number given to the next player that joins.
+        self.buttons = 0  # Local controls as of the last BUTTONS event.
+        self.commands = {}  # Player number -> (tilt, button bits) given since the last step.
+        self.held = {}  # Player number -> (tilt, button bits) as of the last STEER event.
+
+    def start(self, game):
+        """
+        Write the header. Called by Asteroids_Game before anything happens in the match.
+        """
+        self.file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, game.rng.seed, game.SIM_RATE))
+
+    def timer(self):
+        self.file.write(bytes((TIMER,)))
+
+    def step(self, game):
+        """
+        Record a simulation step with the local and remote controls it is taken with.
+        """
+        for number, command in self.commands.items():
+            if self.held.get(number) != command:
+                self.file.write(bytes((STEER,)) + STEER_ARGS.pack(number, *command))
+        for number in sorted(self.held.keys() - self.commands.keys()):
+            self.file.write(bytes((RELEASE,)) + PLAYER.pack(number))
+        self.held, self.commands = self.commands, {}
+        buttons = (THRUST*bool(game.move) | FIRE*bool(game.fire) |
+                   LEFT*bool(game.left) | RIGHT*bool(game.right))
+        if buttons != self.buttons:
+            self.buttons = buttons
+            self.file.write(bytes((BUTTONS, buttons, STEP)))
+        else:
+            self.file.write(bytes((STEP,)))
+
+    def join(self, device_id):
+        name = device_id.encode()
+        self.numbers[device_id] = self.joined
+        self.joined += 1
+        self.file.write(bytes((JOIN, len(name))) + name)
+
+    def leave(self, device_id):
+        number = self.numbers.pop(device_id)
+        self.commands.pop(number, None)
+        self.held.pop(number, None)
+        self.file.write(bytes((LEAVE,)) + PLAYER.pack(number))
+
+    def steer(self, device_id, tilt, thrust, fire=False):
+        """
+        Note a remote command given to a player. Only the last command before a step
+        counts, and it is written out with the step if it differs from the one held before.
+        """
+        self.commands[self.numbers[device_id]] = (tilt, THRUST*bool(thrust) | FIRE*bool(fire))
+
+    def view_delay(self, device_id, ticks):
+        self.file.write(bytes((VIEW_DELAY,)) + VIEW_DELAY_ARGS.pack(self.numbers[device_id], ticks))
+
+    def tilt(self, device_id, tilt):
+        self.file.write(bytes((TILT,)) + TILT_ARGS.pack(self.numbers[device_id], tilt))
+
+    def reset(self, seed):
+        # The new match's ships start without controls.
+        self.commands = {}
+        self.held = {}
+        self.file.write(bytes((RESET,)) + SEED.pack(seed))
+
+    def close(self):
+        self.file.close()
+
+# Replay loads a log and plays it out on a game.
+class Replay:
+    def __init__(self, path):
+        """
+        :param path: Log written by a Recorder.
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, self.seed, self.sim_rate = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or not 1 <= version <= REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version 1 to {REPLAY_VERSION} replay log")
+        self.events = self.decode(data, HEADER.size)
+
+    @staticmethod
+    def decode(data, offset=0):
+        """
+        Decode the events once, so playing them back only costs the simulation.
+        A truncated event at the end of the log is dropped.
+        :return: List of (opcode, arguments...) tuples.
+        """
+        events = []
+        end = len(data)
+        try:
+            while offset < end:
+                op = data[offset]
+                offset += 1
+                if op == TIMER or op == STEP:
+                    events.append((op,))
+                    continue
+                if op == BUTTONS:
+                    events.append((op, data[offset]))
+                    offset += 1
+                elif op == JOIN:
+                    length = data[offset]
+                    if offset + 1 + length > end:
+                        break
+                    events.append((op, data[offset + 1:offset + 1 + length].decode()))
+                    offset += 1 + length
+                elif op == LEAVE or op == RELEASE:
+                    events.append((op,) + PLAYER.unpack_from(data, offset))
+                    offset += PLAYER.size
+                elif op == STEER:
+                    number, tilt, buttons = STEER_ARGS.unpack_from(data, offset)
+                    events.append((op, number, tilt, bool(buttons & THRUST), bool(buttons & FIRE)))
+                    offset += STEER_ARGS.size
+                elif op == VIEW_DELAY:
+                    events.append((op,) + VIEW_DELAY_ARGS.unpack_from(data, offset))
+                    offset += VIEW_DELAY_ARGS.size
+                elif op == TILT:
+                    events.append((op,) + TILT_ARGS.unpack_from(data, offset))
+                    offset += TILT_ARGS.size
+                elif op == RESET:
+                    events.append((op,) + SEED.unpack_from(data, offset))
+                    offset += SEED.size
+                else:
+                    raise ValueError(f"Unknown replay event {op} at byte {offset - 1}")
+        except (IndexError, struct.error):
+            pass  # The log ends partway through its last event.
+        return events
+
+    def play(self, game, render_every=0):
+        """
+        Play the log out on a game just created with seed=self.seed and no input server.
+        :param render_every: Draw the game every this many steps; 0 never draws, as for a headless game.
+        :return: The number of steps simulated.
+        """
+        game.SIM_RATE = self.sim_rate
+        names = []  # Player number -> device_id.
+        held = {}  # Player number -> (turn, thrust, fire) its controller is holding.
+        players = game.players
+        steps = 0
+        for event in self.events:
+            op = event[0]
+            if op == STEP:
+                for number, (turn, thrust, fire) in held.items():
+                    players[names[number]].steer(turn, thrust)
+                    game.triggers[names[number]] = fire
+                game.step()
+                steps += 1
+                if render_every and steps % render_every == 0:
+                    game.draw()
+                    pygame.event.pump()  # Keep the window responsive.
+            elif op == TIMER:
+                game.update_timer()
+            elif op == BUTTONS:
+                buttons = event[1]
+                game.set_input(thrust=bool(buttons & THRUST), fire=bool(buttons & FIRE),
+                               left=bool(buttons & LEFT), right=bool(buttons & RIGHT))
+            elif op == STEER:
+                held[event[1]] = (Player.tilt_rate(event[2]), event[3], event[4])
+            elif op == RELEASE:
+                del held[event[1]]
+            elif op == JOIN:
+                names.append(event[1])
+                if event[1] not in players:  # The local player is already in a new game.
+                    game.add_player(event[1])
+            elif op == LEAVE:
+                held.pop(event[1], None)
+                game.remove_player(names[event[1]])
+            elif op == VIEW_DELAY:
+                game.view_delays[names[event[1]]] = event[2]
+            elif op == TILT:
+                players[names[event[1]]].apply_remote_tilt(event[2])
+            elif op == RESET:
+                held.clear()
+                game.reset_game(event[1])
+        return steps
\ No newline at end of file
@@ -0,0 +1,83 @@
+import os
+import pygame
+
+# When headless, no sound device or font is ever opened. Set it with set_headless() before
+# the first sound plays or font renders, or start the process with ASTEROIDS_HEADLESS=1.
+HEADLESS = os.environ.get("ASTEROIDS_HEADLESS", "") not in ("", "0")
+
+def set_headless(headless=True):
+    global HEADLESS
+    HEADLESS = headless
+
+# NullSound stands in for pygame.mixer.Sound when there is no audio.
+class NullSound:
+    def play(self, *args, **kwargs):
+        pass
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+# LazySound defers loading a sound (and starting the mixer) until it first plays.
+class LazySound:
+    def __init__(self, path, volume=None):
+        """
+        :param path: Path of the sound file, relative to the game folder.
+        :param volume: Optional volume applied once the sound is loaded.
+        """
+        self.path = path
+        self.volume = volume
+        self._sound = None
+
+    @property
+    def sound(self):
+        if self._sound is None:
+            self._sound = NullSound()
+            if not HEADLESS:
+                try:
+                    if not pygame.mixer.get_init():
+                        pygame.mixer.init()  # Initialize the mixer module for playing sounds.
+                    self._sound = pygame.mixer.Sound(self.path)
+                except pygame.error:
+                    pass  # No audio device; carry on silently.
+            if self.volume is not None:
+                self._sound.set_volume(self.volume)
+        return self._sound
+
+    def play(self, *args, **kwargs):
+        return self.sound.play(*args, **kwargs)
+
+    def stop(self):
+        self.sound.stop()
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if self._sound is not None:
+            self._sound.set_volume(volume)
+
+# LazyFont defers opening a font file until text is first rendered or measured with it.
+class LazyFont:
+    def __init__(self, path, size):
+        """
+        :param path: Path of the font file, relative to the game folder, or None for the default font.
+        :param size: Point size of the font.
+        """
+        self.path = path
+        self.size = size
+        self._font = None
+
+    @property
+    def font(self):
+        if self._font is None:
+            if HEADLESS:
+                raise RuntimeError("fonts are not available in headless mode")
+            if not pygame.font.get_init():
+                pygame.font.init()  # Initialize the font module for text rendering.
+            self._font = pygame.font.Font(self.path, self.size)
+        return self._font
+
+    def __getattr__(self, name):
+        # Anything else (render, get_height, size, ...) goes to the real font.
+        return getattr(self.font, name)
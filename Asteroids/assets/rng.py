@@ -0,0 +1,57 @@
+"""
+Seeded random number streams for one match.
+Every subsystem draws from its own random.Random, seeded from the match seed and the stream's
+name, so the same seed and the same inputs replay the same match exactly. Cosmetic effects
+(particles, screen shake, death debris) have streams of their own, so drawing more or fewer
+frames, or running headless, never shifts the numbers the gameplay sees.
+"""
+
+import random
+
+# Streams that decide what happens in the match.
+GAMEPLAY = ("asteroids", "joins")
+# Streams that only change how the match looks.
+COSMETIC = ("particles", "shake", "debris")
+
+# RandomStreams hands out one independent random.Random per subsystem name.
+class RandomStreams:
+    def __init__(self, seed=None):
+        """
+        :param seed: Integer seed of the match; a random one is picked (and kept in seed) when None.
+        """
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**63)
+        self.seed = seed
+        self.streams = {}
+
+    def stream(self, name):
+        """
+        The random.Random of a subsystem, created on first use.
+        It has the interface of the random module, so it can stand in for it.
+        """
+        stream = self.streams.get(name)
+        if stream is None:
+            # String seeds are hashed with SHA-512, so nearby names give unrelated streams.
+            stream = self.streams[name] = random.Random(f"{self.seed}:{name}")
+        return stream
+
+    def next_match(self):
+        """Streams for the following match, seeded from this one so a series of matches also replays."""
+        return RandomStreams(self.stream("matches").randrange(2**63))
+
+    def getstate(self):
+        """State of every stream used so far, for setstate()."""
+        return self.seed, {name: stream.getstate() for name, stream in self.streams.items()}
+
+    def setstate(self, state):
+        """
+        Return every stream to a state from getstate(). The random.Random objects are kept,
+        so subsystems holding on to their stream see the change.
+        """
+        seed, streams = state
+        self.seed = seed
+        for name, stream in self.streams.items():
+            if name not in streams:
+                stream.seed(f"{seed}:{name}")  # Not drawn from yet at the time of the state.
+        for name, stream_state in streams.items():
+            self.stream(name).setstate(stream_state)
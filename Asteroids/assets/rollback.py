@@ -0,0 +1,258 @@
+"""
+Saving and restoring the whole game state, for rollback netcode.
+When a remote input arrives late, the game is restored to the tick before it and the ticks since
+are simulated again with the real input. Rollback keeps the state of the last few ticks in a ring
+of flat NumPy buffers, preallocated when it is created, so saving a tick copies numbers into rows
+rather than deep-copying players, asteroids and their shapes.
+
+The ships' kinematic state is copied column by column out of the ShipKinematics store. A living
+ship's body is placed from the shared rotation frames, so its center and angle rebuild it exactly
+and only the wrecks of dead ships keep their lines; an asteroid never turns, so its shape, size and
+center rebuild it. Restoring a tick and simulating the same inputs again plays out bit for bit as
+the first time.
+"""
+
+from copy import copy
+import numpy as np
+from assets.shapes import Polygon
+from assets.sprites import Player, ship_color
+
+# Ship columns, copied from the ShipKinematics columns of the same names: center, angle, velocity,
+# turn, thrust, safe, timer, displacement, dead. The maximum velocity and direction are worked out
+# from the angle whenever they are used.
+SHIP_FIELDS = [("center", slice(0, 2)), ("angle", slice(2, 3)), ("vector", slice(3, 5)), ("turn", slice(5, 6)),
+               ("thrust", slice(6, 7)), ("safe", slice(7, 8)), ("timer", slice(8, 9)),
+               ("displacement", slice(9, 11)), ("dead", slice(11, 12))]
+SHIP_COLUMNS = 12
+# Player integer columns: score, bonus threshold count, leaderboard join order, fire button held.
+PLAYER_INTS = 4
+# Asteroid columns: center, velocity, shape index, size index, the two multipliers, ID.
+ASTEROID_COLUMNS = 9
+# Scalar columns of a tick.
+TICK, TIME_LEFT, GAME_ENDED, SHAKE, SHAKE_TIMER, ASTEROID_NO, ASTEROID_ID, ASTEROID_DT, \
+    PARTICLES, PARTICLE_DT, BULLETS, BULLET_ID, BULLET_DT, KEY_PRESSED, JOINED, PLAYERS, ASTEROIDS = range(17)
+SCALARS = 17
+
+# Rollback saves the game after every tick into a ring of the last few ticks and restores any of them.
+# Call save() after each step(); restore(tick) puts the game back to just after that tick.
+# The local controls given with set_input() are inputs rather than state and are left as they are.
+class Rollback:
+    def __init__(self, game, ticks=16, max_asteroids=64):
+        """
+        :param game: The Asteroids_Game to save and restore.
+        :param ticks: How many of the latest ticks are kept.
+        :param max_asteroids: Asteroid rows kept per tick; the buffers grow if a tick has more.
+        """
+        self.game = game
+        self.ticks = ticks
+        bullets = game.bullets.bullets
+        particles = game.asteroids.particles
+        self.players = np.zeros((ticks, game.MAX_PLAYERS, SHIP_COLUMNS))
+        self.player_ints = np.zeros((ticks, game.MAX_PLAYERS, PLAYER_INTS), dtype=np.int64)
+        self.asteroids = np.zeros((ticks, max_asteroids, ASTEROID_COLUMNS))
+        self.bullets = np.zeros((ticks, bullets.capacity, 4))
+        self.bullet_owners = np.zeros((ticks, bullets.capacity), dtype=np.int32)
+        self.bullet_ids = np.zeros((ticks, bullets.capacity), dtype=np.int64)
+        self.particles = np.zeros((ticks, particles.capacity, 5))
+        self.scalars = np.zeros((ticks, SCALARS))
+        self.scalars[:, TICK] = -1  # Marks an empty slot.
+        self.device_ids = [[] for slot in range(ticks)]
+        # Per tick, (order, death timer, spins, tip, (center, angle) of each line) of every dead ship.
+        self.wrecks = [[] for slot in range(ticks)]
+        self.winners = [None]*ticks
+        self.random = [None]*ticks
+        self.templates = {}  # (shape index, size index) -> Polygon copied to rebuild asteroids.
+
+    def __contains__(self, tick):
+        return self.scalars[tick % self.ticks, TICK] == tick
+
+    def save(self):
+        """
+        Save the game as it is now, under its current tick_count.
+        """
+        game = self.game
+        tick = game.tick_count
+        slot = tick % self.ticks
+        scalars = self.scalars[slot]
+
+        # Players, in the order of the players dict, which the simulation iterates in.
+        players = list(game.players.values())
+        if len(players) > self.players.shape[1]:
+            self.players = self.grow(self.players, len(players))
+            self.player_ints = self.grow(self.player_ints, len(players))
+        keys = game.leaderboard.keys
+        pressed = game.bullets.pressed
+        count = len(players)
+        ships = game.ships
+        rows = np.fromiter((player.row for player in players), dtype=np.intp, count=count)
+        saved = self.players[slot, :count]
+        for name, columns in SHIP_FIELDS:
+            saved[:, columns] = getattr(ships, name)[rows].reshape(count, -1)
+        wrecks = self.wrecks[slot] = []
+        for order in np.flatnonzero(ships.dead[rows]).tolist():
+            player = players[order]
+            spins = tuple(player.angles) if player.angles is not None else None  # None until the animation starts.
+            wrecks.append((order, player.death_timer, spins, tuple(player.top),
+                           [(line.center[0], line.center[1], line.angle) for line in player.body]))
+        self.player_ints[slot, :count] = np.array([(player.score, player.bonus_threshold_count,
+                                                    keys[player.device_id][1], player.device_id in pressed)
+                                                   for player in players],
+                                                  dtype=np.int64).reshape(count, PLAYER_INTS)
+        self.device_ids[slot] = [player.device_id for player in players]
+
+        asteroids = game.asteroids
+        if len(asteroids.asteroids) > self.asteroids.shape[1]:
+            self.asteroids = self.grow(self.asteroids, len(asteroids.asteroids))
+        self.asteroids[slot, :len(asteroids.asteroids)] = np.array([
+            (asteroid[0].center[0], asteroid[0].center[1], asteroid[1], asteroid[2], asteroid[6],
+             asteroids.SIZES.index(asteroid[3]), asteroid[4], asteroid[5], asteroid[7])
+            for asteroid in asteroids.asteroids], dtype=float).reshape(-1, ASTEROID_COLUMNS)
+
+        pool = game.bullets.bullets
+        self.bullets[slot, :pool.count] = pool.state[:pool.count]
+        self.bullet_owners[slot, :pool.count] = pool.owner[:pool.count]
+        self.bullet_ids[slot, :pool.count] = pool.ids[:pool.count]
+        particles = asteroids.particles
+        self.particles[slot, :particles.count] = particles.state[:particles.count]
+
+        scalars[:] = (tick, game.time_left, game.game_ended, game.shake, game.shake_timer, asteroids.asteroid_no,
+                      asteroids.next_id, asteroids.dt, particles.count, particles.dt, pool.count, pool.next_id,
+                      pool.dt, game.bullets.key_pressed, game.leaderboard.joined, count, len(asteroids.asteroids))
+        self.winners[slot] = getattr(game, "winner_text", None)
+        self.random[slot] = game.rng.getstate()
+
+    def restore(self, tick):
+        """
+        Put the game back to the state it was saved in after a tick.
+        Later ticks are dropped, since the game now plays on from this one.
+        :param tick: A tick still in the ring.
+        """
+        if tick not in self:
+            raise KeyError(f"Tick {tick} is no longer kept")
+        game = self.game
+        slot = tick % self.ticks
+        scalars = self.scalars[slot].tolist()
+
+        count = int(scalars[PLAYERS])
+        old = game.players
+        players = {}
+        keys = {}
+        pressed = set()
+        ints = self.player_ints[slot, :count].tolist()
+        for device_id, (score, bonus, joined, held) in zip(self.device_ids[slot], ints):
+            player = old.get(device_id)
+            if player is None:
+                player = self.new_player(device_id)
+            # Living ships have never started a death animation; wrecks are set below.
+            player.death_timer = 180
+            player.angles = None
+            player.score = score
+            player.bonus_threshold_count = bonus
+            players[device_id] = player
+            keys[device_id] = (-score, joined, device_id)
+            if held:
+                pressed.add(device_id)
+        ordered = list(players.values())
+        ships = game.ships
+        rows = np.fromiter((player.row for player in ordered), dtype=np.intp, count=count)
+        saved = self.players[slot, :count]
+        for name, columns in SHIP_FIELDS:
+            column = getattr(ships, name)
+            column[rows] = saved[:, columns].reshape((count,) + column.shape[1:])
+        ships.stale[rows] = True  # Living ships are placed from their center and angle when next used.
+        frame = Player.FRAMES.frame
+        for order, death_timer, spins, top, lines in self.wrecks[slot]:
+            player = ordered[order]
+            player.death_timer = death_timer
+            player.angles = list(spins) if spins is not None else None
+            player.top = list(top)
+            for i, (line, (x, y, angle)) in enumerate(zip(player._body, lines)):
+                line.apply_frame(frame(angle)[0][i][1], (x, y), angle)
+            player.stale = False
+        for device_id in old:
+            if device_id not in players:
+                game.ships.release(device_id)  # Joined after the tick being restored.
+        game.players = players
+        game.main_player = players.get("local")
+        game.leaderboard.keys = keys
+        game.leaderboard.entries = sorted(keys.values())
+        game.leaderboard.joined = int(scalars[JOINED])
+
+        asteroids = game.asteroids
+        asteroids.asteroids = []
+        for x, y, x_vel, y_vel, shape, size, x_mul, y_mul, asteroid_id in \
+                self.asteroids[slot, :int(scalars[ASTEROIDS])].tolist():
+            polygon = copy(self.template(int(shape), int(size)))
+            polygon.center = (x, y)
+            asteroids.asteroids.append([polygon, x_vel, y_vel, asteroids.SIZES[int(size)],
+                                        int(x_mul), int(y_mul), int(shape), int(asteroid_id)])
+        asteroids.asteroid_no = int(scalars[ASTEROID_NO])
+        asteroids.next_id = int(scalars[ASTEROID_ID])
+        asteroids.dt = scalars[ASTEROID_DT]
+        asteroids.scored = []
+        particles = asteroids.particles
+        particles.count = int(scalars[PARTICLES])
+        particles.state[:particles.count] = self.particles[slot, :particles.count]
+        particles.dt = scalars[PARTICLE_DT]
+
+        pool = game.bullets.bullets
+        pool.count = int(scalars[BULLETS])
+        pool.state[:pool.count] = self.bullets[slot, :pool.count]
+        pool.owner[:pool.count] = self.bullet_owners[slot, :pool.count]
+        pool.ids[:pool.count] = self.bullet_ids[slot, :pool.count]
+        pool.alive[:pool.count] = True
+        pool.next_id = int(scalars[BULLET_ID])
+        pool.dt = scalars[BULLET_DT]
+        game.bullets.key_pressed = bool(scalars[KEY_PRESSED])
+        game.bullets.pressed = pressed
+
+        game.tick_count = tick
+        game.time_left = scalars[TIME_LEFT]
+        game.game_ended = bool(scalars[GAME_ENDED])
+        game.shake = bool(scalars[SHAKE])
+        game.shake_timer = int(scalars[SHAKE_TIMER])
+        if self.winners[slot] is not None:
+            game.winner_text = self.winners[slot]
+        game.rng.setstate(self.random[slot])
+        game.full_redraw = True
+
+        # Forget the ticks after this one.
+        newer = self.scalars[:, TICK] > tick
+        self.scalars[newer, TICK] = -1
+
+    def new_player(self, device_id):
+        """
+        A Player for a device that left after the tick being restored; every field is set from the saved row.
+        """
+        player = Player.__new__(Player)
+        player.width, player.height = self.game.WIDTH, self.game.HEIGHT
+        player.device_id = device_id
+        player.color = ship_color(device_id)
+        player.ships = self.game.ships
+        player.row = player.ships.add(device_id)
+        player.visible = True
+        player._body = [copy(line) for line, offset in Player.FRAMES.lines]
+        return player
+
+    def template(self, shape, size):
+        """
+        An asteroid of a shape and size, built the way Asteroids builds them, to copy from.
+        A copy shares the outline, which never changes, and is given a center of its own.
+        """
+        polygon = self.templates.get((shape, size))
+        if polygon is None:
+            asteroids = self.game.asteroids
+            polygon = Polygon(asteroids.ASTEROID_SHAPES[shape])
+            if size:
+                polygon.enlarge(asteroids.SCALE_FACTORS[size])
+            self.templates[(shape, size)] = polygon
+        return polygon
+
+    @staticmethod
+    def grow(buffer, rows):
+        """
+        A copy of a per-tick buffer with room for at least rows rows in every tick.
+        """
+        grown = np.zeros((buffer.shape[0], max(rows, 2*buffer.shape[1])) + buffer.shape[2:], dtype=buffer.dtype)
+        grown[:, :buffer.shape[1]] = buffer
+        return grown
\ No newline at end of file
@@ -5,18 +5,17 @@ import random
 
 from assets.interface import Button
 from assets.shapes import Polygon
+from assets.particles import ParticleSystem
+from assets.render_cache import TEXT_CACHE, StaticLayer
+from assets.resources import LazyFont, LazySound
 
-pygame.font.init()
-pygame.mixer.init()
-
-FONT_1 = pygame.font.Font("assets/fonts/rexlia rg.otf", 50)  # 60 pts high
-FONT_2 = pygame.font.Font("assets/fonts/rexlia rg.otf", 30)  # 36 pts high
+FONT_1 = LazyFont("assets/fonts/rexlia rg.otf", 50)  # 60 pts high
+FONT_2 = LazyFont("assets/fonts/rexlia rg.otf", 30)  # 36 pts high
 
 MOUSE = pygame.image.load("assets/images/mouse.png")
 MOUSE.set_colorkey((0, 0, 0))
 
-CLICK_SOUND = pygame.mixer.Sound("assets/sounds/click.wav")
-CLICK_SOUND.set_volume(0.25)
+CLICK_SOUND = LazySound("assets/sounds/click.wav", 0.25)
 
 class Menu:
     def __init__(self):
@@ -28,6 +27,7 @@ class Menu:
         self.QUIT_BUTTON = Button(self.QUIT_TEXT, self.QUIT_TEXT, (40, 166))
 
         self.menu = True
+        self.shown = False  # Whether the menu was on screen last frame.
 
         self.ASTEROID_SHAPES = [
                 [[23, 0],
@@ -67,40 +67,30 @@ class Menu:
                         Polygon(self.ASTEROID_SHAPES[2]).enlarge(0.6).move_to((380, 542)),
         ]
 
-        self.particles = []
         self.DECAY = 0.8
+        self.particles = ParticleSystem(self.DECAY)
         self.counters = [0, 0, 0]
         self.timers = [random.randint(90, 150), random.randint(90, 150), random.randint(90, 150)]
 
+        # The title and asteroids never move, so they are baked into one background.
+        self.layer = StaticLayer()
+
+    def draw_static(self, surface):
+        surface.blit(self.TITLE, (40, 30))
+        for asteroid in self.asteroids:
+            asteroid.draw(surface, (255, 255, 255), 2)
+
     def spawn_particles(self, coord):
-        number = random.randint(4, 6)
-        x_vels = []
-        y_vels = []
-        for i in range (number):
-            x_vel = random.uniform(-1.5, 1.5)
-            while (x_vel in x_vels) or -0.1 < x_vel < 0.1: 
-                x_vel = random.uniform(-1.5, 1.5)
-            x_vels.append(x_vel)
-            
-            y_vel = random.uniform(-1.5, 1.5)
-            while (y_vel in y_vels) or -0.1 < y_vel < 0.1: 
-                y_vel = random.uniform(-1.5, 1.5)
-            y_vels.append(y_vels)
-            
-            timer = random.randint(45, 60)
-            
-            self.particles.append([coord[:], x_vel, y_vel, timer])
+        self.particles.spawn(coord, random.randint(4, 6))
 
     def handle_particles(self):
-        for index, particle in reversed(list(enumerate(self.particles))):
-            particle[0][0] += particle[1]
-            particle[0][1] += particle[2]
-            particle[3] -= self.DECAY 
-            if particle[3] <= 0: 
-                self.particles.pop(index)
+        self.particles.update()
 
     def loop(self, surface):
-        
+        if not self.shown:
+            self.shown = True
+            self.layer.stale = True  # Coming back from another screen, so it is all painted over.
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
@@ -122,16 +112,15 @@ class Menu:
 
         self.handle_particles()
 
-        surface.fill((0, 0, 0))
-        surface.blit(self.TITLE, (40, 30))
-        self.PLAY_BUTTON.draw(surface)
-        self.QUIT_BUTTON.draw(surface)
-        for asteroid in self.asteroids:
-            asteroid.draw(surface, (255, 255, 255), 2)
-        for particle in self.particles:
-            pygame.draw.circle(surface, (255, 255, 255), particle[0], 2)
-        surface.blit(MOUSE, pygame.mouse.get_pos())
-        pygame.display.update()
+        if self.layer.background is None:
+            self.layer.bake(surface.get_size(), self.draw_static)
+        # Only the buttons, particles and cursor are redrawn over the baked background.
+        self.layer.restore(surface)
+        drawn = [self.PLAY_BUTTON.draw(surface), self.QUIT_BUTTON.draw(surface)]
+        drawn += self.particles.draw(surface)
+        drawn.append(surface.blit(MOUSE, pygame.mouse.get_pos()))
+        self.layer.present(drawn)
+        self.shown = self.menu
 
 class Game_over:
     def __init__(self, surface):
@@ -146,12 +135,21 @@ class Game_over:
 
         self.game_over = False
         self.play = False
-        self.GAME_OVER_SOUND = pygame.mixer.Sound("assets/sounds/game over.wav")
+        self.GAME_OVER_SOUND = LazySound("assets/sounds/game over.wav")
+
+        # The title and winner line are baked into one background when the screen is entered.
+        self.layer = StaticLayer()
+
+    def draw_static(self, surface, winner_info):
+        score_text = TEXT_CACHE.render(FONT_2, winner_info, (0, 255, 0))
+        surface.blit(self.GAME_OVER_TEXT, (surface.get_width()//2 - self.GAME_OVER_TEXT.get_width()//2, surface.get_height()//4))
+        surface.blit(score_text, (surface.get_width()//2 - score_text.get_width()//2, surface.get_height()//2 - 55))
 
     def loop(self, surface, winner_info, menu):
         if not self.play:
             self.play = True
             self.GAME_OVER_SOUND.play()
+            self.layer.bake(surface.get_size(), self.draw_static, winner_info)
         reset = False
 
         for event in pygame.event.get():
@@ -174,15 +172,11 @@ class Game_over:
                     self.game_over = False
                     self.play = False
 
-        score_text = FONT_2.render(winner_info, True, (0, 255, 0))
-        surface.fill((0, 0, 0))
-        surface.blit(self.GAME_OVER_TEXT, (surface.get_width()//2 - self.GAME_OVER_TEXT.get_width()//2, surface.get_height()//4))
-        surface.blit(score_text, (surface.get_width()//2 - score_text.get_width()//2, surface.get_height()//2 - 55))
-        self.RETRY_BUTTON.draw(surface)
-        self.MENU_BUTTON.draw(surface)
-        self.QUIT_BUTTON.draw(surface)
-        surface.blit(MOUSE, pygame.mouse.get_pos())
-        pygame.display.update()
+        # Only the buttons and cursor are redrawn over the baked background.
+        self.layer.restore(surface)
+        drawn = [self.RETRY_BUTTON.draw(surface), self.MENU_BUTTON.draw(surface), self.QUIT_BUTTON.draw(surface)]
+        drawn.append(surface.blit(MOUSE, pygame.mouse.get_pos()))
+        self.layer.present(drawn)
 
         return reset
 
@@ -195,8 +189,16 @@ class Pause:
         self.PLAY_BUTTON = Button(self.PLAY_TEXT, self.PLAY_TEXT, (surface.get_width()//2-self.PLAY_TEXT.get_width()//2, surface.get_height()//2-55))
         self.EXIT_BUTTON = Button(self.EXIT_TEXT, self.EXIT_TEXT, (surface.get_width()//2-self.EXIT_TEXT.get_width()//2, surface.get_height()//2))
 
+        # The frozen game frame and title are baked into one background each time the game pauses.
+        self.layer = StaticLayer()
+
+    def draw_static(self, window, surface):
+        window.blit(surface, (0, 0))
+        window.blit(self.PAUSED_TEXT, (surface.get_width()//2-self.PAUSED_TEXT.get_width()//2, window.get_height()//4))
+
     def loop(self, window, surface, menu, clock, fps):
         reset = False
+        self.layer.bake(window.get_size(), self.draw_static, surface)
         while True:
 
             for event in pygame.event.get():
@@ -217,11 +219,10 @@ class Pause:
                         reset = True
                         return reset
 
-            window.blit(surface, (0, 0))
-            window.blit(self.PAUSED_TEXT, (surface.get_width()//2-self.PAUSED_TEXT.get_width()//2, window.get_height()//4))
-            self.PLAY_BUTTON.draw(window)
-            self.EXIT_BUTTON.draw(window)
-            window.blit(MOUSE, pygame.mouse.get_pos())
-            pygame.display.update()
+            # Only the buttons and cursor are redrawn over the baked background.
+            self.layer.restore(window)
+            drawn = [self.PLAY_BUTTON.draw(window), self.EXIT_BUTTON.draw(window)]
+            drawn.append(window.blit(MOUSE, pygame.mouse.get_pos()))
+            self.layer.present(drawn)
 
             clock.tick(fps)
\ No newline at end of file
@@ -2,9 +2,15 @@
 Module containing additional shapes for Pygame.
 Includes a Circle and Polygon objects.
 Supports pixel perfect collision for extension objects and normal pygame objects.
+Collisions use separating axis and half-plane tests on edge normals that are worked out
+once per shape in model space. The slope/intercept boundaries are still built for code
+that passes them around directly (collidelines, collideline).
+Many circles can be tested against many polygons at once with a PolygonBatch.
 """
 
 import pygame
+import numpy as np
+from copy import copy
 from math import sqrt, cos, sin, radians
 
 class Circle:
@@ -94,19 +100,14 @@ class Circle:
         return False
 
     def collidepolygon(self, polygon):
-        if self.rect.colliderect(polygon.rect):
-            if polygon.collidepoint(self._center):
-                return True
-            
-            for coord in polygon.coordinates:
-                if self.collidepoint(coord):
-                    return True
-
-            if self.collidelines(polygon.boundaries):
-                return True
-            
-        else:
-            return False
+        """
+        Test if a Circle object is colliding with a Polygon object
+        Arguments:
+            polygon: Polygon object
+        Returns:
+            True if collision detected and False if not
+        """
+        return polygon.collidecircle(self)
 
     def colliderect(self, rect: pygame.Rect):
         """
@@ -193,13 +194,14 @@ class Circle:
 class Polygon:
     def __init__(self, coordinates: list):
         """
-        Creates a Polygon object
+        Creates a Polygon object.
+        The outline is stored once in model space around the polygon's center. Moving the
+        polygon only changes its center, and the world coordinates, rect and boundaries
+        are rebuilt from the model the next time something reads them.
         Arguments:
             coordinates: a list of coordinates
         """
         self.reorder_coords(coordinates)
-        self.create_center()
-        self.create_boundaries()
 
     def reorder_coords(self, coordinates):
         """Re-organise the coordinates and define the midpoint of the Polygon"""
@@ -209,7 +211,7 @@ class Polygon:
 
         lengths = [sqrt(i[0]**2 + i[1]**2) for i in copy_coords]
         next_coord = copy_coords[lengths.index(min(lengths))]
-        self._coordinates = [list(next_coord)]
+        ordered = [list(next_coord)]
         copy_coords.remove(next_coord)
 
         for j in range(len(copy_coords)):
@@ -221,50 +223,118 @@ class Polygon:
             else:
                 lengths = [sqrt((next_coord[0] - i[0])**2 + (next_coord[1] - i[1])**2) for i in left_coords]
                 next_coord = left_coords[lengths.index(min(lengths))]
-            self._coordinates.append(list(next_coord))
+            ordered.append(list(next_coord))
             copy_coords.remove(next_coord)
-        
-        self._coordinates.append(self._coordinates[0])
 
-        x, y = zip(*self._coordinates)
-        self.rect = pygame.Rect(min(x), min(y), max(x)-min(x)+1, max(y)-min(y)+1)
+        ordered.append(ordered[0])
+
+        self._center = coord_center(ordered[1:])
+        self._model = tuple((coord[0]-self._center[0], coord[1]-self._center[1]) for coord in ordered)
+        self._angle = 0
+        self.create_local()
 
     def create_center(self):
-        self._center = [sum([i[0] for i in self._coordinates[1:]]) / len(self._coordinates[1:]), sum([i[1] for i in self._coordinates[1:]]) / len(self._coordinates[1:])]
+        """The center is the polygon's position, so it is always up to date"""
+
+        return self._center
 
-    def create_boundaries(self):
-        """Generate the polygon's boundaries for collision testing"""
+    def create_local(self):
+        """Rotate the model by the polygon's angle and rebuild everything derived from it"""
 
-        self.boundaries = []
-        for i in range(len(self.coordinates)-1):
+        if self._angle % 360:
+            angle = radians(self._angle)
+            cos_a, sin_a = cos(angle), sin(angle)
+            self._local = [[cos_a*x - sin_a*y, sin_a*x + cos_a*y] for x, y in self._model]
+        else:
+            self._local = [list(coord) for coord in self._model]
+
+        x, y = zip(*self._local)
+        self._extent = (min(x), min(y), max(x)-min(x)+1, max(y)-min(y)+1)
+        self._bounds = (min(x), min(y), max(x), max(y))
+        self._local_boundaries = self.create_boundaries(self._local, (0, 0))
+        self._vertices = self._local[:-1]
+        self._edges = create_edges(self._local)
+        self._tables = None
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget the world space data after the polygon has moved"""
 
-            if self.coordinates[i][0] == self.coordinates[i+1][0]:
+        self._coordinates = None
+        self._rect = None
+        self._boundaries = None
+
+    def create_boundaries(self, coordinates=None, center=None):
+        """
+        Generate the polygon's boundaries for collision testing.
+        Without arguments the boundaries are built from the world coordinates.
+        """
+
+        if coordinates is None:
+            coordinates, center = self.coordinates, self._center
+
+        boundaries = []
+        for i in range(len(coordinates)-1):
+
+            if coordinates[i][0] == coordinates[i+1][0]:
                 gradient = "x"
-                y_intercept = self.coordinates[i][0]
-                if self.coordinates[i][0] >= self._center[0]: 
+                y_intercept = coordinates[i][0]
+                if coordinates[i][0] >= center[0]: 
                     comparator = "<="
                 else: 
                     comparator = ">="
 
-            elif self.coordinates[i][1] == self.coordinates[i+1][1]:
+            elif coordinates[i][1] == coordinates[i+1][1]:
                 gradient = "y"
-                y_intercept = self.coordinates[i][1]
-                if self.coordinates[i][1] >= self._center[1]: 
+                y_intercept = coordinates[i][1]
+                if coordinates[i][1] >= center[1]: 
                     comparator = "<="
                 else: 
                     comparator = ">="
 
             else:
-                gradient = (self.coordinates[i][1]-self.coordinates[i+1][1]) / (self.coordinates[i][0]-self.coordinates[i+1][0])
-                y_intercept = self.coordinates[i][1] - (gradient*self.coordinates[i][0])
-                if (gradient*self._center[0]) + y_intercept >= self._center[1]: 
+                gradient = (coordinates[i][1]-coordinates[i+1][1]) / (coordinates[i][0]-coordinates[i+1][0])
+                y_intercept = coordinates[i][1] - (gradient*coordinates[i][0])
+                if (gradient*center[0]) + y_intercept >= center[1]: 
                     comparator = "<="
                 else: 
                     comparator = ">="
 
-            x, y = zip(*self._coordinates[i:i+2])
+            x, y = zip(*coordinates[i:i+2])
+
+            boundaries.append([gradient, y_intercept, comparator, (min(x), max(x)), (min(y), max(y))])
+        return boundaries
 
-            self.boundaries.append([gradient, y_intercept, comparator, (min(x), max(x)), (min(y), max(y))])
+    @property
+    def boundaries(self):
+        """The model space boundaries shifted to the polygon's position"""
+
+        if self._boundaries is None:
+            dx, dy = self._center
+            self._boundaries = []
+            for gradient, intercept, comparator, x_range, y_range in self._local_boundaries:
+                if gradient == "x":
+                    intercept += dx
+                elif gradient == "y":
+                    intercept += dy
+                else:
+                    intercept += dy - gradient*dx
+                self._boundaries.append([gradient, intercept, comparator, (x_range[0]+dx, x_range[1]+dx),
+                                         (y_range[0]+dy, y_range[1]+dy)])
+        return self._boundaries
+
+    @property
+    def rect(self):
+        if self._rect is None:
+            self._rect = pygame.Rect(self._extent[0]+self._center[0], self._extent[1]+self._center[1],
+                                     self._extent[2], self._extent[3])
+        return self._rect
+
+    @property
+    def size(self):
+        """Width and height of the polygon's rect, without building the rect"""
+
+        return int(self._extent[2]), int(self._extent[3])
 
     def collidepoint(self, coord):
         """
@@ -274,45 +344,11 @@ class Polygon:
         Returns:
             True if point is within the polygon and False if not
         """
-        collision = False
-        for line in self.boundaries:
-            if line[0] == "x":
-                if line[2] == "<=": 
-                    if (coord[0] <= line[1]):
-                        collision = True
-                    else: 
-                        return False
-                else: 
-                    if (coord[0] >= line[1]):
-                        collision = True
-                    else: 
-                        return False
-
-            elif line[0] == "y":
-                if line[2] == "<=": 
-                    if (coord[1] <= line[1]):
-                        collision = True
-                    else: 
-                        return False
-                else: 
-                    if (coord[1] >= line[1]):
-                        collision = True
-                    else: 
-                        return False
-
-            else:
-                if line[2] == "<=":
-                    if coord[1] <= (line[0]*coord[0]) + line[1]:
-                        collision = True
-                    else: 
-                        return False
-                else:
-                    if coord[1] >= (line[0]*coord[0]) + line[1]:
-                        collision = True
-                    else: 
-                        return False
-
-        return collision
+        x, y = coord[0]-self._center[0], coord[1]-self._center[1]
+        for edge in self._edges:
+            if edge[4]*x + edge[5]*y > edge[6]:
+                return False
+        return True
 
     def collidelines(self, lines):
         """
@@ -382,71 +418,58 @@ class Polygon:
         Returns:
             True if collision detected and False if not
         """
+        left, right = rect.left-self._center[0], rect.right-self._center[0]
+        top, bottom = rect.top-self._center[1], rect.bottom-self._center[1]
+        if right < self._bounds[0] or left > self._bounds[2] or bottom < self._bounds[1] or top > self._bounds[3]:
+            return False
 
-        rect_coords = [rect.topleft, rect.topright, rect.bottomright, rect.bottomleft]
-
-        rect_lines = [["y", rect.top, "", (rect.left, rect.right), (rect.top, rect.top)], 
-                    ["x", rect.right, "", (rect.right, rect.right), (rect.top, rect.bottom)], 
-                    ["y", rect.bottom, "", (rect.left, rect.right), (rect.bottom, rect.bottom)], 
-                    ["x", rect.left, "", (rect.left, rect.left), (rect.top, rect.bottom)]
-        ]
-
-        if self.rect.colliderect(rect):
-            for coord in self._coordinates:
-                if rect.collidepoint(coord):
-                    return True
-
-            for coord in rect_coords:
-                if self.collidepoint(coord):
-                    return True
-                    
-            if self.collidelines(rect_lines):
-                return True
-        
-        return False
+        # The rect's own axes are covered by the bounds check above.
+        return not separated(self._edges, [(left, top), (right, top), (right, bottom), (left, bottom)])
 
     def collidecircle(self, circle):
-        if self.rect.colliderect(circle.rect):
-            if self.collidepoint(circle.center):
-                return True
-            
-            for coord in self._coordinates:
-                if circle.collidepoint(coord):
-                    return True
+        """
+        Test if a Circle object is colliding with the polygon.
+        Arguments:
+            circle: Circle object
+        Returns:
+            True if collision detected and False if not
+        """
+        x, y, radius = circle.x-self._center[0], circle.y-self._center[1], circle.radius
+        left, top, right, bottom = self._bounds
+        if x+radius < left or x-radius > right or y+radius < top or y-radius > bottom:
+            return False
 
-            if circle.collidelines(self.boundaries):
+        # Either the center is inside every edge, or some edge passes within the radius.
+        inside = True
+        for edge in self._edges:
+            if edge[4]*x + edge[5]*y > edge[6]:
+                inside = False
+            if segment_distance(x, y, edge) <= radius**2:
                 return True
-        
-        return False
+        return inside
 
     def collidepolygon(self, polygon):
-        if self.rect.colliderect(polygon.rect):
-            for coord in self._coordinates:
-                if polygon.collidepoint(coord):
-                    return True
-            
-            for coord in polygon.coordinates:
-                if self.collidepoint(coord):
-                    return True
-        
-            if self.collidelines(polygon.boundaries):
-                return True
+        """
+        Test if another Polygon object is colliding with the polygon.
+        Arguments:
+            polygon: Polygon object
+        Returns:
+            True if collision detected and False if not
+        """
+        dx, dy = polygon._center[0]-self._center[0], polygon._center[1]-self._center[1]
+        if polygon._bounds[2]+dx < self._bounds[0] or polygon._bounds[0]+dx > self._bounds[2] or \
+           polygon._bounds[3]+dy < self._bounds[1] or polygon._bounds[1]+dy > self._bounds[3]:
+            return False
 
-        return False
+        if separated(self._edges, [(x+dx, y+dy) for x, y in polygon._vertices]):
+            return False
+        return not separated(polygon._edges, [(x-dx, y-dy) for x, y in self._vertices])
 
     def collideline_object(self, line):
         """
         Test if a line object is colliding with the polygon.
         """
-        if self.rect.colliderect(line.rect):
-            for coord in line.coordinates:
-                if self.collidepoint(coord):
-                    return True
-        
-            if self.collideline(line.boundary):
-                return True
-
-        return False
+        return line.collidepolygon(self)
 
     def draw(self, surface, color, width=0):
         """
@@ -454,21 +477,23 @@ class Polygon:
         Arguments:
             surface: pygame.Surface object
             color: color value, tuple
+        Returns:
+            pygame.Rect of the changed pixels
         """
 
-        pygame.draw.polygon(surface, color, self._coordinates, width)
+        return pygame.draw.polygon(surface, color, self.coordinates, width)
     
     def manual_draw(self, surface, color, width=0):
         """Draw an outline of the polygon"""
 
-        for i in range(len(self._coordinates)-1):
-            pygame.draw.line(surface, color, self._coordinates[i], self._coordinates[i+1], width)
+        for i in range(len(self.coordinates)-1):
+            pygame.draw.line(surface, color, self.coordinates[i], self.coordinates[i+1], width)
 
     def aadraw(self, surface, color):
         """Draw an anti-aliased outline of the polygon"""
 
-        for i in range(len(self._coordinates)-1):
-            pygame.draw.aaline(surface, color, self._coordinates[i], self._coordinates[i+1])
+        for i in range(len(self.coordinates)-1):
+            pygame.draw.aaline(surface, color, self.coordinates[i], self.coordinates[i+1])
 
     def move(self, x: float=0, y: float=0):
         """
@@ -478,14 +503,9 @@ class Polygon:
             y: magnitude of verticle movement
         """
 
-        self._coordinates = [[coord[0]+x, coord[1]+y] for coord in self._coordinates]
-
-        _x, _y = zip(*self._coordinates)
-        self.rect = pygame.Rect(min(_x), min(_y), max(_x)-min(_x)+1, max(_y)-min(_y)+1)
-        
         self._center[0] += x
         self._center[1] += y
-        self.create_boundaries()
+        self._coordinates = self._rect = self._boundaries = None
 
         return self
 
@@ -497,16 +517,7 @@ class Polygon:
             y: magnitude of verticle movement
         """
 
-        self._coordinates = [[coord[0]+x, coord[1]+y] for coord in self._coordinates]
-
-        _x, _y = zip(*self._coordinates)
-        self.rect = pygame.Rect(min(_x), min(_y), max(_x)-min(_x)+1, max(_y)-min(_y)+1)
-        
-        self._center[0] += x
-        self._center[1] += y
-        self.create_boundaries()
-
-        return self
+        return self.move(x, y)
 
     def move_to(self, position: tuple):
         """
@@ -515,7 +526,7 @@ class Polygon:
             position: new coordinate to move to
         """
 
-        self.move_by(position[0]-self._center[0], position[1]-self._center[1])
+        self.center = position
         return self
 
     def rotate(self, angle, center: tuple=None):
@@ -526,18 +537,10 @@ class Polygon:
             center: point of rotation (x, y)
         """
 
-        if not center:
-            center = self._center
-        
-        angle = radians(angle)
-        for i in range(len(self._coordinates)):
-            self._coordinates[i] = [cos(angle)*(self._coordinates[i][0]-center[0]) - sin(angle)*(self._coordinates[i][1]-center[1]) + center[0], 
-                                    sin(angle)*(self._coordinates[i][0]-center[0]) + cos(angle)*(self._coordinates[i][1]-center[1]) + center[1]
-            ]
-
-        self.reorder_coords(self._coordinates)
-        self.create_center()
-        self.create_boundaries()
+        if center:
+            self._center = rotate_coord(self._center, angle, center)
+        self._angle += angle
+        self.create_local()
 
         return self
 
@@ -545,85 +548,152 @@ class Polygon:
         if center == None: 
             center = self._center
 
-        for i in range(len(self._coordinates)):
-            self._coordinates[i] = [scale_factor*(self._coordinates[i][0]-center[0]) + center[0], 
-                                    scale_factor*(self._coordinates[i][1]-center[1]) + center[1]
-            ]
-
-        x, y = zip(*self._coordinates)
-        self.rect = pygame.Rect(min(x), min(y), max(x)-min(x)+1, max(y)-min(y)+1)
-        self.create_center()
-        self.create_boundaries()
+        self._center = enlarge_coord(self._center, scale_factor, center)
+        self._model = tuple((scale_factor*x, scale_factor*y) for x, y in self._model)
+        self.create_local()
 
         return self
 
     @property
     def coordinates(self):
+        if self._coordinates is None:
+            dx, dy = self._center
+            self._coordinates = [[x+dx, y+dy] for x, y in self._local]
         return self._coordinates
     @coordinates.setter
     def coordinates(self, coordinates):
         self.reorder_coords(coordinates)
-        self.create_center()
-        self.create_boundaries()
-        return self
 
     @property
     def center(self):
         return self._center
     @center.setter
     def center(self, center):
-        vector = [center[0]-self._center[0], center[1]-self._center[1]]
-        for i in range(len(self._coordinates)):
-            self._coordinates[i] = [self._coordinates[i][0]+vector[0], self._coordinates[i][1]+vector[1]]
-
-        x, y = zip(*self._coordinates)
-        self.rect = pygame.Rect(min(x), min(y), max(x)-min(x)+1, max(y)-min(y)+1)
-        
         self._center = list(center)
-        self.create_boundaries()
+        self._coordinates = self._rect = self._boundaries = None
 
 
 class Line:
     def __init__(self, coordinates: list):
         """
-        Creates a Polygon object
+        Creates a Line object.
+        Like a Polygon, the line is kept in model space around its midpoint and its
+        world coordinates, rect and boundary are only rebuilt when they are read.
         Arguments:
             coordinates: a list of coordinates
         """
         self.reorder_coords(coordinates)
-        self.create_center()
-        self.create_boundary()
 
     def reorder_coords(self, coordinates):
-        """Re-organise the coordinates and define the midpoint of the Polygon"""
-        self._coordinates = [coordinates[0], coordinates[1], coordinates[0]]
-
-        x, y = zip(*self._coordinates)
-        self.rect = pygame.Rect(min(x), min(y), max(x)-min(x)+1, max(y)-min(y)+1)
+        """Store the two end points in model space and define the midpoint of the Line"""
+        self._center = coord_center(coordinates[0:2])
+        self._model = tuple((coord[0]-self._center[0], coord[1]-self._center[1]) for coord in coordinates[0:2])
+        self._angle = 0
+        self.create_local()
 
     def create_center(self):
-        self.center = [sum([i[0] for i in self._coordinates[1:]]) / len(self._coordinates[1:]), 
-                    sum([i[1] for i in self._coordinates[1:]]) / len(self._coordinates[1:])
-        ]
+        """The center is the line's position, so it is always up to date"""
+
+        return self._center
+
+    def create_local(self):
+        """Rotate the model by the line's angle and rebuild everything derived from it"""
+
+        self._angle, self._local, self._extent, self._bounds, self._local_boundary, self._edge = self.posed(self._angle)
+        self.invalidate()
+
+    def posed(self, angle):
+        """
+        Build the model space data of the line turned to an angle, without changing the line.
+        Arguments:
+            angle: in degrees
+        Returns:
+            (angle, coordinates, extent, bounds, boundary, edge), which apply_frame accepts
+        """
+
+        if angle % 360:
+            rotation = radians(angle)
+            cos_a, sin_a = cos(rotation), sin(rotation)
+            local = [[cos_a*x - sin_a*y, sin_a*x + cos_a*y] for x, y in self._model]
+        else:
+            local = [list(coord) for coord in self._model]
+        local.append(local[0])
+
+        x, y = zip(*local)
+        return (angle, local, (min(x), min(y), max(x)-min(x)+1, max(y)-min(y)+1), (min(x), min(y), max(x), max(y)),
+                self.create_boundary(local), create_edges(local[0:2])[0])
+
+    def apply_frame(self, pose, center, angle=None):
+        """
+        Place the line using model space data from posed or a RotationFrames lookup.
+        Arguments:
+            pose: (angle, coordinates, extent, bounds, boundary, edge)
+            center: new midpoint of the line
+            angle: exact angle of the line, when the pose is the nearest cached frame of it
+        """
+
+        self._angle, self._local, self._extent, self._bounds, self._local_boundary, self._edge = pose
+        if angle is not None:
+            self._angle = angle
+        self._center = [center[0], center[1]]
+        self._coordinates = self._rect = self._boundary = None
+        return self
+
+    def invalidate(self):
+        """Forget the world space data after the line has moved"""
+
+        self._coordinates = None
+        self._rect = None
+        self._boundary = None
+
+    def create_boundary(self, coordinates=None):
+        """
+        Generate the line's boundaries for collision testing.
+        Without arguments the boundary is built from the world coordinates.
+        """
 
-    def create_boundary(self):
-        """Generate the line's boundaries for collision testing"""
+        if coordinates is None:
+            coordinates = self.coordinates
 
-        if self.coordinates[0][0] == self.coordinates[1][0]:
+        if coordinates[0][0] == coordinates[1][0]:
             gradient = "x"
-            y_intercept = self.coordinates[0][0]
+            y_intercept = coordinates[0][0]
 
-        elif self.coordinates[0][1] == self.coordinates[1][1]:
+        elif coordinates[0][1] == coordinates[1][1]:
             gradient = "y"
-            y_intercept = self.coordinates[0][1]
+            y_intercept = coordinates[0][1]
 
         else:
-            gradient = (self.coordinates[0][1]-self.coordinates[1][1]) / (self.coordinates[0][0]-self.coordinates[1][0])
-            y_intercept = self.coordinates[0][1] - (gradient*self.coordinates[0][0])
+            gradient = (coordinates[0][1]-coordinates[1][1]) / (coordinates[0][0]-coordinates[1][0])
+            y_intercept = coordinates[0][1] - (gradient*coordinates[0][0])
 
-        x, y = zip(*self._coordinates[0:2])
+        x, y = zip(*coordinates[0:2])
 
-        self.boundary = [gradient, y_intercept, "", (min(x), max(x)), (min(y), max(y))]
+        return [gradient, y_intercept, "", (min(x), max(x)), (min(y), max(y))]
+
+    @property
+    def boundary(self):
+        """The model space boundary shifted to the line's position"""
+
+        if self._boundary is None:
+            dx, dy = self._center
+            gradient, intercept, comparator, x_range, y_range = self._local_boundary
+            if gradient == "x":
+                intercept += dx
+            elif gradient == "y":
+                intercept += dy
+            else:
+                intercept += dy - gradient*dx
+            self._boundary = [gradient, intercept, comparator, (x_range[0]+dx, x_range[1]+dx),
+                              (y_range[0]+dy, y_range[1]+dy)]
+        return self._boundary
+
+    @property
+    def rect(self):
+        if self._rect is None:
+            self._rect = pygame.Rect(self._extent[0]+self._center[0], self._extent[1]+self._center[1],
+                                     self._extent[2], self._extent[3])
+        return self._rect
 
     def collidelines(self, lines):
         """
@@ -657,60 +727,64 @@ class Line:
 
     def colliderect(self, rect: pygame.Rect):
         """
-        Test if a pygame.Rect object is colliding with the polygon.
+        Test if a pygame.Rect object is colliding with the line.
         Arguments:
             rect: pygame.Rect object
         Returns:
             True if collision detected and False if not
         """
+        left, right = rect.left-self._center[0], rect.right-self._center[0]
+        top, bottom = rect.top-self._center[1], rect.bottom-self._center[1]
+        if right < self._bounds[0] or left > self._bounds[2] or bottom < self._bounds[1] or top > self._bounds[3]:
+            return False
 
-        rect_lines = [["y", rect.top, "", (rect.left, rect.right), (rect.top, rect.top)], 
-                    ["x", rect.right, "", (rect.right, rect.right), (rect.top, rect.bottom)], 
-                    ["y", rect.bottom, "", (rect.left, rect.right), (rect.bottom, rect.bottom)], 
-                    ["x", rect.left, "", (rect.left, rect.left), (rect.top, rect.bottom)]
-        ]
-
-        if self.rect.colliderect(rect):
-            for coord in self._coordinates:
-                if rect.collidepoint(coord):
-                    return True
-
-            if self.collidelines(rect_lines):
-                return True
-        
-        return False
+        return straddles(self._edge, [(left, top), (right, top), (right, bottom), (left, bottom)])
 
     def collidecircle(self, circle):
-        if self.rect.colliderect(circle.rect):
-            for coord in self._coordinates:
-                if circle.collidepoint(coord):
-                    return True
-
-            if circle.collideline(self.boundary):
-                return True
-        
-        return False
+        """
+        Test if a Circle object is colliding with the line.
+        Arguments:
+            circle: Circle object
+        Returns:
+            True if collision detected and False if not
+        """
+        return segment_distance(circle.x-self._center[0], circle.y-self._center[1], self._edge) <= circle.radius**2
 
     def collidepolygon(self, polygon):
-        if self.rect.colliderect(polygon.rect):
-            for coord in self._coordinates:
-                if polygon.collidepoint(coord):
-                    return True
-        
-            if self.collidelines(polygon.boundaries):
-                return True
+        """
+        Test if a Polygon object is colliding with the line, using the polygon's
+        edge normals and the line's own normal as separating axes.
+        Arguments:
+            polygon: Polygon object
+        Returns:
+            True if collision detected and False if not
+        """
+        dx, dy = self._center[0]-polygon._center[0], self._center[1]-polygon._center[1]
+        if self._bounds[2]+dx < polygon._bounds[0] or self._bounds[0]+dx > polygon._bounds[2] or \
+           self._bounds[3]+dy < polygon._bounds[1] or self._bounds[1]+dy > polygon._bounds[3]:
+            return False
 
-        return False
+        if separated(polygon._edges, [(x+dx, y+dy) for x, y in self._local[0:2]]):
+            return False
+        return straddles(self._edge, [(x-dx, y-dy) for x, y in polygon._vertices])
     
     def draw(self, surface, color):
         """Draw an outline of the polygon"""
 
-        pygame.draw.line(surface, color, self._coordinates[0], self._coordinates[1])
+        return pygame.draw.line(surface, color, self.coordinates[0], self.coordinates[1])
 
-    def aadraw(self, surface, color):
-        """Draw an anti-aliased outline of the polygon"""
+    def aadraw(self, surface, color, offset: tuple=None):
+        """
+        Draw an anti-aliased outline of the polygon
+        Arguments:
+            offset: optional (x, y) added to both ends, e.g. to draw between two positions
+        """
 
-        pygame.draw.aaline(surface, color, self._coordinates[0], self._coordinates[1])
+        if offset:
+            start, end = self.coordinates[0], self.coordinates[1]
+            return pygame.draw.aaline(surface, color, (start[0]+offset[0], start[1]+offset[1]),
+                                      (end[0]+offset[0], end[1]+offset[1]))
+        return pygame.draw.aaline(surface, color, self.coordinates[0], self.coordinates[1])
 
     def move(self, x: float=0, y: float=0):
         """
@@ -720,14 +794,9 @@ class Line:
             y: magnitude of verticle movement
         """
 
-        self._coordinates = [[coord[0]+x, coord[1]+y] for coord in self._coordinates]
-
-        _x, _y = zip(*self._coordinates)
-        self.rect = pygame.Rect(min(_x), min(_y), max(_x)-min(_x)+1, max(_y)-min(_y)+1)
-
-        self.center[0] += x
-        self.center[1] += y
-        self.create_boundary()
+        self._center[0] += x
+        self._center[1] += y
+        self._coordinates = self._rect = self._boundary = None
 
         return self
 
@@ -739,14 +808,7 @@ class Line:
             y: magnitude of verticle movement
         """
 
-        self._coordinates = [[coord[0]+x, coord[1]+y] for coord in self._coordinates]
-        self.rect.x += x
-        self.rect.y += y
-        self.center[0] += x
-        self.center[1] += y
-        self.create_boundary()
-
-        return self
+        return self.move(x, y)
 
     def move_to(self, position: tuple):
         """
@@ -755,7 +817,7 @@ class Line:
             position: new coordinate to move to
         """
 
-        self.move_by(position[0]-self.center[0], position[1]-self.center[1])
+        self.center = position
         return self
 
     def rotate(self, angle, center: tuple=None):
@@ -766,43 +828,92 @@ class Line:
             center: point of rotation (x, y)
         """
 
-        if not center:
-            center = self.center
-        
-        angle = radians(angle)
-        for i in range(len(self._coordinates)):
-            self._coordinates[i] = [cos(angle) * (self._coordinates[i][0] - center[0]) - sin(angle) * (self._coordinates[i][1] - center[1]) + center[0], 
-                                    sin(angle) * (self._coordinates[i][0] - center[0]) + cos(angle) * (self._coordinates[i][1] - center[1]) + center[1]
-            ]
-
-        self.reorder_coords(self._coordinates)
-        self.create_center()
-        self.create_boundary()
+        if center:
+            self._center = rotate_coord(self._center, angle, center)
+        self._angle += angle
+        self.create_local()
         
         return self
 
     def enlarge(self, scale_factor=1, center=None):
         if center == None: 
-            center = self.center
-        for i in range(len(self._coordinates)):
-            self._coordinates[i] = [scale_factor*(self._coordinates[i][0]-center[0]) + center[0], 
-                                    scale_factor*(self._coordinates[i][1]-center[1]) + center[1]
-            ]
+            center = self._center
 
-        x, y = zip(*self._coordinates)
-        self.rect = pygame.Rect(min(x), min(y), max(x)-min(x)+1, max(y)-min(y)+1)
-        self.create_center()
-        self.create_boundary()
+        self._center = enlarge_coord(self._center, scale_factor, center)
+        self._model = tuple((scale_factor*x, scale_factor*y) for x, y in self._model)
+        self.create_local()
 
         return self
 
     @property
     def coordinates(self):
+        if self._coordinates is None:
+            dx, dy = self._center
+            self._coordinates = [[x+dx, y+dy] for x, y in self._local]
         return self._coordinates
     @coordinates.setter
     def coordinates(self, coordinates):
         self.reorder_coords(coordinates)
-        self.create_center()
+
+    @property
+    def center(self):
+        return self._center
+    @center.setter
+    def center(self, center):
+        self._center = list(center)
+        self._coordinates = self._rect = self._boundary = None
+
+    @property
+    def angle(self):
+        """Angle in degrees the line is turned by from its model"""
+        return self._angle
+
+class RotationFrames:
+    def __init__(self, lines: list, points: list, pivot: tuple, resolution: float=1):
+        """
+        Caches the rotated geometry of a rigid group of lines and points, keyed by angle
+        rounded to a fixed step. Turning the group becomes a table lookup and a translation.
+        Arguments:
+            lines: Line objects making up the group, at angle 0
+            points: extra coordinates that turn with the group, (x, y)
+            pivot: point the group turns around, (x, y)
+            resolution: angle step in degrees between cached frames
+        """
+        self.resolution = resolution
+        self.steps = round(360 / resolution)
+        # Private copies of the lines (sharing their model), and their offsets from the pivot.
+        self.lines = [(copy(line), (line.center[0]-pivot[0], line.center[1]-pivot[1])) for line in lines]
+        self.points = [(point[0]-pivot[0], point[1]-pivot[1]) for point in points]
+        self.frames = {}
+
+    def key(self, angle):
+        """Quantize an angle in degrees to its frame index"""
+
+        return round(angle / self.resolution) % self.steps
+
+    def frame(self, angle):
+        """
+        Look up (and build on first use) the frame for an angle.
+        Arguments:
+            angle: in degrees
+        Returns:
+            ([(line offset, line pose), ...], [point offset, ...])
+        """
+
+        key = self.key(angle)
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = self.frames[key] = self.create_frame(key*self.resolution)
+        return frame
+
+    def create_frame(self, angle):
+        """Rotate every line and point offset of the group by an angle"""
+
+        rotation = radians(angle)
+        cos_a, sin_a = cos(rotation), sin(rotation)
+        lines = [((cos_a*x - sin_a*y, sin_a*x + cos_a*y), template.posed(angle)) for template, (x, y) in self.lines]
+        points = [(cos_a*x - sin_a*y, sin_a*x + cos_a*y) for x, y in self.points]
+        return lines, points
 
 def rotate_coord(coord, angle, center: tuple=None):
     """
@@ -853,4 +964,164 @@ def enlarge_coord(coord: list, scale_factor: float=1, center=(0, 0)):
     """
     Perform an enlargement function to a coordinate
     """
-    return [scale_factor*(coord[0]-center[0]) + center[0], scale_factor*(coord[1]-center[1]) + center[1]]
\ No newline at end of file
+    return [scale_factor*(coord[0]-center[0]) + center[0], scale_factor*(coord[1]-center[1]) + center[1]]
+
+def create_edges(coordinates: list):
+    """
+    Build the edge data of a closed outline for the separating axis tests.
+    Each edge is (x, y, dx, dy, nx, ny, offset, length): its start point, its direction,
+    a normal facing away from (0, 0), that normal's offset and the squared length.
+    A point p is on the inner side of an edge when n.p <= offset.
+    """
+    edges = []
+    for i in range(len(coordinates)-1):
+        x, y = coordinates[i]
+        dx, dy = coordinates[i+1][0]-x, coordinates[i+1][1]-y
+        nx, ny = dy, -dx
+        offset = nx*x + ny*y
+        if offset < 0:
+            nx, ny, offset = -nx, -ny, -offset
+        edges.append((x, y, dx, dy, nx, ny, offset, dx*dx + dy*dy))
+    return tuple(edges)
+
+def segment_distance(x: float, y: float, edge: tuple):
+    """
+    Returns the squared distance from a point to an edge from create_edges
+    """
+    if edge[7]:
+        t = ((x-edge[0])*edge[2] + (y-edge[1])*edge[3]) / edge[7]
+        t = 0 if t < 0 else 1 if t > 1 else t
+    else:
+        t = 0
+    return (edge[0] + t*edge[2] - x)**2 + (edge[1] + t*edge[3] - y)**2
+
+def separated(edges: tuple, points: list):
+    """
+    Returns True if every point is strictly outside one of the edges,
+    which makes that edge's normal a separating axis
+    """
+    for edge in edges:
+        for x, y in points:
+            if edge[4]*x + edge[5]*y <= edge[6]:
+                break
+        else:
+            return True
+    return False
+
+def straddles(edge: tuple, points: list):
+    """
+    Returns True if the points touch or lie on both sides of the line through an edge
+    """
+    above = below = False
+    for x, y in points:
+        side = edge[4]*(x-edge[0]) + edge[5]*(y-edge[1])
+        if side >= 0:
+            above = True
+        if side <= 0:
+            below = True
+    return above and below
+
+class PolygonBatch:
+    def __init__(self, polygons: list):
+        """
+        Packs the model space edges and bounds of several polygons, plus their positions,
+        into arrays for the batch collision functions. The per polygon edge tables are
+        cached on each polygon, so moving a polygon never rebuilds them.
+        Polygons with fewer edges are padded.
+        Arguments:
+            polygons: a list of Polygon objects
+        """
+        self.size = len(polygons)
+        tables = [self.polygon_table(polygon) for polygon in polygons]
+        edges = max([len(table) for table in tables], default=0)
+
+        self.positions = np.array([polygon.center for polygon in polygons], dtype=float).reshape(-1, 2)
+        self.bounds = np.array([polygon._bounds for polygon in polygons], dtype=float).reshape(-1, 4)
+
+        # Edge rows are the create_edges tuples followed by a valid flag.
+        # Padded edges are flagged invalid and given a harmless length of 1.
+        table = np.zeros((self.size, edges, 9))
+        table[..., 7] = 1
+        for i, edge_table in enumerate(tables):
+            table[i, :len(edge_table)] = edge_table
+
+        self.starts = table[..., 0:2]
+        self.directions = table[..., 2:4]
+        self.normals = table[..., 4:6]
+        self.offsets = table[..., 6]
+        self.lengths = table[..., 7]
+        self.valid = table[..., 8] > 0
+
+    @staticmethod
+    def polygon_table(polygon: Polygon):
+        """Return (and cache) a polygon's model space edges as an array"""
+
+        if polygon._tables is None:
+            polygon._tables = np.array([edge + (1,) for edge in polygon._edges], dtype=float).reshape(-1, 9)
+        return polygon._tables
+
+    def __len__(self):
+        return self.size
+
+def collide_circles_polygons(centers, radii, batch: PolygonBatch):
+    """
+    Test every circle against every polygon in a few array operations.
+    Runs the same tests as Polygon.collidecircle, in each polygon's model space.
+    Arguments:
+        centers: array of circle centers, shape (n, 2)
+        radii: array of circle radii, shape (n,), or one radius for all circles
+        batch: PolygonBatch of the polygons to test
+    Returns:
+        Boolean hit matrix of shape (number of polygons, number of circles)
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), (len(centers),))
+    hits = np.zeros((len(batch), len(centers)), dtype=bool)
+    if not len(batch) or not len(centers):
+        return hits
+
+    # Broad phase: bounding box overlap of every polygon with every circle.
+    x = centers[:, 0] - batch.positions[:, 0, None]
+    y = centers[:, 1] - batch.positions[:, 1, None]
+    bounds = batch.bounds
+    overlap = ((x+radii >= bounds[:, 0, None]) & (x-radii <= bounds[:, 2, None]) &
+               (y+radii >= bounds[:, 1, None]) & (y-radii <= bounds[:, 3, None]))
+    polygon_index, circle_index = np.nonzero(overlap)
+    if not len(polygon_index):
+        return hits
+
+    # Narrow phase on the overlapping pairs only; every array below has one row per pair.
+    x = x[polygon_index, circle_index, None]
+    y = y[polygon_index, circle_index, None]
+    radius = radii[circle_index, None]
+    valid = batch.valid[polygon_index]
+    starts = batch.starts[polygon_index]
+    directions = batch.directions[polygon_index]
+    normals = batch.normals[polygon_index]
+
+    # The center is inside the polygon when it is on the inner side of every edge.
+    outside = normals[..., 0]*x + normals[..., 1]*y > batch.offsets[polygon_index]
+    center_inside = ~np.any(outside & valid, axis=1)
+
+    # Otherwise some edge has to pass within the radius of the center.
+    t = ((x-starts[..., 0])*directions[..., 0] + (y-starts[..., 1])*directions[..., 1]) / batch.lengths[polygon_index]
+    t = np.clip(t, 0, 1)
+    distances = (starts[..., 0] + t*directions[..., 0] - x)**2 + (starts[..., 1] + t*directions[..., 1] - y)**2
+    edge_hit = np.any((distances <= radius**2) & valid, axis=1)
+
+    hits[polygon_index, circle_index] = center_inside | edge_hit
+    return hits
+
+def first_circle_hits(hits):
+    """
+    Find the first circle that hits each polygon, searching from the last circle backwards
+    (the newest bullet is checked first in the game).
+    Arguments:
+        hits: hit matrix from collide_circles_polygons
+    Returns:
+        Array with one circle index per polygon, -1 where nothing hit
+    """
+    if not hits.shape[1]:
+        return np.full(hits.shape[0], -1)
+    last = hits.shape[1] - 1 - np.argmax(hits[:, ::-1], axis=1)
+    return np.where(hits.any(axis=1), last, -1)
\ No newline at end of file
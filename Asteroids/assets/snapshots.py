@@ -0,0 +1,384 @@
+"""
+Authoritative world snapshots for remote displays and spectators.
+Every tick the game state is captured into a Snapshot of fixed-size records, one NumPy record
+array per entity kind, and sent to each subscriber as a delta against the last snapshot that
+subscriber acknowledged. Only records that changed since then are sent.
+
+Asteroids and bullets move in straight lines, so their records hold an anchor (position and tick)
+and a velocity per tick rather than the current position. A record only changes when the entity
+spawns or wraps around the screen, so a moving asteroid costs nothing in a delta frame.
+Receivers compute positions with Snapshot.positions().
+"""
+
+import socket
+import struct
+import time
+import numpy as np
+
+SNAPSHOT_VERSION = 1
+NO_BASELINE = 0xFFFFFFFF  # Baseline tick of a full (non-delta) frame.
+
+DEAD = 0x01
+SAFE = 0x02
+SIZES = ["L", "M", "S"]
+
+SHIP_DTYPE = np.dtype([("id", "<u4"), ("flags", "<u1"), ("x", "<f4"), ("y", "<f4"),
+                       ("angle", "<f4"), ("score", "<i4")])
+ASTEROID_DTYPE = np.dtype([("id", "<u4"), ("shape", "<u1"), ("size", "<u1"), ("tick", "<u4"),
+                           ("x", "<f4"), ("y", "<f4"), ("vx", "<f4"), ("vy", "<f4")])
+BULLET_DTYPE = np.dtype([("id", "<u4"), ("owner", "<u4"), ("tick", "<u4"),
+                         ("x", "<f4"), ("y", "<f4"), ("vx", "<f4"), ("vy", "<f4")])
+KINDS = ["ships", "asteroids", "bullets"]
+DTYPES = {"ships": SHIP_DTYPE, "asteroids": ASTEROID_DTYPE, "bullets": BULLET_DTYPE}
+
+# version, tick, baseline tick, time left in ms, then changed and removed counts for each kind, names.
+HEADER = struct.Struct("<BIIi7H")
+NAME = struct.Struct("<IB")  # Ship ID and name length, followed by the UTF-8 name.
+
+# Snapshot is the world state at one tick. Each kind is a record array sorted by ID.
+class Snapshot:
+    def __init__(self, tick, time_left, ships, asteroids, bullets, names):
+        """
+        :param tick: Simulation tick the state was captured on.
+        :param time_left: Seconds left in the game.
+        :param names: dict of ship ID -> device ID.
+        """
+        self.tick = tick
+        self.time_left = time_left
+        self.ships = ships
+        self.asteroids = asteroids
+        self.bullets = bullets
+        self.names = names
+
+    def records(self, kind):
+        return getattr(self, kind)
+
+    def subset(self, ids):
+        """
+        The part of the snapshot a single receiver is told about.
+        :param ids: dict of kind -> IDs to keep.
+        :return: Snapshot
+        """
+        kinds = {}
+        for kind in KINDS:
+            records = self.records(kind)
+            kinds[kind] = records[np.isin(records["id"], np.fromiter(ids.get(kind, ()), dtype="<u4"))]
+        names = {ship: name for ship, name in self.names.items() if ship in set(kinds["ships"]["id"].tolist())}
+        return Snapshot(self.tick, self.time_left, kinds["ships"], kinds["asteroids"], kinds["bullets"], names)
+
+    def positions(self, kind):
+        """Current (x, y) of every asteroid or bullet, extrapolated from its anchor."""
+        records = self.records(kind)
+        elapsed = self.tick - records["tick"].astype(np.float64)
+        return np.column_stack((records["x"] + records["vx"]*elapsed, records["y"] + records["vy"]*elapsed))
+
+    def __eq__(self, other):
+        return (self.tick == other.tick and self.time_left == other.time_left and self.names == other.names
+                and all(np.array_equal(self.records(kind), other.records(kind)) for kind in KINDS))
+
+def _sorted(records):
+    return records[np.argsort(records["id"], kind="stable")]
+
+def _delta(current, baseline):
+    """
+    Compare two record arrays sorted by ID.
+    :return: (records in current that are new or differ from baseline, IDs in baseline missing from current)
+    """
+    if baseline is None or not len(baseline):
+        return current, np.zeros(0, dtype="<u4")
+    index = np.searchsorted(baseline["id"], current["id"])
+    index[index == len(baseline)] = 0
+    matched = baseline[index]
+    same = (matched["id"] == current["id"]) & (matched == current)
+    removed = baseline["id"][~np.isin(baseline["id"], current["id"], assume_unique=True)]
+    return current[~same], removed.astype("<u4")
+
+def _apply(baseline, changed, removed):
+    """Rebuild a record array from its baseline and a delta."""
+    kept = baseline[~np.isin(baseline["id"], np.concatenate((removed, changed["id"])))]
+    return _sorted(np.concatenate((kept, changed)))
+
+# SnapshotEncoder turns the live game into Snapshots and Snapshots into frames.
+class SnapshotEncoder:
+    def __init__(self):
+        self.ship_ids = {}  # device_id -> ship ID, kept for the whole session.
+        self.anchors = {"asteroids": {}, "bullets": {}}  # ID -> anchor record of the last snapshot.
+
+    def _anchor(self, kind, ids, x, y, vx, vy, tick):
+        """
+        Reuse each entity's previous anchor while it still predicts the entity's position to within
+        a hundredth of a pixel, otherwise start a new anchor at the current position.
+        """
+        dtype = DTYPES[kind]
+        anchors = self.anchors[kind]
+        records = []
+        for i, x_now, y_now, x_vel, y_vel in zip(ids, x, y, vx, vy):
+            anchor = anchors.get(i)
+            if anchor is not None and anchor["vx"] == np.float32(x_vel) and anchor["vy"] == np.float32(y_vel):
+                elapsed = tick - int(anchor["tick"])
+                if (abs(float(anchor["x"]) + float(anchor["vx"])*elapsed - x_now) < 0.01 and
+                        abs(float(anchor["y"]) + float(anchor["vy"])*elapsed - y_now) < 0.01):
+                    records.append(anchor)
+                    continue
+            records.append(None)
+        # Entities without a usable anchor are anchored where they are now.
+        fresh = [k for k, record in enumerate(records) if record is None]
+        result = np.zeros(len(ids), dtype=dtype)
+        if len(ids):
+            kept = [k for k, record in enumerate(records) if record is not None]
+            if kept:
+                result[kept] = np.array([records[k] for k in kept], dtype=dtype)
+            result["id"][fresh] = [ids[k] for k in fresh]
+            result["tick"][fresh] = tick
+            result["x"][fresh] = [x[k] for k in fresh]
+            result["y"][fresh] = [y[k] for k in fresh]
+            result["vx"][fresh] = [vx[k] for k in fresh]
+            result["vy"][fresh] = [vy[k] for k in fresh]
+        self.anchors[kind] = {int(record["id"]): record for record in result}
+        return result
+
+    def capture(self, game):
+        """
+        Capture the state of an Asteroids_Game after a tick.
+        :return: Snapshot
+        """
+        tick = game.tick_count
+        dt = game.BASE_RATE / game.SIM_RATE
+
+        ships = np.zeros(len(game.players), dtype=SHIP_DTYPE)
+        for k, (device_id, player) in enumerate(game.players.items()):
+            if device_id not in self.ship_ids:
+                self.ship_ids[device_id] = len(self.ship_ids)
+            ships[k] = (self.ship_ids[device_id], (DEAD if player.dead else 0) | (SAFE if player.safe else 0),
+                        player.center[0], player.center[1], player.angle, player.score)
+        names = {self.ship_ids[device_id]: device_id for device_id in game.players}
+
+        rocks = game.asteroids.asteroids
+        asteroids = self._anchor("asteroids", [rock[7] for rock in rocks],
+                                 [rock[0].center[0] for rock in rocks], [rock[0].center[1] for rock in rocks],
+                                 [rock[1]*dt for rock in rocks], [rock[2]*dt for rock in rocks], tick)
+        asteroids["shape"] = [rock[6] for rock in rocks]
+        asteroids["size"] = [SIZES.index(rock[3]) for rock in rocks]
+        # The anchor records above are shared with the next capture, so keep them in step.
+        for record in asteroids:
+            self.anchors["asteroids"][int(record["id"])] = record
+
+        pool = game.bullets.bullets
+        state = pool.state[:pool.count]
+        owners = [self.ship_ids.setdefault(device_id, len(self.ship_ids)) for device_id in pool.owners]
+        bullets = self._anchor("bullets", pool.ids[:pool.count].tolist(), state[:, 0].tolist(), state[:, 1].tolist(),
+                               (state[:, 2]*dt).tolist(), (state[:, 3]*dt).tolist(), tick)
+        if pool.count:
+            bullets["owner"] = np.array(owners, dtype="<u4")[pool.owner[:pool.count]]
+            for record in bullets:
+                self.anchors["bullets"][int(record["id"])] = record
+
+        return Snapshot(tick, game.time_left, _sorted(ships), _sorted(asteroids), _sorted(bullets), names)
+
+    def encode(self, snapshot, baseline=None):
+        """
+        Encode a snapshot as a frame, as a delta against baseline when one is given.
+        :return: bytes
+        """
+        header = [SNAPSHOT_VERSION, snapshot.tick, NO_BASELINE if baseline is None else baseline.tick,
+                  int(round(snapshot.time_left*1000))]
+        body = []
+        for kind in KINDS:
+            changed, removed = _delta(snapshot.records(kind), None if baseline is None else baseline.records(kind))
+            header += [len(changed), len(removed)]
+            body += [changed.tobytes(), removed.tobytes()]
+        # Names are only sent for ships the receiver has not seen yet.
+        known = {} if baseline is None else baseline.names
+        names = [(ship, name) for ship, name in snapshot.names.items() if known.get(ship) != name]
+        header.append(len(names))
+        for ship, name in names:
+            name = name.encode()[:255]
+            body.append(NAME.pack(ship, len(name)) + name)
+        return HEADER.pack(*header) + b"".join(body)
+
+def frame_ticks(frame):
+    """(tick, baseline tick) of a frame; the baseline is None for a full frame."""
+    version, tick, baseline, *rest = HEADER.unpack_from(frame)
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    return tick, None if baseline == NO_BASELINE else baseline
+
+def decode(frame, baseline=None):
+    """
+    Decode a frame.
+    :param baseline: The Snapshot the frame was encoded against, required for delta frames.
+    :return: Snapshot
+    """
+    version, tick, baseline_tick, time_left, *counts = HEADER.unpack_from(frame)
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    if baseline_tick != NO_BASELINE and (baseline is None or baseline.tick != baseline_tick):
+        raise ValueError(f"frame for tick {tick} needs the snapshot of tick {baseline_tick}")
+    offset = HEADER.size
+    kinds = {}
+    for k, kind in enumerate(KINDS):
+        changed_count, removed_count = counts[2*k], counts[2*k+1]
+        dtype = DTYPES[kind]
+        changed = np.frombuffer(frame, dtype=dtype, count=changed_count, offset=offset)
+        offset += changed_count * dtype.itemsize
+        removed = np.frombuffer(frame, dtype="<u4", count=removed_count, offset=offset)
+        offset += removed_count * 4
+        if baseline_tick == NO_BASELINE:
+            kinds[kind] = _sorted(changed.copy())
+        else:
+            kinds[kind] = _apply(baseline.records(kind), changed, removed)
+    names = {} if baseline_tick == NO_BASELINE else dict(baseline.names)
+    for i in range(counts[6]):
+        ship, length = NAME.unpack_from(frame, offset)
+        offset += NAME.size
+        names[ship] = frame[offset:offset+length].decode()
+        offset += length
+    # Names of ships that left are dropped.
+    names = {ship: name for ship, name in names.items() if ship in set(kinds["ships"]["id"].tolist())}
+    return Snapshot(tick, time_left / 1000, kinds["ships"], kinds["asteroids"], kinds["bullets"], names)
+
+# State the server keeps for one subscriber.
+class _Subscriber:
+    def __init__(self, viewer, now):
+        self.viewer = viewer  # Device ID whose area of interest is sent, or None for the whole world.
+        self.acked = None  # Newest tick acknowledged.
+        self.seen = now  # time.monotonic() of the last message.
+        self.sent = {}  # tick -> Snapshot sent, for viewers, whose snapshots differ from the world's.
+
+# SnapshotServer sends a delta frame to every subscriber after each tick.
+# Subscribers send b"S" to join, b"A" + uint32 tick to acknowledge a frame and b"U" to leave.
+# b"S" followed by a device ID subscribes to only what that player's ship can see, when the
+# server has an InterestManager.
+# It runs on the game loop's thread: the socket is non-blocking, so reading acks and sending
+# frames never waits.
+class SnapshotServer:
+    ACK = struct.Struct("<cI")
+
+    def __init__(self, host="0.0.0.0", port=5006, history=64, timeout=5.0, interest=None):
+        """
+        :param port: UDP port subscribers send to; 0 picks a free one (see address).
+        :param history: Snapshots kept as possible baselines. Subscribers whose last ack is older get full frames.
+        :param timeout: Seconds without an ack after which a subscriber is dropped.
+        :param interest: Optional InterestManager limiting viewers to the entities near their ship.
+        """
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.setblocking(False)
+        self.address = self.socket.getsockname()[:2]
+        self.history = history
+        self.timeout = timeout
+        self.interest = interest
+        self.encoder = SnapshotEncoder()
+        self.snapshots = {}  # tick -> Snapshot, the last `history` ticks.
+        self.subscribers = {}  # address -> _Subscriber
+        self.bytes_sent = 0
+        self.frames_sent = 0
+
+    def poll(self):
+        """Handle every subscribe, ack and leave message waiting on the socket."""
+        now = time.monotonic()
+        while True:
+            try:
+                message, address = self.socket.recvfrom(64)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                continue  # e.g. ICMP port unreachable from a receiver that went away.
+            if message[:1] == b"S":
+                viewer = message[1:].decode(errors="replace") or None
+                subscriber = self.subscribers.get(address)
+                if subscriber is None or subscriber.viewer != viewer:
+                    subscriber = self.subscribers[address] = _Subscriber(viewer, now)
+                subscriber.seen = now
+            elif message[:1] == b"U":
+                self.subscribers.pop(address, None)
+            elif message[:1] == b"A" and len(message) == self.ACK.size and address in self.subscribers:
+                subscriber = self.subscribers[address]
+                tick = self.ACK.unpack(message)[1]
+                if subscriber.acked is None or tick > subscriber.acked:
+                    subscriber.acked = tick
+                subscriber.seen = now
+        for address in [address for address, subscriber in self.subscribers.items()
+                        if now - subscriber.seen > self.timeout]:
+            del self.subscribers[address]
+
+    def broadcast(self, game):
+        """Capture the game and send each subscriber a frame against its last acknowledged snapshot."""
+        self.poll()
+        snapshot = self.encoder.capture(game)
+        self.snapshots[snapshot.tick] = snapshot
+        self.snapshots.pop(snapshot.tick - self.history, None)
+        if not self.subscribers:
+            return
+        if self.interest is not None:
+            viewers = {subscriber.viewer for subscriber in self.subscribers.values() if subscriber.viewer is not None}
+            if viewers:
+                self.interest.update(game, viewers)
+        frames = {}  # Subscribers of the whole world acknowledging the same tick share one encoded frame.
+        for address, subscriber in self.subscribers.items():
+            if self.interest is not None and subscriber.viewer is not None:
+                # Entities entering the viewer's area are sent as new records and those leaving as removed IDs.
+                ids = {kind: [] for kind in KINDS}
+                for kind, key in self.interest.relevant(subscriber.viewer):
+                    ids[kind].append(self.encoder.ship_ids.get(key, NO_BASELINE) if kind == "ships" else key)
+                view = subscriber.sent[snapshot.tick] = snapshot.subset(ids)
+                subscriber.sent.pop(snapshot.tick - self.history, None)
+                frame = self.encoder.encode(view, subscriber.sent.get(subscriber.acked))
+            else:
+                baseline = self.snapshots.get(subscriber.acked) if subscriber.acked is not None else None
+                key = baseline.tick if baseline is not None else None
+                if key not in frames:
+                    frames[key] = self.encoder.encode(snapshot, baseline)
+                frame = frames[key]
+            try:
+                self.socket.sendto(frame, address)
+            except OSError:
+                continue
+            self.bytes_sent += len(frame)
+            self.frames_sent += 1
+
+    def close(self):
+        self.socket.close()
+
+# SnapshotClient subscribes to a SnapshotServer and rebuilds the world state from its frames.
+class SnapshotClient:
+    def __init__(self, address, history=64, viewer=None):
+        """
+        :param address: (host, port) of the SnapshotServer.
+        :param history: Decoded snapshots kept as baselines for later delta frames.
+        :param viewer: Device ID of the ship to follow, to receive only what is near it.
+        """
+        self.address = address
+        self.history = history
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.snapshots = {}  # tick -> Snapshot
+        self.latest = None
+        self.socket.sendto(b"S" + (viewer.encode() if viewer else b""), address)
+
+    def receive(self):
+        """
+        Decode every frame waiting on the socket and acknowledge each one.
+        :return: The newest Snapshot received so far, or None.
+        """
+        while True:
+            try:
+                frame = self.socket.recv(65535)
+            except (BlockingIOError, InterruptedError):
+                break
+            tick, baseline_tick = frame_ticks(frame)
+            baseline = self.snapshots.get(baseline_tick) if baseline_tick is not None else None
+            if baseline_tick is not None and baseline is None:
+                continue  # Baseline already forgotten; the server falls back to full frames.
+            snapshot = decode(frame, baseline)
+            self.snapshots[tick] = snapshot
+            for old in [old for old in self.snapshots if old <= tick - self.history]:
+                del self.snapshots[old]
+            if self.latest is None or tick > self.latest.tick:
+                self.latest = snapshot
+            self.socket.sendto(SnapshotServer.ACK.pack(b"A", tick), self.address)
+        return self.latest
+
+    def close(self):
+        self.socket.sendto(b"U", self.address)
+        self.socket.close()
@@ -0,0 +1,81 @@
+"""
+Module containing a uniform grid spatial hash for broad phase collision testing.
+The grid tiles the screen and wraps around its edges, so objects that sit in the
+off-screen wrapping margin are still bucketed next to the objects they can touch.
+"""
+
+from math import ceil
+
+class SpatialHash:
+    def __init__(self, width: int, height: int, cell_size: int=80):
+        """
+        Creates a SpatialHash object
+        Arguments:
+            width: width of the wrapping area
+            height: height of the wrapping area
+            cell_size: approximate side length of a grid cell
+        """
+        self.width, self.height = width, height
+        # Split the area into a whole number of cells so wrapping lines up exactly.
+        self.columns = max(1, ceil(width / cell_size))
+        self.rows = max(1, ceil(height / cell_size))
+        self.cell_width = width / self.columns
+        self.cell_height = height / self.rows
+        self.cells = {}
+
+    def clear(self):
+        """Remove every item from the grid"""
+
+        self.cells.clear()
+
+    def _spans(self, rect):
+        """Return the wrapped column and row indices covered by a rect"""
+
+        first_column = int(rect.left // self.cell_width)
+        last_column = int((rect.right-1) // self.cell_width)
+        if last_column - first_column + 1 >= self.columns:
+            columns = range(self.columns)
+        else:
+            columns = [i % self.columns for i in range(first_column, last_column+1)]
+
+        first_row = int(rect.top // self.cell_height)
+        last_row = int((rect.bottom-1) // self.cell_height)
+        if last_row - first_row + 1 >= self.rows:
+            rows = range(self.rows)
+        else:
+            rows = [i % self.rows for i in range(first_row, last_row+1)]
+
+        return columns, rows
+
+    def insert(self, item, rect):
+        """
+        Add an item to every cell its rect overlaps.
+        Arguments:
+            item: any hashable value
+            rect: pygame.Rect bounding the item
+        """
+        columns, rows = self._spans(rect)
+        for column in columns:
+            for row in rows:
+                cell = self.cells.get((column, row))
+                if cell is None:
+                    self.cells[(column, row)] = [item]
+                else:
+                    cell.append(item)
+
+    def query(self, rect):
+        """
+        Find the items that share at least one cell with a rect.
+        Arguments:
+            rect: pygame.Rect to search around
+        Returns:
+            A set of candidate items, which still need a narrow phase test
+        """
+        found = set()
+        columns, rows = self._spans(rect)
+        for column in columns:
+            for row in rows:
+                cell = self.cells.get((column, row))
+                if cell:
+                    found.update(cell)
+        return found
@@ -1,109 +1,171 @@
 from numpy import angle
+import numpy as np
 import pygame
 from pygame.locals import *
-from math import cos, sin, radians
+from math import cos, sin, radians, hypot
 import random
+import hashlib
 from assets.shapes import *
+from assets.particles import ParticleSystem
+from assets.history import AsteroidHistory
+from assets.render_cache import SpriteCache, render_outline
+from assets.resources import LazySound
 
-pygame.mixer.init()  # Initialize the mixer module for playing sounds.
+# Pre-rendered asteroid outlines, keyed by (shape index, size label).
+ASTEROID_SPRITES = SpriteCache()
+# Ship colors, keyed by device ID, so a ship that respawns or rejoins does not hash its ID again.
+SHIP_COLORS = {}
+
+def ship_color(device_id):
+    """
+    Unique color for a device, taken from the MD5 hash of its ID.
+    :return: (r, g, b)
+    """
+    color = SHIP_COLORS.get(device_id)
+    if color is None:
+        hash_val = int(hashlib.md5(device_id.encode()).hexdigest(), 16)
+        color = SHIP_COLORS[device_id] = ((hash_val & 0xFF0000) >> 16,
+                                          (hash_val & 0x00FF00) >> 8,
+                                          hash_val & 0x0000FF)
+    return color
+
+def ship_column(name, kind=None):
+    """
+    Property of a Player kept in its row of a ShipKinematics column.
+    :param kind: Type scalar values are read as; vector columns are read as a view of the row.
+    """
+    if kind is None:
+        def get(self):
+            return getattr(self.ships, name)[self.row]
+    else:
+        def get(self):
+            return kind(getattr(self.ships, name)[self.row])
+
+    def set(self, value):
+        getattr(self.ships, name)[self.row] = value
+    return property(get, set)
 
 # Player class represents the ship controlled by a player.
+# Everything that is the same for every ship lives on the class, and __slots__ keeps the
+# per-ship state small, so games can hold hundreds of players.
+# The kinematic state (center, angle, velocity, controls, safe timer, death flag) lives in the
+# player's row of a ShipKinematics store, which moves every ship at once.
 class Player:
-    def __init__(self, width, height, device_id="local"):
+    __slots__ = ("width", "height", "device_id", "color", "ships", "row", "_body", "_top", "max_vel", "direction",
+                 "visible", "death_timer", "angles", "score", "bonus_threshold_count")
+    FRAMES = None  # Cached rotation frames of the ship's body, built by the first player.
+    REACH = None  # Furthest any part of the body gets from the ship's center, in pixels.
+    ROTATION = 4  # How many degrees the ship rotates per update.
+    VEL = 5  # Maximum velocity.
+    # Health is not used in a time-based game; a dummy value is assigned.
+    health = 999
+    # Predefined movement adjustments for each line during the death animation.
+    MOVEMENTS = [[-0.5, -0.5], [0.5, -0.5], [0, 0.5]]
+
+    center = ship_column("center")  # [x, y]
+    angle = ship_column("angle", float)  # Rotation in degrees, 0 to 359.
+    vector = ship_column("vector")  # Current velocity.
+    displacement = ship_column("displacement")  # How far the ship moved in the last tick, used to interpolate drawing.
+    turn = ship_column("turn", float)  # Degrees per update to turn by on the next ShipKinematics step.
+    thrust = ship_column("thrust", bool)  # Accelerate on the next ShipKinematics step.
+    safe = ship_column("safe", bool)  # Indicates if the player is in invulnerable (safe) mode.
+    timer = ship_column("timer", float)  # Timer for safe mode duration.
+    dead = ship_column("dead", bool)  # Indicates if the player is dead.
+    stale = ship_column("stale", bool)  # Set when the center or angle changed and the body has not been placed since.
+
+    def __init__(self, width, height, device_id="local", ships=None):
+        """
+        :param ships: ShipKinematics store the ship is moved by; by default the ship gets a store of its own.
+                      A ship replacing one of the same device, as on a respawn, takes over its row.
+        """
         self.width, self.height = width, height  # Store game dimensions.
         self.device_id = device_id  # Device identifier.
+        self.ships = ships if ships is not None else ShipKinematics(width, height, 1)
+        self.row = self.ships.add(device_id)  # Starts out still, at angle 0, with no controls.
 
-        # Generate a unique color based on the device_id using MD5 hashing.
-        import hashlib
-        hash_val = int(hashlib.md5(device_id.encode()).hexdigest(), 16)
-        self.color = ((hash_val & 0xFF0000) >> 16,
-                      (hash_val & 0x00FF00) >> 8,
-                      hash_val & 0x0000FF)
+        # Generate a unique color based on the device_id.
+        self.color = ship_color(device_id)
 
         # Build the ship's shape from three points (forming a triangle).
         # The ship is centered and its shape is determined by these three points.
-        self.center = list(coords_to_rect([
+        center = list(coords_to_rect([
             [width/2, height/2-50],
             [width/2-25, height/2+20],
             [width/2+25, height/2+20]
         ]).center)
+        self.center = center
         # Create three line segments for the ship's body and enlarge them.
-        self.body = [
-            Line([[width/2, height/2-50], [width/2-25, height/2+20]]).enlarge(0.6, self.center),
-            Line([[width/2, height/2-50], [width/2+25, height/2+20]]).enlarge(0.6, self.center),
-            Line([[width/2-20, height/2+4], [width/2+20, height/2+4]]).enlarge(0.6, self.center)
+        self._body = [
+            Line([[width/2, height/2-50], [width/2-25, height/2+20]]).enlarge(0.6, center),
+            Line([[width/2, height/2-50], [width/2+25, height/2+20]]).enlarge(0.6, center),
+            Line([[width/2-20, height/2+4], [width/2+20, height/2+4]]).enlarge(0.6, center)
         ]
         # Determine the top point of the ship (the tip of the triangle).
-        self.top = enlarge_coord([width/2, height/2-50], 0.6, self.center)
+        self._top = enlarge_coord([width/2, height/2-50], 0.6, center)
+        # Every ship has the same shape, so one cache of rotated body frames is shared by all players.
+        if Player.FRAMES is None:
+            Player.FRAMES = RotationFrames(self._body, [self._top], center)
+            # Turning keeps every point at the same distance from the center.
+            Player.REACH = max(hypot(coord[0]-center[0], coord[1]-center[1])
+                               for line in self._body for coord in line.coordinates[0:2]) + 1
 
-        self.angle = 0  # Starting rotation angle.
-        self.ROTATION = 4  # How many degrees the ship rotates per update.
-
-        self.VEL = 5  # Maximum velocity.
-        self.vector = [0, 0]  # Current velocity vector.
         self.max_vel = [0, 0]  # Maximum velocity components based on current angle.
         self.direction = [1, 1]  # Direction multipliers for x and y axes.
 
-        self.safe = False  # Indicates if the player is in invulnerable (safe) mode.
-        self.timer = 0  # Timer for safe mode duration.
         self.visible = True  # Visibility flag for drawing.
-
-        # Health is not used in a time-based game; a dummy value is assigned.
-        self.health = 999  
-        self.HEALTH_IMG = pygame.image.load("assets/images/health bar.png")
-        self.HEALTH_IMG.set_colorkey((0, 0, 0))
-        self.dead = False  # Indicates if the player is dead.
         self.death_timer = 180  # Timer used during the death animation.
-        # Predefined movement adjustments for each line during the death animation.
-        self.movements = [[-0.5, -0.5], [0.5, -0.5], [0, 0.5]]
+        self.angles = None  # Spin of each body line during the death animation.
         
         # Score and bonus counter for tracking performance.
         self.score = 0
         self.bonus_threshold_count = 1
 
-    def death(self):
+    def death(self, dt=1, rng=random):
         """
         Run the death animation for the player.
         The animation rotates and moves each part of the ship.
         Returns a tuple with the player's health and a flag indicating if the animation is complete.
+        :param dt: Length of the tick in 60 Hz frames.
+        :param rng: Source of the random spins, e.g. the "debris" stream of RandomStreams.
         """
         if self.death_timer == 180:
             # Choose random rotation values for each line on the first frame of death.
-            self.angles = [random.choice([-3, 3]),
-                           random.choice([-3, 3]),
-                           random.choice([-3, 3])]
+            self.angles = [rng.choice([-3, 3]),
+                           rng.choice([-3, 3]),
+                           rng.choice([-3, 3])]
         # Apply movement and rotation for each line in the ship's body.
         for i, line in enumerate(self.body):
-            line.move(self.movements[i][0], self.movements[i][1])
-            line.rotate(self.angles[i])
-        self.death_timer -= 1  # Decrement death animation timer.
+            line.move(self.MOVEMENTS[i][0]*dt, self.MOVEMENTS[i][1]*dt)
+            # Spin the line in place with the shared body frames rather than rotating it again.
+            # The line keeps the exact angle, so spins smaller than a frame step still add up.
+            angle = line.angle + self.angles[i]*dt
+            line.apply_frame(self.FRAMES.frame(angle)[0][i][1], line.center, angle)
+        self.death_timer -= dt  # Decrement death animation timer.
         if self.death_timer <= 0:
             self.dead = False  # Reset death flag after animation ends.
             self.death_timer = 180  # Reset timer for future use.
             return self.health, True  # Animation finished.
         return self.health, False  # Animation still in progress.
 
-    def move(self, move):
+    def move(self, move, left=False, right=False, dt=1):
         """
         Handle player movement including rotation, acceleration, deceleration, and screen wrapping.
         :param move: Boolean indicating if the ship should accelerate.
+        :param left: Boolean indicating if the ship should turn left.
+        :param right: Boolean indicating if the ship should turn right.
+        :param dt: Length of the tick in 60 Hz frames; the constants above are per 60 Hz frame.
         """
-        keys = pygame.key.get_pressed()
-        if keys[K_LEFT]:
-            self.angle -= self.ROTATION
+        if left:
+            self.angle -= self.ROTATION*dt
             if self.angle < 0:
                 self.angle += 360  # Keep angle within 0-359 degrees.
-            # Rotate each line in the body to reflect the change in angle.
-            for line in self.body:
-                line.rotate(-self.ROTATION, self.center)
-            self.top = rotate_coord(self.top, -self.ROTATION, self.center)
-        if keys[K_RIGHT]:
-            self.angle += self.ROTATION
+        if right:
+            self.angle += self.ROTATION*dt
             if self.angle >= 360:
                 self.angle -= 360
-            for line in self.body:
-                line.rotate(self.ROTATION, self.center)
-            self.top = rotate_coord(self.top, self.ROTATION, self.center)
+        if left or right:
+            # Swap the body lines to the cached frame for the new angle.
+            self.pose()
         
         # Determine maximum velocity based on the current rotation angle.
         self.max_vel = [self.VEL*sin(radians(self.angle)),
@@ -114,8 +176,8 @@ class Player:
         
         if move:
             # Accelerate the ship gradually when movement is active.
-            self.vector[0] += self.max_vel[0]*0.02
-            self.vector[1] += self.max_vel[1]*0.02
+            self.vector[0] += self.max_vel[0]*0.02*dt
+            self.vector[1] += self.max_vel[1]*0.02*dt
             # Clamp velocity to the maximum values.
             if (self.vector[0] > self.max_vel[0] and self.direction[0] > 0) or \
                (self.vector[0] < self.max_vel[0] and self.direction[0] < 0):
@@ -125,8 +187,8 @@ class Player:
                 self.vector[1] = self.max_vel[1]
         else:
             # Decelerate the ship when movement is not active.
-            self.vector[0] -= self.max_vel[0]*0.005
-            self.vector[1] -= self.max_vel[1]*0.005
+            self.vector[0] -= self.max_vel[0]*0.005*dt
+            self.vector[1] -= self.max_vel[1]*0.005*dt
             # Stop movement if velocity reverses sign.
             if (self.vector[0] < 0 and self.direction[0] > 0) or \
                (self.vector[0] > 0 and self.direction[0] < 0):
@@ -136,10 +198,11 @@ class Player:
                 self.vector[1] = 0
         
         # Update the position of each part of the ship by adding the current velocity.
+        self.displacement = [self.vector[0]*dt, self.vector[1]*dt]
         for line in self.body:
-            line.move(self.vector[0], self.vector[1])
-        self.top = [self.top[0]+self.vector[0], self.top[1]+self.vector[1]]
-        self.center = [self.center[0]+self.vector[0], self.center[1]+self.vector[1]]
+            line.move(self.displacement[0], self.displacement[1])
+        self.top = [self.top[0]+self.displacement[0], self.top[1]+self.displacement[1]]
+        self.center = [self.center[0]+self.displacement[0], self.center[1]+self.displacement[1]]
         
         # --- Screen Wrapping for Player ---
         dx, dy = 0, 0
@@ -163,103 +226,424 @@ class Player:
                 line.move(dx, dy)
             self.top = [self.top[0] + dx, self.top[1] + dy]
         # -----------------------------------
+        # The safe timer is counted down once a tick, in update().
 
-        # If the player is in safe mode, decrement the timer.
-        if self.safe:
-            self.timer -= 1
-            if self.timer <= 0:
-                self.safe = False
+    @property
+    def body(self):
+        """The ship's body lines, placed for its current center and angle."""
+        if self.stale:
+            self.pose()
+        return self._body
+
+    @property
+    def top(self):
+        """The tip of the ship, where bullets are fired from."""
+        if self.stale:
+            self.pose()
+        return self._top
+    @top.setter
+    def top(self, top):
+        self._top = top
+
+    def steer(self, turn=0, thrust=False):
+        """
+        Set the controls the next ShipKinematics step applies to this ship.
+        :param turn: Degrees to turn per update; negative turns left.
+        :param thrust: Accelerate forward.
+        """
+        ships = self.ships
+        ships.turn[self.row] = turn
+        ships.thrust[self.row] = thrust
+
+    @classmethod
+    def tilt_rate(cls, angle_value):
+        """
+        Degrees per update a remote tilt turns the ship by, scaled relative to a base tilt value (15).
+        Tilts under 1 are ignored.
+        """
+        if abs(angle_value) < 1:
+            return 0
+        rotation_amount = cls.ROTATION * (abs(angle_value) / 15.0)
+        return rotation_amount if angle_value > 0 else -rotation_amount
 
-    def update(self):
+    def update(self, dt=1):
         """
         Update player status; currently used to manage the safe mode timer.
+        :param dt: Length of the tick in 60 Hz frames.
         """
+        self.displacement = [0, 0]  # Set again by move() if the ship moves this tick.
         if self.safe:
-            self.timer -= 1
+            self.timer -= dt
             if self.timer <= 0:
                 self.safe = False
 
-    def draw(self, surface):
+    def draw(self, surface, alpha=1.0):
         """
         Draw the player's ship on the given surface.
         Blinks the sprite if in safe mode to indicate invulnerability.
+        :param alpha: How far between the previous and the latest tick to draw, from 0 to 1.
+        :return: List of rects that were drawn to.
         """
         if self.safe and not self.dead and (self.timer % 25 < 12):
             draw_sprite = False  # Skip drawing to create a blinking effect.
         else:
             draw_sprite = True
         if draw_sprite:
-            for line in self.body:
-                line.aadraw(surface, self.color)
+            offset = None
+            if alpha != 1:
+                offset = ((alpha-1)*self.displacement[0], (alpha-1)*self.displacement[1])
+            return [line.aadraw(surface, self.color, offset) for line in self.body]
+        return []
 
-    def apply_remote_tilt(self, angle_value):
+    def apply_remote_tilt(self, angle_value, dt=1):
         """
         Adjust the player's rotation based on a remote tilt value.
         Positive values rotate right; negative values rotate left.
         The rotation amount is scaled relative to a base tilt value (15).
+        :param dt: Length of the tick in 60 Hz frames.
         """
-        if abs(angle_value) < 1:
+        rotation_amount = self.tilt_rate(angle_value)
+        if not rotation_amount:
             return
-        # Determine the scaled rotation amount.
-        rotation_amount = self.ROTATION * (abs(angle_value) / 15.0)
-        if angle_value > 0:
-            self.angle += rotation_amount
-            for line in self.body:
-                line.rotate(rotation_amount, self.center)
-            self.top = rotate_coord(self.top, rotation_amount, self.center)
-        else:
-            self.angle -= rotation_amount
-            for line in self.body:
-                line.rotate(-rotation_amount, self.center)
-            self.top = rotate_coord(self.top, -rotation_amount, self.center)
+        self.angle = (self.angle + rotation_amount*dt) % 360  # Keep angle within 0-359 degrees.
+        self.stale = True  # The body is placed for the new angle the next time it is used.
+
+    def pose(self):
+        """
+        Place the body lines and the tip of the ship for its current angle.
+        The rotated geometry comes from the shared rotation frames, so this is a lookup
+        and a translation rather than a rotation of every line.
+        """
+        lines, points = self.FRAMES.frame(self.angle)
+        for line, (offset, geometry) in zip(self._body, lines):
+            line.apply_frame(geometry, (self.center[0]+offset[0], self.center[1]+offset[1]))
+        self._top = [self.center[0]+points[0][0], self.center[1]+points[0][1]]
+        self.stale = False
+
+# ShipKinematics holds the kinematic state of every ship in NumPy arrays, one row per ship, and moves
+# every living ship in one vectorized pass, with the same turning, acceleration, clamping, deceleration,
+# and screen wrapping as Player.move; update() counts the safe timers down as Player.update does.
+# Each Player reads and writes its own row (see ship_column), so a step works on the arrays in place
+# with nothing gathered from or written back to the players. Body lines are placed lazily, the next
+# time a ship that moved is drawn or tested.
+class ShipKinematics:
+    # Column name -> (dtype, values per ship).
+    COLUMNS = {"angle": (float, 1), "turn": (float, 1), "timer": (float, 1), "thrust": (bool, 1), "safe": (bool, 1),
+               "dead": (bool, 1), "stale": (bool, 1), "used": (bool, 1), "center": (float, 2), "vector": (float, 2),
+               "displacement": (float, 2)}
+
+    def __init__(self, width, height, capacity=64):
+        """
+        :param capacity: Rows allocated up front; the arrays double whenever more ships join.
+        """
+        self.width, self.height = width, height
+        self.rows = {}  # device_id -> row.
+        self.device_ids = []  # Device ID of each row handed out, None once released.
+        self.free = []  # Rows of ships that left, handed out again before new ones.
+        self.size = 0  # Rows handed out so far; steps only look at the arrays up to here.
+        self.capacity = 0
+        self.grow(capacity)
+
+    def grow(self, capacity):
+        """Reallocate every column with room for capacity rows, keeping the rows in use."""
+        for name, (dtype, width) in self.COLUMNS.items():
+            column = np.zeros((capacity,) if width == 1 else (capacity, width), dtype=dtype)
+            if self.capacity:
+                column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def add(self, device_id):
+        """
+        Give a ship a row, cleared to a still ship at angle 0 with no controls.
+        A device that already has a row keeps it.
+        :return: The row.
+        """
+        row = self.rows.get(device_id)
+        if row is None:
+            if self.free:
+                row = self.free.pop()
+            else:
+                if self.size == self.capacity:
+                    self.grow(2*self.capacity)
+                row = self.size
+                self.size += 1
+                self.device_ids.append(None)
+            self.rows[device_id] = row
+            self.device_ids[row] = device_id
+        for name in self.COLUMNS:
+            getattr(self, name)[row] = 0
+        self.used[row] = True
+        return row
+
+    def release(self, device_id):
+        """Free the row of a ship that left the game."""
+        row = self.rows.pop(device_id, None)
+        if row is not None:
+            self.used[row] = False
+            self.device_ids[row] = None
+            self.free.append(row)
+
+    def dying(self):
+        """Device IDs of the ships that are dead and playing their death animation."""
+        dead = np.flatnonzero(self.dead[:self.size] & self.used[:self.size])
+        return {self.device_ids[row] for row in dead.tolist()} if len(dead) else set()
+
+    def targets(self, players):
+        """
+        The ships asteroids can hit, those neither dead nor safe, with their centers read straight from the rows.
+        :param players: Iterable of Player objects with rows in this store.
+        :return: (list of Player objects, array of their centers with shape (n, 2))
+        """
+        players = list(players)
+        rows = np.fromiter((player.row for player in players), dtype=np.intp, count=len(players))
+        hittable = np.flatnonzero(~self.dead[rows] & ~self.safe[rows])
+        return [players[k] for k in hittable.tolist()], self.center[rows[hittable]]
+
+    def update(self, dt=1):
+        """
+        Player.update for every ship at once: forget the last tick's displacement and count the safe timers down.
+        :param dt: Length of the tick in 60 Hz frames.
+        """
+        n = self.size
+        self.displacement[:n] = 0
+        safe = self.safe[:n] & self.used[:n]
+        timer = self.timer[:n]
+        timer[safe] -= dt
+        self.safe[:n][safe] = timer[safe] > 0
+
+    def step(self, dt=1):
+        """
+        Apply each ship's controls (see Player.steer) and move it, then clear the controls.
+        Dead ships are left to their death animation.
+        :param dt: Length of the tick in 60 Hz frames.
+        """
+        n = self.size
+        active = self.used[:n] & ~self.dead[:n]
+        if not active.any():
+            return
+        angle, turn, thrust = self.angle[:n], self.turn[:n], self.thrust[:n] & active
+        vector, center = self.vector[:n], self.center[:n]
+
+        turned = (turn != 0) & active
+        new_angle = np.where(turned, (angle + turn*dt) % 360, angle)  # Keep angle within 0-359 degrees.
+        new_angle[new_angle >= 360] -= 360  # A tiny negative angle comes out of the modulo as 360.
+
+        # Maximum velocity and direction multipliers for the current angles.
+        rotation = np.radians(new_angle)
+        max_vel = np.column_stack((Player.VEL*np.sin(rotation), -Player.VEL*np.cos(rotation)))
+        direction = np.column_stack((np.where((0 < new_angle) & (new_angle < 180), 1, -1),
+                                     np.where((90 < new_angle) & (new_angle < 270), 1, -1)))
+        # Accelerate and clamp to the maximum velocity, or decelerate and stop when the velocity reverses.
+        accelerated = vector + max_vel*0.02*dt
+        accelerated = np.where(((accelerated > max_vel) & (direction > 0)) | ((accelerated < max_vel) & (direction < 0)),
+                               max_vel, accelerated)
+        decelerated = vector - max_vel*0.005*dt
+        decelerated = np.where(((decelerated < 0) & (direction > 0)) | ((decelerated > 0) & (direction < 0)),
+                               0, decelerated)
+        moving = (vector != 0).any(axis=1)  # Ships still coasting may come to a stop.
+        new_vector = np.where(thrust[:, None], accelerated, decelerated)
+
+        displacement = new_vector*dt
+        new_center = center + displacement
+        # Screen wrapping, a little past the edges so the ship is fully off screen first.
+        new_center[:, 0] = np.where(new_center[:, 0] > self.width + 31, -31,
+                                    np.where(new_center[:, 0] < -31, self.width + 31, new_center[:, 0]))
+        new_center[:, 1] = np.where(new_center[:, 1] > self.height + 43, -43,
+                                    np.where(new_center[:, 1] < -43, self.height + 43, new_center[:, 1]))
+        moved = active & (turned | (displacement != 0).any(axis=1))
+
+        # Only the ships that had controls or were moving change; a ship at rest keeps its exact state.
+        changed = active & (moved | moving | thrust)
+        vector[changed] = new_vector[changed]
+        angle[moved] = new_angle[moved]
+        self.displacement[:n][moved] = displacement[moved]
+        center[moved] = new_center[moved]
+        self.stale[:n] |= moved
+        turn[active] = 0
+        self.thrust[:n][active] = False
+
+# BulletPool stores every live bullet in preallocated NumPy arrays (struct of arrays).
+class BulletPool:
+    def __init__(self, capacity=512, radius=2.5):
+        """
+        :param capacity: Maximum number of bullets alive at once.
+        :param radius: Radius shared by every bullet.
+        """
+        self.capacity = capacity
+        self.radius = radius
+        self.count = 0  # Live bullets occupy rows 0 to count-1, oldest first.
+        self.dt = 1  # Length of the last step, used to interpolate drawing.
+        # Columns: x, y, x velocity, y velocity.
+        self.state = np.zeros((capacity, 4))
+        self.owner = np.zeros(capacity, dtype=np.int32)  # Index into self.owners.
+        self.ids = np.zeros(capacity, dtype=np.int64)  # Identifier of each bullet, so it can be followed across ticks.
+        self.next_id = 0
+        self.alive = np.ones(capacity, dtype=bool)
+        # Scratch buffers so compaction does not allocate.
+        self._state_scratch = np.zeros((capacity, 4))
+        self._owner_scratch = np.zeros(capacity, dtype=np.int32)
+        self._ids_scratch = np.zeros(capacity, dtype=np.int64)
+        self._keep = np.zeros(capacity, dtype=bool)
+        self.owners = []  # Device ID for each owner index.
+        self._owner_index = {}
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def positions(self):
+        """View of the live bullet centers, shape (count, 2)."""
+        return self.state[:self.count, 0:2]
+
+    def owner_id(self, index):
+        """Device ID of the player who fired the bullet at a row."""
+        return self.owners[self.owner[index]]
+
+    def spawn(self, x, y, x_vel, y_vel, device_id):
+        """
+        Add a bullet at the end of the pool.
+        :return: False if the pool is full and the bullet was dropped.
+        """
+        if self.count == self.capacity:
+            return False
+        if device_id not in self._owner_index:
+            self._owner_index[device_id] = len(self.owners)
+            self.owners.append(device_id)
+        self.state[self.count] = (x, y, x_vel, y_vel)
+        self.owner[self.count] = self._owner_index[device_id]
+        self.ids[self.count] = self.next_id
+        self.next_id += 1
+        self.alive[self.count] = True
+        self.count += 1
+        return True
+
+    def kill(self, index):
+        """Mark a bullet as spent; it is removed by the next compact()."""
+        self.alive[index] = False
+
+    def step(self, width, height, dt=1):
+        """
+        Move every bullet by its velocity, cull the ones that left the screen and compact the pool.
+        :param dt: Length of the step in 60 Hz frames.
+        """
+        self.dt = dt
+        n = self.count
+        state = self.state[:n]
+        state[:, 0:2] += state[:, 2:4]*dt
+        keep = self._keep[:n]
+        np.greater(state[:, 0], 0, out=keep)
+        keep &= state[:, 0] < width
+        keep &= state[:, 1] > 0
+        keep &= state[:, 1] < height
+        self.alive[:n] &= keep
+        self.compact()
+
+    def compact(self):
+        """Remove spent bullets while keeping the rest in firing order."""
+        n = self.count
+        alive = self.alive[:n]
+        k = int(np.count_nonzero(alive))
+        if k == n:
+            return
+        np.compress(alive, self.state[:n], axis=0, out=self._state_scratch[:k])
+        np.compress(alive, self.owner[:n], out=self._owner_scratch[:k])
+        np.compress(alive, self.ids[:n], out=self._ids_scratch[:k])
+        self.state[:k] = self._state_scratch[:k]
+        self.owner[:k] = self._owner_scratch[:k]
+        self.ids[:k] = self._ids_scratch[:k]
+        self.alive[:k] = True
+        self.count = k
+
+    def clear(self):
+        self.count = 0
 
 # Bullets class handles the creation, movement, and drawing of bullets fired by players.
 class Bullets:
-    def __init__(self, width, height):
+    def __init__(self, width, height, capacity=512):
+        """
+        :param width: Screen width.
+        :param height: Screen height.
+        :param capacity: Maximum number of bullets alive at once; shots beyond it are not fired.
+        """
         self.width, self.height = width, height  # Screen dimensions.
-        self.bullets = []  # List to store active bullets.
+        self.bullets = BulletPool(capacity)  # Pool of active bullets.
         self.VEL = 11  # Bullet velocity.
         self.key_pressed = False  # Flag to prevent multiple bullets from a single press.
-        self.FIRE_SOUND = pygame.mixer.Sound("assets/sounds/fire.wav")
-        self.FIRE_SOUND.set_volume(0.25)
+        self.pressed = set()  # Remote players holding their fire button since their last bullet.
+        self.FIRE_SOUND = LazySound("assets/sounds/fire.wav", 0.25)
 
-    def bullet_handler(self, player, fire):
+    def bullet_handler(self, player, fire, dt=1):
         """
         Update bullet positions and handle bullet creation and removal.
         :param player: The player firing the bullet.
         :param fire: Boolean flag indicating if the fire button is pressed.
+        :param dt: Length of the tick in 60 Hz frames.
         """
-        # Update each bullet's position and remove if out of screen bounds.
-        for index, bullet in reversed(list(enumerate(self.bullets))):
-            bullet[0].x += bullet[1]
-            bullet[0].y += bullet[2]
-            if not (0 < bullet[0].x < self.width) or not (0 < bullet[0].y < self.height):
-                self.bullets.pop(index)
+        # Move every bullet and remove the ones that left the screen.
+        self.bullets.step(self.width, self.height, dt)
         # If firing and a bullet hasn't already been spawned for this press, create a new bullet.
         if fire and not self.key_pressed and not player.dead:
-            self.FIRE_SOUND.play()
-            # Append a new bullet: its shape, x and y velocity, and the shooter's device ID.
-            self.bullets.append([
-                Circle(player.top, 2.5),
-                self.VEL*sin(radians(player.angle)),
-                -self.VEL*cos(radians(player.angle)),
-                player.device_id
-            ])
+            self.shoot(player)
             self.key_pressed = True
         elif not fire:
             self.key_pressed = False
 
-    def draw(self, surface):
+    def remote_fire(self, players, triggers):
+        """
+        Fire for remote players, one bullet per press of the fire button as for the local player.
+        Called after bullet_handler().
+        :param players: Dictionary of player objects.
+        :param triggers: dict of device_id -> whether the controller's fire button is down this tick.
+        """
+        for device_id, fire in triggers.items():
+            player = players.get(device_id)
+            if player is None:
+                continue
+            if fire and device_id not in self.pressed and not player.dead:
+                self.shoot(player)
+                self.pressed.add(device_id)
+            elif not fire:
+                self.pressed.discard(device_id)
+
+    def shoot(self, player):
+        """
+        Fire a bullet from the tip of a player's ship.
+        :return: False if the pool is full and no bullet was fired.
+        """
+        # Add a new bullet: its position, x and y velocity, and the shooter's device ID.
+        fired = self.bullets.spawn(player.top[0], player.top[1],
+                                   self.VEL*sin(radians(player.angle)),
+                                   -self.VEL*cos(radians(player.angle)),
+                                   player.device_id)
+        if fired:
+            self.FIRE_SOUND.play()
+        return fired
+
+    def draw(self, surface, alpha=1.0):
         """
         Draw all active bullets on the provided surface.
+        :param alpha: How far between the previous and the latest tick to draw, from 0 to 1.
+        :return: List of rects that were drawn to.
         """
-        for bullet in self.bullets:
-            bullet[0].draw(surface, (255, 255, 255))
+        radius = self.bullets.radius
+        positions = self.bullets.positions
+        if alpha != 1:
+            # Step back along each velocity to the interpolated position.
+            positions = positions - (1-alpha)*self.bullets.dt*self.bullets.state[:self.bullets.count, 2:4]
+        return [pygame.draw.circle(surface, (255, 255, 255), (x, y), radius)
+                for x, y in positions.tolist()]
 
 # Asteroids class manages asteroid spawning, movement, collision detection, and particle effects.
 class Asteroids:
-    def __init__(self, width, height):
+    def __init__(self, width, height, rng=None):
+        """
+        :param rng: RandomStreams of the match. Spawning draws from its "asteroids" stream and particle
+                    effects from its "particles" stream. Without one the global random module is used.
+        """
         self.width, self.height = width, height  # Game screen dimensions.
+        self.rng = rng.stream("asteroids") if rng is not None else random
+        particle_rng = rng.stream("particles") if rng is not None else random
         self.asteroids = []  # List to store asteroid objects.
         # Define possible spawn ranges for asteroids on the screen.
         self.spawn_range = [
@@ -279,43 +663,32 @@ class Asteroids:
             [[25, 2], [66, 0], [79, 38], [67, 63], [38, 79], [14, 69], [0, 20]]
         ]
         self.asteroid_no = 4  # Starting number of asteroids.
+        self.next_id = 0  # Identifier given to the next asteroid spawned, so it can be followed across ticks.
         self.SCALE_FACTORS = [1, 0.625, 0.325]  # Scale factors for large, medium, and small asteroids.
         self.VELS = [1, 2, 1.75]  # Velocity values corresponding to different asteroid sizes.
         self.SIZES = ["L", "M", "S"]  # Labels for asteroid sizes.
         self.SCORES = [20, 50, 100]  # Score awarded for destroying each size.
-        self.particles = []  # List for particle effects on asteroid destruction.
         self.DECAY = 1.2  # Decay rate for particle lifetimes.
-        self.DEATH_SOUND = pygame.mixer.Sound("assets/sounds/dead.wav")
-        self.DEATH_SOUND.set_volume(0.25)
-        self.ASTEROID_SOUND = pygame.mixer.Sound("assets/sounds/asteroid hit.wav")
-        self.ASTEROID_SOUND.set_volume(0.1)
+        self.particles = ParticleSystem(self.DECAY, rng=particle_rng)  # Particle effects on asteroid destruction.
+        self.dt = 1  # Length of the last tick in 60 Hz frames, used to interpolate drawing.
+        self.scored = []  # Device IDs whose score changed during the last move().
+        self.history = AsteroidHistory()  # Where the asteroids were over the last ticks, for lag compensation.
+        self.DEATH_SOUND = LazySound("assets/sounds/dead.wav", 0.25)
+        self.ASTEROID_SOUND = LazySound("assets/sounds/asteroid hit.wav", 0.1)
 
     def spawn_particles(self, coord):
         """
         Spawn particle effects at a given coordinate (e.g., upon asteroid destruction).
         :param coord: The coordinate where the particles should originate.
         """
-        number = random.randint(3, 5)  # Randomly decide the number of particles.
-        x_vels = []
-        y_vels = []
-        # Generate each particle with random velocities.
-        for i in range(number):
-            x_vel, y_vel, x_vels, y_vels = self.velocity_randomizer(1.5, x_vels, y_vels)
-            x_vels.append(x_vel)
-            y_vels.append(y_vel)
-            timer = random.randint(45, 60)  # Lifetime of the particle.
-            self.particles.append([coord[:], x_vel, y_vel, timer])
+        self.particles.spawn(coord, self.particles.rng.randint(3, 5))  # Randomly decide the number of particles.
 
-    def handle_particles(self):
+    def handle_particles(self, dt=1):
         """
         Update particle positions and remove them once their timer has decayed.
+        :param dt: Length of the tick in 60 Hz frames.
         """
-        for index, particle in reversed(list(enumerate(self.particles))):
-            particle[0][0] += particle[1]
-            particle[0][1] += particle[2]
-            particle[3] -= self.DECAY 
-            if particle[3] <= 0: 
-                self.particles.pop(index)
+        self.particles.update(dt)
 
     def velocity_randomizer(self, size, x_vels, y_vels):
         """
@@ -325,12 +698,12 @@ class Asteroids:
         :param y_vels: List of y velocities already used.
         :return: Tuple of (x_vel, y_vel, updated x_vels, updated y_vels).
         """
-        x_vel = random.uniform(-size, size)
+        x_vel = self.rng.uniform(-size, size)
         while (x_vel in x_vels) or -0.1 < x_vel < 0.1: 
-            x_vel = random.uniform(-size, size)
-        y_vel = random.uniform(-size, size)
+            x_vel = self.rng.uniform(-size, size)
+        y_vel = self.rng.uniform(-size, size)
         while (y_vel in y_vels) or -0.1 < y_vel < 0.1:
-            y_vel = random.uniform(-size, size)
+            y_vel = self.rng.uniform(-size, size)
         return x_vel, y_vel, x_vels, y_vels
 
     def next_round(self):
@@ -343,12 +716,14 @@ class Asteroids:
             x_vel, y_vel, x_vels, y_vels = self.velocity_randomizer(self.VELS[0], x_vels, y_vels)
             x_vels.append(x_vel)
             y_vels.append(y_vel)
-            asteroid = Polygon(random.choice(self.ASTEROID_SHAPES))
-            spawn = random.choice(self.spawn_range)
-            asteroid.center = [random.randrange(spawn[0], spawn[1]),
-                               random.randrange(spawn[2], spawn[3])]
-            # Append asteroid info: shape, velocity, size ("L" for large), and multipliers.
-            self.asteroids.append([asteroid, x_vel, y_vel, "L", 1, 1])
+            shape = self.rng.randrange(len(self.ASTEROID_SHAPES))
+            asteroid = Polygon(self.ASTEROID_SHAPES[shape])
+            spawn = self.rng.choice(self.spawn_range)
+            asteroid.center = [self.rng.randrange(spawn[0], spawn[1]),
+                               self.rng.randrange(spawn[2], spawn[3])]
+            # Append asteroid info: shape, velocity, size ("L" for large), multipliers, shape index and ID.
+            self.asteroids.append([asteroid, x_vel, y_vel, "L", 1, 1, shape, self.next_id])
+            self.next_id += 1
         return self
 
     def spawn_new(self, asteroid):
@@ -365,88 +740,165 @@ class Asteroids:
             for i in range(2):
                 x_vel, y_vel, x_vels, y_vels = self.velocity_randomizer(self.VELS[self.SIZES.index(asteroid[3])+1],
                                                                        x_vels, y_vels)
-                new_asteroid = Polygon(random.choice(self.ASTEROID_SHAPES)).enlarge(
+                shape = self.rng.randrange(len(self.ASTEROID_SHAPES))
+                new_asteroid = Polygon(self.ASTEROID_SHAPES[shape]).enlarge(
                     self.SCALE_FACTORS[self.SIZES.index(asteroid[3])+1])
                 new_asteroid.center = asteroid[0].center
                 asteroids.append([new_asteroid, x_vel, y_vel,
-                                  self.SIZES[self.SIZES.index(asteroid[3])+1], 1, 1])
+                                  self.SIZES[self.SIZES.index(asteroid[3])+1], 1, 1, shape, self.next_id])
+                self.next_id += 1
                 x_vels.append(x_vel)
                 y_vels.append(y_vel)
         return asteroids
 
-    def move(self, players, bullets, game_over, shake):
+    def move(self, players, bullets, game_over, shake, dt=1, tick=0, view_delays=None):
         """
         Update the positions of asteroids, handle screen wrapping, and detect collisions
         with bullets and players. Also triggers particle effects and sounds.
         :param players: Dictionary of player objects.
-        :param bullets: List of active bullets.
+        :param bullets: BulletPool of active bullets.
         :param game_over: Reference to the game-over handler (not used directly here).
         :param shake: Boolean flag to trigger screen shake effect.
+        :param dt: Length of the tick in 60 Hz frames.
+        :param tick: Number of the tick being simulated; the asteroids are kept in the history under it.
+        :param view_delays: dict of device_id -> how many ticks late the player sees the world.
+                            Their bullets are judged against the asteroids as the player saw them.
         :return: Updated shake flag indicating if a collision occurred.
         """
+        self.dt = dt
+        self.scored = []
         new_asteroids = []
-        for index, asteroid in reversed(list(enumerate(self.asteroids))):
-            asteroid[0].move(asteroid[1], asteroid[2])
+        # Ships that can be hit, and their centers as one array for the broad phase.
+        # Every player of a game has a row in the same ShipKinematics store.
+        ships, centers = [], np.zeros((0, 2))
+        if players:
+            ships, centers = next(iter(players.values())).ships.targets(players.values())
+
+        for asteroid in self.asteroids:
+            asteroid[0].move(asteroid[1]*dt, asteroid[2]*dt)
             # Screen wrapping for asteroids.
-            if asteroid[0].center[0] > self.width + asteroid[0].rect.width//2:
-                asteroid[0].center = [-asteroid[0].rect.width//2, asteroid[0].center[1]]
-            elif asteroid[0].center[0] < -asteroid[0].rect.width//2:
-                asteroid[0].center = [self.width + asteroid[0].rect.width//2, asteroid[0].center[1]]
-            if asteroid[0].center[1] > self.height + asteroid[0].rect.height//2:
-                asteroid[0].center = [asteroid[0].center[0], -asteroid[0].rect.height//2]
-            elif asteroid[0].center[1] < -asteroid[0].rect.height//2:
-                asteroid[0].center = [asteroid[0].center[0], self.height + asteroid[0].rect.height//2]
+            width, height = asteroid[0].size
+            if asteroid[0].center[0] > self.width + width//2:
+                asteroid[0].center = [-width//2, asteroid[0].center[1]]
+            elif asteroid[0].center[0] < -width//2:
+                asteroid[0].center = [self.width + width//2, asteroid[0].center[1]]
+            if asteroid[0].center[1] > self.height + height//2:
+                asteroid[0].center = [asteroid[0].center[0], -height//2]
+            elif asteroid[0].center[1] < -height//2:
+                asteroid[0].center = [asteroid[0].center[0], self.height + height//2]
 
+        # Test every bullet against every asteroid in one batch.
+        batch = PolygonBatch([asteroid[0] for asteroid in self.asteroids])
+        hits = collide_circles_polygons(bullets.positions, bullets.radius, batch)
+        if view_delays:
+            self.compensate(hits, bullets, tick, view_delays)
+        # Every ship whose body could reach into an asteroid's bounds, for all asteroids at once.
+        # The bounds are the batch's model space bounds moved to each center, so no asteroid is
+        # transformed to world space for it.
+        reach = Player.REACH if Player.REACH is not None else 0
+        lower = batch.positions + batch.bounds[:, 0:2] - reach
+        upper = batch.positions + batch.bounds[:, 2:4] + reach
+        near = ((centers[:, 0] > lower[:, 0:1]) & (centers[:, 0] < upper[:, 0:1]) &
+                (centers[:, 1] > lower[:, 1:2]) & (centers[:, 1] < upper[:, 1:2]))
+
+        for index, asteroid in reversed(list(enumerate(self.asteroids))):
             collision = False
-            # Check collision between asteroid and bullets.
-            for j, bullet in reversed(list(enumerate(bullets))):
-                if asteroid[0].collidecircle(bullet[0]):
-                    points_map = {"L": 20, "M": 30, "S": 40}  # Points awarded per asteroid size.
-                    points = points_map.get(asteroid[3], 20)
-                    shooter_id = bullet[3]
-                    # Award points to the appropriate player.
-                    if shooter_id in players:
-                        players[shooter_id].score += points
-                    else:
-                        players["local"].score += points
+            # Check collision between asteroid and bullets, newest bullet first.
+            for j in reversed(np.flatnonzero(hits[index])):
+                if not bullets.alive[j]:
+                    continue
+                points_map = {"L": 20, "M": 30, "S": 40}  # Points awarded per asteroid size.
+                points = points_map.get(asteroid[3], 20)
+                shooter_id = bullets.owner_id(j)
+                # Award points to the appropriate player.
+                if shooter_id not in players:
+                    shooter_id = "local"
+                players[shooter_id].score += points
+                self.scored.append(shooter_id)
+                new_asteroids += self.spawn_new(asteroid)
+                self.spawn_particles(asteroid[0].center)
+                self.ASTEROID_SOUND.play()
+                self.asteroids.pop(index)
+                bullets.kill(j)
+                shake = True
+                collision = True
+                break
+            if collision:
+                continue
+
+            # Check collision between asteroid and the body lines of nearby players.
+            for order in np.flatnonzero(near[index]):
+                player = ships[order]
+                if not player.dead and any(line.collidepolygon(asteroid[0]) for line in player.body):
+                    self.DEATH_SOUND.play()
+                    self.ASTEROID_SOUND.play()
+                    player.dead = True
+                    player.score -= 10  # Penalize the player for the collision.
+                    self.scored.append(player.device_id)
                     new_asteroids += self.spawn_new(asteroid)
                     self.spawn_particles(asteroid[0].center)
-                    self.ASTEROID_SOUND.play()
                     self.asteroids.pop(index)
-                    bullets.pop(j)
                     shake = True
-                    collision = True
                     break
-            if collision:
-                continue
-
-            # Check collision between asteroid and each player.
-            for device_id, player in players.items():
-                if not player.dead and not player.safe:
-                    for line in player.body:
-                        if line.collidepolygon(asteroid[0]):
-                            self.DEATH_SOUND.play()
-                            self.ASTEROID_SOUND.play()
-                            player.dead = True
-                            player.score -= 10  # Penalize the player for the collision.
-                            new_asteroids += self.spawn_new(asteroid)
-                            self.spawn_particles(asteroid[0].center)
-                            self.asteroids.pop(index)
-                            shake = True
-                            collision = True
-                            break
-                    if collision:
-                        break
 
+        bullets.compact()  # Remove the bullets that hit something, keeping the rest in order.
         self.asteroids += new_asteroids  # Add newly spawned asteroids.
-        self.handle_particles()  # Update particle effects.
+        self.history.record(tick, self.asteroids)
+        self.handle_particles(dt)  # Update particle effects.
         return shake  # Return whether a collision occurred (for screen shake).
 
-    def draw(self, surface):
+    def compensate(self, hits, bullets, tick, view_delays):
+        """
+        Judge the bullets of players who see the world late against the asteroids where they saw them:
+        at the end of the tick that many ticks ago, as kept in the history. Asteroids spawned since
+        are judged where they are now, and bullets whose shooter's view is older than the history
+        are judged on the current positions alone. Bullets are grouped by delay, so each past tick
+        is looked up and tested once however many players share it.
+        :param hits: Hit matrix of every asteroid against every bullet at the current positions, updated in place.
+        """
+        if not bullets.count or not view_delays:
+            return
+        # Only the shooters of bullets still in flight, not everyone who ever fired.
+        owners, inverse = np.unique(bullets.owner[:bullets.count], return_inverse=True)
+        delays = np.array([view_delays.get(bullets.owners[owner], 0) for owner in owners], dtype=np.int64)[inverse]
+        ids = None
+        for delay in np.unique(delays):
+            frame = self.history.frame(tick - delay) if delay else None
+            if frame is None:
+                continue
+            group = np.flatnonzero(delays == delay)
+            if ids is None:
+                ids = np.array([asteroid[7] for asteroid in self.asteroids], dtype=np.int64)
+            rows, found = self.history.lookup(tick - delay, ids)
+            if not found.any():
+                continue
+            # Broad phase on the bounds moved to the centers the asteroids had then: only the ones
+            # near a bullet can be hit.
+            points = bullets.positions[group]
+            centers = frame[1][rows]
+            lower = centers + frame[2][rows, 0:2] - bullets.radius
+            upper = centers + frame[2][rows, 2:4] + bullets.radius
+            near = found & np.any((points[:, 0] >= lower[:, 0, None]) & (points[:, 0] <= upper[:, 0, None]) &
+                                  (points[:, 1] >= lower[:, 1, None]) & (points[:, 1] <= upper[:, 1, None]), axis=1)
+            hits[np.ix_(np.flatnonzero(found), group)] = False
+            candidates = np.flatnonzero(near)
+            if len(candidates):
+                batch = PolygonBatch([self.asteroids[index][0] for index in candidates])
+                batch.positions = centers[candidates]
+                hits[np.ix_(candidates, group)] = collide_circles_polygons(points, bullets.radius, batch)
+
+    def draw(self, surface, alpha=1.0):
         """
         Draw all asteroids and active particles onto the provided surface.
+        Asteroids never rotate, so each shape and size is rasterized once and blitted.
+        :param alpha: How far between the previous and the latest tick to draw, from 0 to 1.
+        :return: List of rects that were drawn to.
         """
+        lag = (1-alpha)*self.dt  # Step back along each velocity to the interpolated position.
+        blits = []
         for asteroid in self.asteroids:
-            asteroid[0].draw(surface, (255, 255, 255), 2)
-        for particle in self.particles:
-            pygame.draw.circle(surface, (255, 255, 255), particle[0], 2)
+            sprite, offset = ASTEROID_SPRITES.get((asteroid[6], asteroid[3]), render_outline,
+                                                  asteroid[0], (255, 255, 255), 2)
+            blits.append((sprite, (asteroid[0].center[0]+offset[0]-lag*asteroid[1],
+                                   asteroid[0].center[1]+offset[1]-lag*asteroid[2])))
+        return surface.blits(blits) + self.particles.draw(surface, alpha)
@@ -0,0 +1,61 @@
+"""
+Benchmark for the asteroid collision pass in Asteroids.move plus the bullet step.
+Prints ticks per second as the asteroid and bullet counts grow.
+Run from anywhere with: python benchmarks/bench_collisions.py
+"""
+
+import os
+import sys
+import time
+import random
+
+# Run without a window or sound card, and from the game folder so assets resolve.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+import pygame
+pygame.init()
+
+from assets.sprites import Player, Asteroids, BulletPool, ShipKinematics
+
+WIDTH, HEIGHT = 650, 650
+TICKS = 200
+
+def top_up(asteroids, bullets, asteroid_count, bullet_count):
+    """Refill the field after hits so every tick works on the same amount of objects."""
+    while len(asteroids.asteroids) < asteroid_count:
+        asteroids.asteroid_no = 1
+        asteroids.next_round()
+    while len(bullets) < bullet_count:
+        bullets.spawn(random.uniform(0, WIDTH), random.uniform(0, HEIGHT),
+                      11*random.uniform(-1, 1), 11*random.uniform(-1, 1), "local")
+
+def run(asteroid_count, bullet_count, player_count):
+    random.seed(0)
+    ships = ShipKinematics(WIDTH, HEIGHT)
+    players = {"local": Player(WIDTH, HEIGHT, "local", ships)}
+    for i in range(1, player_count):
+        players[f"device_{i}"] = Player(WIDTH, HEIGHT, f"device_{i}", ships)
+    for player in players.values():
+        player.safe, player.timer = True, 10**9  # Keep ships alive so the load stays constant.
+    asteroids = Asteroids(WIDTH, HEIGHT)
+    bullets = BulletPool(capacity=1024)
+
+    elapsed = 0.0
+    for tick in range(TICKS):
+        top_up(asteroids, bullets, asteroid_count, bullet_count)
+        start = time.perf_counter()
+        asteroids.move(players, bullets, None, False)
+        bullets.step(WIDTH, HEIGHT)
+        elapsed += time.perf_counter() - start
+        asteroids.particles.clear()
+    return TICKS / elapsed
+
+if __name__ == "__main__":
+    print(f"{'asteroids':>10} {'bullets':>8} {'players':>8} {'ticks/sec':>10}")
+    for asteroid_count, bullet_count, player_count in [(6, 10, 1), (25, 50, 5), (50, 100, 10),
+                                                       (100, 200, 20), (200, 400, 20), (400, 800, 20)]:
+        rate = run(asteroid_count, bullet_count, player_count)
+        print(f"{asteroid_count:>10} {bullet_count:>8} {player_count:>8} {rate:>10.0f}")
@@ -0,0 +1,181 @@
+"""
+Equivalence check and timings for the collision core in assets/shapes.py.
+Runs the separating axis tests behind the collide* methods and the slope/intercept tests
+they replaced, copied below from the original shapes.py, on the same random asteroid, ship
+line and bullet pairs. The old tests start with an integer pygame.Rect overlap, which
+rejects pairs that only touch within the last pixel, so those are the one kind of
+disagreement allowed: the script exits with an error listing any other.
+Timings are printed for reference only: in pure Python neither set of tests is consistently faster.
+Run from anywhere with: python benchmarks/bench_geometry.py
+"""
+
+import os
+import sys
+import time
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from assets.shapes import Circle, Line, Polygon, coords_to_rect
+
+ASTEROID_SHAPES = [
+    [[23, 0], [72, 12], [79, 46], [64, 71], [25, 79], [0, 51], [0, 18]],
+    [[25, 0], [79, 24], [79, 54], [46, 79], [2, 61], [0, 19]],
+    [[25, 2], [66, 0], [79, 38], [67, 63], [38, 79], [14, 69], [0, 20]]
+]
+SCALE_FACTORS = [1, 0.625, 0.325]
+PAIRS = 20000
+
+# The tests below are the original Polygon.collidepoint, Polygon.collidecircle and
+# Line.collidepolygon, with self passed in as plain data. The boundaries and rects they read
+# are built the original way, from world coordinates (see original_shape).
+
+def original_collidepoint(boundaries, coord):
+    collision = False
+    for line in boundaries:
+        if line[0] == "x":
+            if line[2] == "<=": 
+                if (coord[0] <= line[1]):
+                    collision = True
+                else: 
+                    return False
+            else: 
+                if (coord[0] >= line[1]):
+                    collision = True
+                else: 
+                    return False
+
+        elif line[0] == "y":
+            if line[2] == "<=": 
+                if (coord[1] <= line[1]):
+                    collision = True
+                else: 
+                    return False
+            else: 
+                if (coord[1] >= line[1]):
+                    collision = True
+                else: 
+                    return False
+
+        else:
+            if line[2] == "<=":
+                if coord[1] <= (line[0]*coord[0]) + line[1]:
+                    collision = True
+                else: 
+                    return False
+            else:
+                if coord[1] >= (line[0]*coord[0]) + line[1]:
+                    collision = True
+                else: 
+                    return False
+
+    return collision
+
+def original_collidecircle(polygon, circle):
+    coordinates, boundaries, rect = polygon
+    if rect.colliderect(circle.rect):
+        if original_collidepoint(boundaries, circle.center):
+            return True
+        
+        for coord in coordinates:
+            if circle.collidepoint(coord):
+                return True
+
+        if circle.collidelines(boundaries):
+            return True
+    
+    return False
+
+def original_line_collidelines(boundary, lines):
+    for line in lines:
+        if (boundary[0] == line[0]) and (boundary[1] == line[1]): 
+            return True
+        elif (boundary[0] == "x") and (line[0] == "y") and (boundary[4][0] <= line[1] <= boundary[4][1]) and (line[3][0] <= boundary[1] <= line[3][1]): 
+            return True
+        elif (boundary[0] == "y") and (line[0] == "x") and (boundary[3][0] <= line[1] <= boundary[3][1]) and (line[4][0] <= boundary[1] <= line[4][1]): 
+            return True
+
+        elif boundary[0] not in ["x", "y"]:
+            if (line[0] == "x") and (boundary[3][0] <= line[1] <= boundary[3][1]) and (line[4][0] <= (line[1]*boundary[0])+boundary[1] <= line[4][1]): 
+                return True
+            elif (line[0] == "y") and (boundary[4][0] <= line[1] <= boundary[4][1]) and (line[3][0] <= (line[1]-boundary[1])/boundary[0] <= line[3][1]): 
+                return True
+            elif line[0] not in ["x", "y"]:
+                if boundary[0] == line[0]: 
+                    continue
+                elif (boundary[3][0] <= (line[1]-boundary[1])/(boundary[0]-line[0]) <= boundary[3][1]) and (line[3][0] <= (line[1]-boundary[1])/(boundary[0]-line[0]) <= line[3][1]): 
+                    return True
+
+    return False
+
+def original_collidepolygon(line, polygon):
+    coordinates, boundary, rect = line
+    if rect.colliderect(polygon[2]):
+        for coord in coordinates:
+            if original_collidepoint(polygon[1], coord):
+                return True
+    
+        if original_line_collidelines(boundary, polygon[1]):
+            return True
+
+    return False
+
+def original_shape(shape):
+    """(coordinates, boundaries, rect) of a Polygon or Line, built as the original constructors did."""
+    coordinates = [list(coord) for coord in shape.coordinates]
+    if isinstance(shape, Line):
+        boundaries = shape.create_boundary(coordinates)
+    else:
+        boundaries = shape.create_boundaries(coordinates, shape.center)
+    return coordinates, boundaries, coords_to_rect(coordinates)
+
+def random_pairs():
+    random.seed(0)
+    pairs = []
+    for i in range(PAIRS):
+        asteroid = Polygon(random.choice(ASTEROID_SHAPES)).enlarge(random.choice(SCALE_FACTORS))
+        asteroid.center = [random.uniform(0, 650), random.uniform(0, 650)]
+        x, y = asteroid.center[0] + random.uniform(-60, 60), asteroid.center[1] + random.uniform(-60, 60)
+        line = Line([[x, y], [x + random.uniform(-25, 25), y + random.uniform(-25, 25)]])
+        line.rotate(random.choice(range(0, 360, 4)))
+        bullet = Circle([x, y], 2.5)
+        pairs.append((asteroid, line, bullet))
+    return pairs
+
+def touching(asteroid, other):
+    """True if the integer rects of the original shapes miss, so the original tests never looked closer."""
+    return not asteroid[2].colliderect(other[2] if isinstance(other, tuple) else other.rect)
+
+def timed(test, pairs):
+    start = time.perf_counter()
+    results = [test(*pair) for pair in pairs]
+    return results, time.perf_counter() - start
+
+if __name__ == "__main__":
+    pairs = random_pairs()
+    originals = [(original_shape(asteroid), original_shape(line), bullet) for asteroid, line, bullet in pairs]
+    checks = [
+        ("bullet vs asteroid", lambda a, l, b: bool(a.collidecircle(b)),
+         lambda a, l, b: bool(original_collidecircle(a, b)), lambda a, l, b: touching(a, b)),
+        ("ship line vs asteroid", lambda a, l, b: bool(l.collidepolygon(a)),
+         lambda a, l, b: bool(original_collidepolygon(l, a)), lambda a, l, b: touching(a, l)),
+        ("point in asteroid", lambda a, l, b: a.collidepoint(b.center),
+         lambda a, l, b: original_collidepoint(a[1], b.center), lambda a, l, b: False),
+    ]
+    print(f"{'test':>22} {'hits':>6} {'disagree':>9} {'touching':>9} {'axes ms':>8} {'slopes ms':>10}")
+    unexplained = []
+    for name, new_test, old_test, allowed in checks:
+        new, new_time = timed(new_test, pairs)
+        old, old_time = timed(old_test, originals)
+        disagree = [i for i, (a, b) in enumerate(zip(new, old)) if a != b]
+        touches = [i for i in disagree if new[i] and allowed(*originals[i])]
+        unexplained += [(name, i, new[i], old[i]) for i in disagree if i not in touches]
+        print(f"{name:>22} {sum(new):>6} {len(disagree):>9} {len(touches):>9} {new_time*1000:>8.1f} "
+              f"{old_time*1000:>10.1f}")
+    if unexplained:
+        for name, i, new, old in unexplained:
+            print(f"{name}: pair {i} is {new} with edge normals and {old} with slopes")
+        sys.exit(f"{len(unexplained)} disagreements are not touching pairs")
@@ -0,0 +1,39 @@
+"""
+Benchmark for the headless engine: full game ticks with no window, sound or fonts.
+Prints ticks per second for a scripted local player and a growing number of remote players.
+Run from anywhere with: python benchmarks/bench_headless.py
+"""
+
+import os
+import sys
+import time
+import random
+
+# Run from the game folder so assets resolve.
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from main import Asteroids_Game
+
+TICKS = 3000
+
+def run(player_count):
+    random.seed(0)
+    game = Asteroids_Game(headless=True, seed=0)
+    for i in range(1, player_count):
+        game.add_player(f"device_{i}")
+
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        game.set_input(thrust=tick % 180 < 90, fire=tick % 7 < 2,
+                       left=tick % 111 < 37, right=tick % 212 > 159)
+        for i in range(1, player_count):
+            game.players[f"device_{i}"].apply_remote_tilt(random.choice([15, -15, 0]))
+        if not game.tick():
+            game.reset_game()
+    return TICKS / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    print(f"{'players':>8} {'ticks/sec':>10}")
+    for player_count in [1, 5, 20, 50]:
+        print(f"{player_count:>8} {run(player_count):>10.0f}")
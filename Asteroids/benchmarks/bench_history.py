@@ -0,0 +1,133 @@
+"""
+Cost of lag compensation.
+First checks that a shot from a player who sees the world 6 ticks (100 ms) late hits an asteroid
+where the player saw it and misses it where it is now, and that a tick with more asteroids than
+the history was allocated for is kept whole; the script exits with an error if either fails.
+Then runs the headless engine with a growing number of remote players firing, once judging their
+bullets on the current asteroid positions and once against the positions they saw 6 ticks ago,
+and reports the time per tick of both. Also reports the time to record a tick into
+AsteroidHistory and to look a tick's asteroids up in it, and the history's memory.
+Run from anywhere with: python benchmarks/bench_history.py
+"""
+
+import os
+import sys
+import time
+import random
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from main import Asteroids_Game
+from assets.history import AsteroidHistory
+
+TICKS = 600
+DELAY = 6  # Ticks remote players see the world late.
+LOOKUPS = 10000
+
+def run(shooters, asteroid_count, delay):
+    random.seed(0)
+    game = Asteroids_Game(headless=True, seed=0)
+    device_ids = [f"device_{i}" for i in range(1, shooters + 1)]
+    for device_id in device_ids:
+        player = game.add_player(device_id)
+        player.center = [random.uniform(0, game.WIDTH), random.uniform(0, game.HEIGHT)]
+        player.angle = random.randrange(360)
+        player.pose()
+        if delay:
+            game.view_delays[device_id] = delay
+    game.asteroids.asteroids = []
+    game.asteroids.asteroid_no = asteroid_count
+    game.asteroids.next_round()
+
+    elapsed = 0
+    for tick in range(TICKS):
+        for i, device_id in enumerate(device_ids):
+            game.triggers[device_id] = (tick + i) % 8 < 4  # A shot every 8 ticks.
+        start = time.perf_counter()
+        if not game.tick():
+            game.reset_game(0)
+        elapsed += time.perf_counter() - start
+    return 1000 * elapsed / TICKS, len(game.bullets.bullets)
+
+def delayed_shot(delay, aim):
+    """
+    Whether a still bullet of a player who sees the world delay ticks late hits the one asteroid,
+    placed where the asteroid was delay ticks before the next tick ("then") or where the next
+    tick moves it to ("now").
+    """
+    game = Asteroids_Game(headless=True, seed=0)
+    game.asteroids.asteroids = []
+    game.asteroids.asteroid_no = 1
+    game.asteroids.next_round()
+    asteroid = game.asteroids.asteroids[0]
+    asteroid[0].center = [100, 100]  # Clear of the ships.
+    asteroid[1], asteroid[2] = 15.0, 0.0  # Far more than its width over the delay.
+    player = game.add_player("remote")
+    player.center = [325, 600]
+    player.pose()
+    for tick in range(2 * delay):
+        game.step()
+    game.view_delays["remote"] = delay
+    # The next step judges the bullet against the frame of its own tick less the delay.
+    if aim == "then":
+        target = game.asteroids.history.frame(game.tick_count + 1 - delay)[1][0]
+    else:
+        target = [asteroid[0].center[0] + asteroid[1], asteroid[0].center[1]]
+    game.bullets.bullets.spawn(target[0], target[1], 0, 0, "remote")
+    game.step()
+    return player.score > 0
+
+def frame_kept(asteroid_count):
+    """Whether a tick with asteroid_count asteroids is kept whole by a history allocated for fewer."""
+    game = Asteroids_Game(headless=True, seed=0)
+    game.asteroids.asteroids = []
+    game.asteroids.asteroid_no = asteroid_count
+    game.asteroids.next_round()
+    history = AsteroidHistory(capacity=asteroid_count // 4)
+    history.record(0, game.asteroids.asteroids)
+    history.record(1, game.asteroids.asteroids[:1])
+    return len(history.frame(0)[0]) == asteroid_count and len(history.frame(1)[0]) == 1
+
+def history_costs(asteroid_count):
+    game = Asteroids_Game(headless=True, seed=0)
+    game.asteroids.asteroids = []
+    game.asteroids.asteroid_no = asteroid_count
+    game.asteroids.next_round()
+    history = AsteroidHistory()
+    asteroids = game.asteroids.asteroids
+    start = time.perf_counter()
+    for tick in range(LOOKUPS):
+        history.record(tick, asteroids)
+    record = time.perf_counter() - start
+    ids = history.frame(LOOKUPS - 1)[0]
+    start = time.perf_counter()
+    for tick in range(LOOKUPS):
+        history.lookup(LOOKUPS - 1 - tick % history.ticks, ids)
+    lookup = time.perf_counter() - start
+    memory = sum(array.nbytes for array in (history.stamps, history.counts, history.ids, history.positions,
+                                            history.bounds))
+    return 1e6 * record / LOOKUPS, 1e6 * lookup / LOOKUPS, memory
+
+if __name__ == "__main__":
+    failures = []
+    if not delayed_shot(DELAY, "then"):
+        failures.append(f"a shot {DELAY} ticks late missed the asteroid where the shooter saw it")
+    if delayed_shot(DELAY, "now"):
+        failures.append(f"a shot {DELAY} ticks late hit the asteroid where it is now")
+    if not frame_kept(100):
+        failures.append("a tick with more asteroids than the history was allocated for was cut short")
+    if failures:
+        sys.exit("\n".join(failures))
+    print(f"a shot {DELAY} ticks late hits where the shooter saw the asteroid, not where it is now")
+    print()
+    print(f"{'shooters':>9} {'asteroids':>10} {'current ms':>11} {'rewound ms':>11} {'bullets':>8}")
+    for shooters, asteroid_count in [(4, 6), (20, 6), (20, 24), (100, 24)]:
+        current, bullets = run(shooters, asteroid_count, 0)
+        rewound, bullets = run(shooters, asteroid_count, DELAY)
+        print(f"{shooters:>9} {asteroid_count:>10} {current:>11.3f} {rewound:>11.3f} {bullets:>8}")
+    print()
+    print(f"{'asteroids':>10} {'record us':>10} {'lookup us':>10} {'memory bytes':>13}")
+    for asteroid_count in [6, 24]:
+        record, lookup, memory = history_costs(asteroid_count)
+        print(f"{asteroid_count:>10} {record:>10.1f} {lookup:>10.1f} {memory:>13}")
@@ -0,0 +1,60 @@
+"""
+Cost of area of interest filtering as the world fills up.
+Runs the headless engine with more and more players and asteroids, every remote player firing a
+shot every 8 ticks, updates every player's area of interest each tick, and reports the mean, 99th
+percentile and worst update time against the 16.6 ms a frame may take, the average number of
+entities each player is sent against the whole world, and the enter and leave events per player
+per tick.
+Run from anywhere with: python benchmarks/bench_interest.py
+"""
+
+import os
+import sys
+import time
+import random
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from main import Asteroids_Game
+from assets.interest import InterestManager
+
+TICKS = 600
+BUDGET = 1000 / 60  # Milliseconds per frame at 60 frames per second.
+
+def measure(players, asteroids, radius):
+    random.seed(0)
+    game = Asteroids_Game(headless=True, seed=0)
+    for i in range(1, players):
+        player = game.add_player(f"device_{i}")
+        player.center = [random.uniform(0, game.WIDTH), random.uniform(0, game.HEIGHT)]
+    game.asteroids.asteroids = []
+    game.asteroids.asteroid_no = asteroids
+    game.asteroids.next_round()
+    interest = InterestManager(game.WIDTH, game.HEIGHT, radius=radius)
+    times = []
+    world = relevant = events = 0
+    for tick in range(TICKS):
+        game.set_input(thrust=tick % 60 < 40, fire=tick % 8 == 0, left=tick % 90 < 20)
+        for i in range(1, players):
+            game.triggers[f"device_{i}"] = (tick + i) % 8 < 4
+        game.tick()
+        start = time.perf_counter()
+        changes = interest.update(game)
+        times.append(1000 * (time.perf_counter() - start))
+        world += len(game.players) + len(game.asteroids.asteroids) + len(game.bullets.bullets)
+        relevant += len(interest.pairs) / players
+        events += sum(len(change.entered) + len(change.left) for change in changes.values()) / players
+    times.sort()
+    return (sum(times) / TICKS, times[int(TICKS * 0.99)], times[-1], world / TICKS, relevant / TICKS,
+            events / TICKS)
+
+if __name__ == "__main__":
+    print(f"{'players':>8} {'asteroids':>10} {'radius':>7} {'mean ms':>8} {'p99 ms':>7} {'worst ms':>9} "
+          f"{'budget':>7} {'world':>7} {'relevant':>9} {'events':>7}")
+    for players, asteroids, radius in [(8, 16, 150), (32, 16, 150), (128, 16, 150), (128, 64, 150),
+                                       (128, 64, 80), (256, 64, 80), (256, 64, 150)]:
+        mean, p99, worst, world, relevant, events = measure(players, asteroids, radius)
+        verdict = "ok" if p99 < BUDGET else "over"
+        print(f"{players:>8} {asteroids:>10} {radius:>7} {mean:>8.2f} {p99:>7.2f} {worst:>9.2f} "
+              f"{verdict:>7} {world:>7.0f} {relevant:>9.1f} {events:>7.2f}")
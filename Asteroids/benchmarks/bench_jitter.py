@@ -0,0 +1,79 @@
+"""
+Simulated network test of the per-device jitter buffer.
+One controller sends a smoothly changing tilt at 100 Hz over a link with random delay; the game
+reads it at 60 Hz. Prints how rough the per-tick tilt is when each tick just takes the newest
+packet, and with the jitter buffer at several playout delays, plus the buffer's own statistics.
+Run from anywhere with: python benchmarks/bench_jitter.py
+"""
+
+import os
+import sys
+import time
+import math
+import random
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from assets.input_buffer import InputBuffer
+
+SECONDS = 20
+SEND_RATE = 100
+TICK_RATE = 60
+
+def tilt(t):
+    return 15 * math.sin(t)
+
+def packets():
+    """(arrival, sequence, send time, angle) for a link with 5 ms base delay and up to ~40 ms of jitter."""
+    random.seed(0)
+    sent = []
+    for sequence in range(SECONDS * SEND_RATE):
+        t = sequence / SEND_RATE
+        if random.random() < 0.01:
+            continue  # Lost.
+        sent.append((t + 0.005 + random.expovariate(1 / 0.008), sequence, t, tilt(t)))
+    return sorted(sent)
+
+def roughness(values):
+    """Root mean square change from one tick to the next."""
+    steps = [b - a for a, b in zip(values, values[1:])]
+    return math.sqrt(sum(step * step for step in steps) / len(steps))
+
+def run_latest(arrivals):
+    values, index, angle = [], 0, 0.0
+    for tick in range(SECONDS * TICK_RATE):
+        now = tick / TICK_RATE
+        while index < len(arrivals) and arrivals[index][0] <= now:
+            angle = arrivals[index][3]
+            index += 1
+        values.append(angle)
+    return values, None, 0.0
+
+def run_buffer(arrivals, playout_delay):
+    buffer = InputBuffer(playout_delay)
+    values, index, elapsed = [], 0, 0.0
+    for tick in range(SECONDS * TICK_RATE):
+        now = tick / TICK_RATE
+        while index < len(arrivals) and arrivals[index][0] <= now:
+            arrival, sequence, sent, angle = arrivals[index]
+            buffer.push(arrival, sequence, sent, angle, False, False)
+            index += 1
+        start = time.perf_counter()
+        values.append(buffer.coalesce(now).tilt)
+        elapsed += time.perf_counter() - start
+    return values, buffer.stats(), 1e6 * elapsed / len(values)
+
+if __name__ == "__main__":
+    arrivals = packets()
+    ideal = [tilt(tick / TICK_RATE) for tick in range(SECONDS * TICK_RATE)]
+    print(f"{'mode':>14} {'roughness':>10} {'latency ms':>11} {'jitter ms':>10} {'late':>5} {'lost':>5} {'us/tick':>8}")
+    print(f"{'ideal':>14} {roughness(ideal):>10.4f}")
+    runs = [("latest", run_latest(arrivals))]
+    runs += [(f"buffer {int(delay * 1000)} ms", run_buffer(arrivals, delay)) for delay in (0.0, 0.02, 0.05)]
+    for name, (values, stats, micros) in runs:
+        if stats is None:
+            print(f"{name:>14} {roughness(values):>10.4f}")
+        else:
+            print(f"{name:>14} {roughness(values):>10.4f} {stats['latency_ms']:>11.1f} {stats['jitter_ms']:>10.2f} "
+                  f"{stats['late']:>5} {stats['lost']:>5} {micros:>8.2f}")
@@ -0,0 +1,55 @@
+"""
+Micro-benchmark of ship movement.
+Compares the time per tick of moving every ship one at a time with Player.move against moving
+them all at once with ShipKinematics, as the number of ships grows. Both move the same ships,
+whose state lives in a ShipKinematics store either way. Every ship thrusts and turns on a random
+schedule, so all of them move every tick.
+Run from anywhere with: python benchmarks/bench_kinematics.py
+"""
+
+import os
+import sys
+import time
+import random
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from assets.resources import set_headless
+from assets.sprites import Player, ShipKinematics
+
+TICKS = 300
+
+def controls(count):
+    return [[(random.random() < 0.6, random.random() < 0.2, random.random() < 0.2) for i in range(count)]
+            for tick in range(TICKS)]
+
+def move_each(ships, schedule):
+    start = time.perf_counter()
+    for tick in schedule:
+        for player, (thrust, left, right) in zip(ships, tick):
+            player.move(thrust, left, right)
+    return 1000 * (time.perf_counter() - start) / TICKS
+
+def move_batch(ships, schedule):
+    kinematics = ships[0].ships
+    start = time.perf_counter()
+    for tick in schedule:
+        for player, (thrust, left, right) in zip(ships, tick):
+            player.steer(Player.ROTATION*(right - left), thrust)
+        kinematics.step()
+    return 1000 * (time.perf_counter() - start) / TICKS
+
+def fleet(count):
+    ships = ShipKinematics(650, 650)
+    return [Player(650, 650, f"device_{i}", ships) for i in range(count)]
+
+if __name__ == "__main__":
+    set_headless()
+    print(f"{'ships':>6} {'Player.move ms':>15} {'ShipKinematics ms':>18}")
+    for count in [10, 50, 200, 500, 1000]:
+        random.seed(0)
+        schedule = controls(count)
+        each = move_each(fleet(count), schedule)
+        batch = move_batch(fleet(count), schedule)
+        print(f"{count:>6} {each:>15.3f} {batch:>18.3f}")
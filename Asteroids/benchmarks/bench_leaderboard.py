@@ -0,0 +1,53 @@
+"""
+Micro-benchmark of the scoreboard.
+Compares the time per frame of sorting every player to find the top 3 against reading them from
+the Leaderboard, with a few score changes applied each frame as hits and deaths would.
+Run from anywhere with: python benchmarks/bench_leaderboard.py
+"""
+
+import os
+import sys
+import time
+import random
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from assets.leaderboard import Leaderboard
+
+FRAMES = 2000
+CHANGES = 3  # Score changes per frame.
+
+def events(count):
+    return [[(random.randrange(count), random.choice([20, 50, 100, -10])) for i in range(CHANGES)]
+            for frame in range(FRAMES)]
+
+def sort_every_frame(count, schedule):
+    scores = {f"device_{i}": 0 for i in range(count)}
+    start = time.perf_counter()
+    for changes in schedule:
+        for player, points in changes:
+            scores[f"device_{player}"] += points
+        sorted(scores.items(), key=lambda item: item[1], reverse=True)[:3]
+    return 1e6 * (time.perf_counter() - start) / FRAMES
+
+def leaderboard(count, schedule):
+    scores = {f"device_{i}": 0 for i in range(count)}
+    board = Leaderboard()
+    for device_id in scores:
+        board.add(device_id)
+    start = time.perf_counter()
+    for changes in schedule:
+        for player, points in changes:
+            device_id = f"device_{player}"
+            scores[device_id] += points
+            board.update(device_id, scores[device_id])
+        board.top(3)
+    return 1e6 * (time.perf_counter() - start) / FRAMES
+
+if __name__ == "__main__":
+    print(f"{'players':>8} {'sorted us/frame':>16} {'Leaderboard us/frame':>21}")
+    for count in [20, 100, 500, 2000]:
+        random.seed(0)
+        schedule = events(count)
+        print(f"{count:>8} {sort_every_frame(count, schedule):>16.1f} {leaderboard(count, schedule):>21.1f}")
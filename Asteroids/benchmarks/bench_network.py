@@ -0,0 +1,62 @@
+"""
+Loopback load test for the controller input server.
+Dozens of fake controllers send packets at 100 Hz while a headless game ticks at 60 Hz;
+prints how many packets arrived and what reading them cost the game loop per tick.
+Run from anywhere with: python benchmarks/bench_network.py
+"""
+
+import os
+import sys
+import time
+import threading
+
+# Run from the game folder so assets resolve.
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from main import Asteroids_Game
+from assets.network import InputServer, ControllerClient
+
+SECONDS = 2
+SEND_RATE = 100  # Packets per second per controller.
+
+def send(address, controller_count, stop):
+    clients = [ControllerClient(address, f"device_{i}") for i in range(controller_count)]
+    sent = 0
+    next_send = time.perf_counter()
+    while not stop.is_set():
+        for i, client in enumerate(clients):
+            client.send(angle=(i % 31) - 15, thrust=i % 2 == 0)
+        sent += controller_count
+        next_send += 1 / SEND_RATE
+        time.sleep(max(0, next_send - time.perf_counter()))
+    for client in clients:
+        client.close()
+    return sent
+
+def run(controller_count):
+    server = InputServer(host="127.0.0.1", port=0, max_devices=controller_count).start()
+    game = Asteroids_Game(headless=True, input_server=server, seed=0)
+    stop = threading.Event()
+    result = []
+    sender = threading.Thread(target=lambda: result.append(send(server.address, controller_count, stop)))
+    sender.start()
+
+    read_time, ticks = 0.0, 0
+    end = time.perf_counter() + SECONDS
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        game.check_for_new_players()
+        read_time += time.perf_counter() - start
+        ticks += 1
+        time.sleep(1 / 60)
+    stop.set()
+    sender.join()
+    server.stop()
+    return result[0], server.packets, len(game.players) - 1, 1e6 * read_time / ticks
+
+if __name__ == "__main__":
+    print(f"{'controllers':>12} {'sent':>8} {'received':>9} {'players':>8} {'us/tick':>8}")
+    for controller_count in [10, 25, 50]:
+        sent, received, players, micros = run(controller_count)
+        print(f"{controller_count:>12} {sent:>8} {received:>9} {players:>8} {micros:>8.1f}")
@@ -0,0 +1,52 @@
+"""
+Micro-benchmark of controller packet decoding.
+Compares packets per second for JSON, binary packets unpacked one at a time with struct,
+and whole buffers of binary packets decoded at once with numpy.frombuffer.
+Run from anywhere with: python benchmarks/bench_packets.py
+"""
+
+import os
+import sys
+import time
+import random
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from assets.network import parse_packet, encode_packet
+from assets.packets import PACKET, encode, decode, decode_buffer
+
+PACKETS = 100000
+BATCH = 64  # Packets per receive buffer for the batch decoder.
+
+def rate(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return PACKETS / (time.perf_counter() - start)
+
+def decode_json(packets):
+    for packet in packets:
+        parse_packet(packet)
+
+def decode_struct(packets):
+    for packet in packets:
+        decode(packet)
+
+def decode_batches(buffers):
+    for buffer in buffers:
+        packets = decode_buffer(buffer)
+        # Touch the columns the server reads so the comparison is fair.
+        packets["device"].tolist(), packets["angle"].tolist(), packets["buttons"].tolist()
+
+if __name__ == "__main__":
+    random.seed(0)
+    samples = [(random.randrange(64), i, random.uniform(-15, 15), random.random() < 0.5, random.random() < 0.2)
+               for i in range(PACKETS)]
+    json_packets = [encode_packet(f"device_{d}", a, t, f) for d, s, a, t, f in samples]
+    binary_packets = [encode(d, s, a, t, f, s*10) for d, s, a, t, f in samples]
+    buffers = [b"".join(binary_packets[i:i+BATCH]) for i in range(0, PACKETS, BATCH)]
+
+    print(f"{'format':>16} {'bytes/packet':>13} {'packets/sec':>12}")
+    print(f"{'json':>16} {sum(map(len, json_packets)) / PACKETS:>13.1f} {rate(decode_json, json_packets):>12.0f}")
+    print(f"{'binary struct':>16} {PACKET.size:>13} {rate(decode_struct, binary_packets):>12.0f}")
+    print(f"{'binary batch':>16} {PACKET.size:>13} {rate(decode_batches, buffers):>12.0f}")
@@ -0,0 +1,52 @@
+"""
+Load test of the game with hundreds of players.
+Runs the headless engine with a growing number of remote ships, all turning every tick and
+dying and respawning as asteroids hit them, and reports the mean and worst tick time against
+the 16.6 ms a tick may take at 60 ticks per second.
+Run from anywhere with: python benchmarks/bench_players.py
+"""
+
+import os
+import sys
+import time
+import random
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from main import Asteroids_Game
+
+TICKS = 1200
+BUDGET = 1000 / 60  # Milliseconds per tick at 60 ticks per second.
+
+def run(player_count, asteroid_count):
+    random.seed(0)
+    game = Asteroids_Game(headless=True, seed=0)
+    for i in range(1, player_count):
+        player = game.add_player(f"device_{i}")
+        player.center = [random.uniform(0, game.WIDTH), random.uniform(0, game.HEIGHT)]
+        player.pose()
+    game.asteroids.asteroids = []
+    game.asteroids.asteroid_no = asteroid_count
+    game.asteroids.next_round()
+
+    times = []
+    for tick in range(TICKS):
+        start = time.perf_counter()
+        game.set_input(thrust=tick % 180 < 90, fire=tick % 7 < 2,
+                       left=tick % 111 < 37, right=tick % 212 > 159)
+        for player in game.players.values():
+            if player is not game.main_player:
+                player.apply_remote_tilt(random.choice([15, -15, 0]))
+        if not game.tick():
+            game.reset_game()
+        times.append(1000 * (time.perf_counter() - start))
+    times.sort()
+    return sum(times) / TICKS, times[int(TICKS * 0.99)], times[-1]
+
+if __name__ == "__main__":
+    print(f"{'players':>8} {'asteroids':>10} {'mean ms':>8} {'p99 ms':>7} {'worst ms':>9} {'budget':>7}")
+    for player_count, asteroid_count in [(20, 6), (100, 6), (200, 6), (200, 24), (300, 24), (500, 24)]:
+        mean, p99, worst = run(player_count, asteroid_count)
+        verdict = "ok" if p99 < BUDGET else "over"
+        print(f"{player_count:>8} {asteroid_count:>10} {mean:>8.2f} {p99:>7.2f} {worst:>9.2f} {verdict:>7}")
@@ -0,0 +1,55 @@
+"""
+Benchmark for Asteroids_Game.draw with full redraws and with dirty rectangle rendering.
+Plays the same scripted game in both modes and prints the pixels pushed to the display per frame.
+Run from anywhere with: python benchmarks/bench_rendering.py
+"""
+
+import os
+import sys
+import time
+import random
+
+# Run without a window or sound card, and from the game folder so assets resolve.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+import pygame
+pygame.init()
+
+from main import Asteroids_Game
+
+FRAMES = 1000
+
+def run(dirty_rendering, player_count):
+    random.seed(0)
+    game = Asteroids_Game(seed=0)
+    game.dirty_rendering = dirty_rendering
+    for i in range(1, player_count):
+        game.add_player(f"device_{i}")
+
+    pushed, elapsed, shaking = 0, 0.0, 0
+    for frame in range(FRAMES):
+        if not len(game.asteroids.asteroids):
+            game.asteroids.next_round()
+        for player in game.players.values():
+            player.update()
+            player.safe, player.timer = True, 10**9  # Keep ships alive so the load stays constant.
+        game.main_player.move(frame % 90 < 45)
+        game.shake = game.asteroids.move(game.players, game.bullets.bullets, game.game_over, game.shake)
+        game.bullets.bullet_handler(game.main_player, frame % 7 < 2)
+        shaking += game.shake_timer > 0 or game.shake
+        start = time.perf_counter()
+        game.draw()
+        elapsed += time.perf_counter() - start
+        pushed += game.pixels_pushed
+    return pushed / FRAMES, 1000 * elapsed / FRAMES, shaking / FRAMES
+
+if __name__ == "__main__":
+    print(f"{'players':>8} {'mode':>6} {'pixels/frame':>13} {'% of screen':>12} {'ms/frame':>9} {'shaking':>8}")
+    for player_count in [1, 5, 20]:
+        for dirty_rendering in [False, True]:
+            pixels, ms, shaking = run(dirty_rendering, player_count)
+            print(f"{player_count:>8} {'dirty' if dirty_rendering else 'full':>6} {pixels:>13.0f} "
+                  f"{100 * pixels / (650 * 650):>11.1f}% {ms:>9.3f} {100 * shaking:>7.1f}%")
@@ -0,0 +1,80 @@
+"""
+Replay speed of a recorded full round.
+Records a 90 second round with 50 players, every remote player steered each tick by scripted
+controllers through check_for_new_players, then replays the log headless a few times. Reports
+the log size, how many times faster than real time the replays run, and whether every replay
+ended on the same scores as the recorded round.
+Run from anywhere with: python benchmarks/bench_replay.py
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from main import Asteroids_Game
+from assets.input_buffer import Command
+from assets.replay import Recorder, Replay
+
+PLAYERS = 50
+REPLAYS = 3
+
+# Stands in for an InputServer: every remote controller holds a random tilt and thrust
+# for a while, as players do, and now and then goes silent for two seconds, so it times out,
+# leaves and joins again.
+class ScriptedControllers:
+    def __init__(self, count):
+        self.rng = random.Random(0)
+        self.held = {f"device_{i}": Command(0, False, False, False) for i in range(1, count)}
+        self.silent = {}  # device_id -> ticks the controller stays silent for.
+
+    def commands(self):
+        for device_id in self.held:
+            if self.rng.random() < 0.05:
+                self.held[device_id] = Command(self.rng.choice([0, 0, 7.5, 15, -15, -30]),
+                                               self.rng.random() < 0.5, False, False)
+            if device_id not in self.silent and self.rng.random() < 0.0005:
+                self.silent[device_id] = 120
+        for device_id in list(self.silent):
+            self.silent[device_id] -= 1
+            if not self.silent[device_id]:
+                del self.silent[device_id]
+        return {device_id: command for device_id, command in self.held.items() if device_id not in self.silent}
+
+    def forget(self, device_id):
+        pass
+
+    def latency(self, device_id):
+        return 0
+
+def record(path):
+    game = Asteroids_Game(headless=True, input_server=ScriptedControllers(PLAYERS), seed=0, recorder=Recorder(path))
+    tick = 0
+    start = time.perf_counter()
+    while game.tick():
+        game.set_input(thrust=tick % 180 < 90, fire=tick % 7 < 2, left=tick % 111 < 37, right=tick % 212 > 159)
+        tick += 1
+    elapsed = time.perf_counter() - start
+    game.recorder.close()
+    return game.leaderboard.ranking(), tick, elapsed
+
+def replay(path):
+    log = Replay(path)
+    game = Asteroids_Game(headless=True, seed=log.seed)
+    start = time.perf_counter()
+    steps = log.play(game)
+    return game.leaderboard.ranking(), steps, time.perf_counter() - start
+
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(), "round.rep")
+    scores, ticks, elapsed = record(path)
+    print(f"recorded {ticks} ticks with {PLAYERS} players in {elapsed:.2f} s, log {os.path.getsize(path)} bytes")
+    print(f"{'replay':>7} {'ticks':>6} {'seconds':>8} {'x real time':>12} {'same scores':>12}")
+    for i in range(REPLAYS):
+        replayed, steps, elapsed = replay(path)
+        print(f"{i + 1:>7} {steps:>6} {elapsed:>8.2f} {steps / 60 / elapsed:>12.0f} {str(replayed == scores):>12}")
+    os.remove(path)
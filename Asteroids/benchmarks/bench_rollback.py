@@ -0,0 +1,76 @@
+"""
+Cost of rollback with a growing number of players.
+Runs the headless engine, saving every tick with Rollback, and every 10 ticks restores the state
+of 8 ticks ago and simulates those 8 ticks again, as a late remote input would make it. Reports
+the time to save a tick, to restore one, and to restore and re-simulate 8 ticks against the
+16.6 ms a frame may take, next to deep-copying the players, asteroids and bullets once.
+Run from anywhere with: python benchmarks/bench_rollback.py
+"""
+
+import os
+import sys
+import time
+import random
+from copy import deepcopy
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from main import Asteroids_Game
+from assets.rollback import Rollback
+from assets.sprites import Player
+
+TICKS = 600
+ROLLBACK = 8  # Ticks re-simulated after each late input.
+BUDGET = 1000 / 60  # Milliseconds per frame at 60 frames per second.
+
+def play(game, tick):
+    game.set_input(thrust=tick % 180 < 90, fire=tick % 7 < 2, left=tick % 111 < 37, right=tick % 212 > 159)
+    for i, player in enumerate(game.players.values()):
+        player.steer(Player.tilt_rate([15, -15, 0][(tick // 20 + i) % 3]), (tick + i) % 50 < 30)
+    if not game.tick():
+        game.reset_game()
+
+def run(player_count):
+    random.seed(0)
+    game = Asteroids_Game(headless=True, seed=0)
+    for i in range(1, player_count):
+        player = game.add_player(f"device_{i}")
+        player.center = [random.uniform(0, game.WIDTH), random.uniform(0, game.HEIGHT)]
+        player.pose()
+    rollback = Rollback(game)
+    rollback.save()
+
+    saves, restores, rollbacks = [], [], []
+    tick = 0
+    while tick < TICKS:
+        play(game, tick)
+        tick += 1
+        start = time.perf_counter()
+        rollback.save()
+        saves.append(time.perf_counter() - start)
+        if tick % 10 == 0:
+            start = time.perf_counter()
+            rollback.restore(game.tick_count - ROLLBACK)
+            restores.append(time.perf_counter() - start)
+            tick -= ROLLBACK
+            for i in range(ROLLBACK):
+                play(game, tick)
+                tick += 1
+                rollback.save()
+            rollbacks.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    deepcopy((game.players, game.asteroids.asteroids, game.bullets.bullets))
+    copied = time.perf_counter() - start
+    return (1e6 * sum(saves) / len(saves), 1000 * sum(restores) / len(restores),
+            1000 * sum(rollbacks) / len(rollbacks), 1000 * max(rollbacks), 1000 * copied)
+
+if __name__ == "__main__":
+    print(f"{'players':>8} {'save us':>8} {'restore ms':>11} {'rollback ms':>12} {'worst ms':>9} {'budget':>7} "
+          f"{'deepcopy ms':>12}")
+    for player_count in [20, 50, 100, 256]:
+        save, restore, rollback, worst, copied = run(player_count)
+        verdict = "ok" if worst < BUDGET else "over"
+        print(f"{player_count:>8} {save:>8.0f} {restore:>11.2f} {rollback:>12.2f} {worst:>9.2f} {verdict:>7} "
+              f"{copied:>12.2f}")
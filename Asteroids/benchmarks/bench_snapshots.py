@@ -0,0 +1,50 @@
+"""
+Size of world snapshot frames as the game grows.
+Runs the headless engine with more and more asteroids and players and reports the average size
+of full frames and of delta frames sent against the previous tick, as a subscriber that acks
+every frame would receive them.
+Run from anywhere with: python benchmarks/bench_snapshots.py
+"""
+
+import os
+import sys
+import random
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from main import Asteroids_Game
+from assets.snapshots import SnapshotEncoder
+
+TICKS = 300
+
+def measure(asteroids, players):
+    random.seed(0)
+    game = Asteroids_Game(headless=True, seed=0)
+    for i in range(1, players):
+        game.add_player(f"device_{i}")
+    game.asteroids.asteroids = []
+    game.asteroids.asteroid_no = asteroids
+    game.asteroids.next_round()
+    encoder = SnapshotEncoder()
+    full = delta = 0
+    previous = None
+    for tick in range(TICKS):
+        game.set_input(thrust=tick % 60 < 40, fire=tick % 8 == 0, left=tick % 90 < 20)
+        # Every remote ship turns every tick, the worst case for the ship records.
+        for device_id, player in game.players.items():
+            if device_id != "local":
+                player.apply_remote_tilt(random.uniform(-15, 15))
+        game.tick()
+        snapshot = encoder.capture(game)
+        full += len(encoder.encode(snapshot))
+        if previous is not None:
+            delta += len(encoder.encode(snapshot, previous))
+        previous = snapshot
+    return full / TICKS, delta / (TICKS - 1)
+
+if __name__ == "__main__":
+    print(f"{'asteroids':>10} {'players':>8} {'full bytes':>11} {'delta bytes':>12}")
+    for asteroids, players in [(4, 1), (16, 1), (64, 1), (256, 1), (16, 8), (16, 32), (64, 32)]:
+        full, delta = measure(asteroids, players)
+        print(f"{asteroids:>10} {players:>8} {full:>11.0f} {delta:>12.0f}")
@@ -1,53 +1,97 @@
 import pygame
 import sys
-import random
 from pygame.locals import *
 
 # Import game asset modules for shapes, sprites, and scenes.
 from assets.shapes import *
 from assets.sprites import *
 from assets.scenes import *
-
-pygame.font.init()  # Initialize the font module for text rendering.
+from assets.render_cache import merge_rects, TEXT_CACHE
+from assets.leaderboard import Leaderboard
+from assets.rng import RandomStreams
+from assets.resources import LazyFont, set_headless
 
 # Define colors.
 BLACK = (0, 0, 0)
 # Create a small font for the scoreboard using a custom font file.
-SMALL_FONT = pygame.font.Font("assets/fonts/rexlia rg.otf", 16)
+SMALL_FONT = LazyFont("assets/fonts/rexlia rg.otf", 16)
 
 # Main game class for the Asteroids game.
 class Asteroids_Game:
-    def __init__(self):
+    def __init__(self, headless=False, input_server=None, snapshot_server=None, seed=None, recorder=None):
+        """
+        :param headless: Run the simulation only, with no window, sound or fonts.
+                         Inputs are then given through set_input() and the game advances with tick().
+        :param input_server: Optional running InputServer that remote controllers send to.
+                             Without one, remote players are simulated.
+        :param snapshot_server: Optional SnapshotServer that sends the world state to subscribers after every tick.
+        :param seed: Seed of the match's random streams. The same seed and inputs play out the same match;
+                     without one a random seed is picked (see rng.seed).
+        :param recorder: Optional Recorder that logs every input of the game, to play it out again with a Replay.
+        """
         # Set game screen dimensions.
         self.WIDTH, self.HEIGHT = 650, 650
-        # Initialize the game window.
-        self.WIN = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-        pygame.display.set_caption("Asteroids")  # Set window title.
-        pygame.mouse.set_visible(False)  # Hide the mouse cursor.
-        # Set the window icon.
-        pygame.display.set_icon(pygame.image.load("assets/images/icon.png"))
+        self.rng = RandomStreams(seed)  # Every random decision of the match comes from these streams.
+        self.headless = headless
+        if headless:
+            set_headless()
+        else:
+            # Initialize the game window.
+            self.WIN = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
+            pygame.display.set_caption("Asteroids")  # Set window title.
+            pygame.mouse.set_visible(False)  # Hide the mouse cursor.
+            # Set the window icon.
+            pygame.display.set_icon(pygame.image.load("assets/images/icon.png"))
 
-        self.clock = pygame.time.Clock()  # Clock to manage FPS.
-        self.FPS = 60  # Target frames per second.
+            # Create a separate canvas surface for drawing game elements.
+            self.canvas = pygame.Surface((self.WIDTH, self.HEIGHT))
 
-        # Create a separate canvas surface for drawing game elements.
-        self.canvas = pygame.Surface((self.WIDTH, self.HEIGHT))
+        self.input_server = input_server
+        self.snapshot_server = snapshot_server
+        self.clock = pygame.time.Clock()  # Clock to manage FPS.
+        self.FPS = 60  # Target frames per second drawn.
+        # The simulation advances in fixed ticks, independently of how often frames are drawn.
+        self.SIM_RATE = 60  # Simulation ticks per second.
+        self.BASE_RATE = 60  # Tick rate the per-tick speeds and timers were tuned for.
+        self.MAX_FRAME_TIME = 0.25  # Longest gap simulated after a stall, in seconds.
+        self.accumulator = 0.0  # Simulated time still owed to the wall clock, in seconds.
+        self.tick_count = 0  # Ticks simulated so far, which number the broadcast snapshots.
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.start(self)
 
         # Dictionary to hold player objects (key: device_id, value: Player object).
         self.players = {}
+        self.leaderboard = Leaderboard()  # Players in score order, updated when scores change.
+        self.MAX_PLAYERS = 256  # Remote controllers beyond this many are not given a ship.
+        # Bullets each ship may have in flight; one shot per press lasts at most about 60 ticks.
+        self.BULLETS_PER_PLAYER = 16
+        self.SIMULATED_PLAYERS = 20  # How many players simulate_remote_players() fills the game up to.
+        self.triggers = {}  # device_id -> remote fire button state given since the last tick.
+        # Remote players see the world late by their controller's latency; their shots are judged
+        # against the asteroids as they saw them, going back at most MAX_REWIND ticks
+        # and never further than the asteroid history holds.
+        self.view_delays = {}  # device_id -> ticks.
+        self.MAX_REWIND = 12
         self.main_player = None  # Reference to the local player.
+        self.ships = ShipKinematics(self.WIDTH, self.HEIGHT)  # Holds and moves every ship at once.
         self.add_player("local")  # Add the local player to the game.
         
         # Initialize game objects.
-        self.bullets = Bullets(self.WIDTH, self.HEIGHT)
-        self.asteroids = Asteroids(self.WIDTH, self.HEIGHT).next_round()
-        self.menu = Menu()
-        self.game_over = Game_over(self.canvas)
-        self.pause = Pause(self.canvas)
+        self.bullets = Bullets(self.WIDTH, self.HEIGHT, self.MAX_PLAYERS * self.BULLETS_PER_PLAYER)
+        self.asteroids = Asteroids(self.WIDTH, self.HEIGHT, self.rng).next_round()
+        # Scenes are only needed when there is a window to show them in.
+        self.menu = self.game_over = self.pause = None
+        if not headless:
+            self.menu = Menu()
+            self.game_over = Game_over(self.canvas)
+            self.pause = Pause(self.canvas)
 
         # Flags for player's actions.
         self.fire = False
         self.move = False
+        self.left = False
+        self.right = False
 
         # Game time limit (90 seconds) and game state flag.
         self.time_left = 90.0
@@ -57,14 +101,23 @@ class Asteroids_Game:
         self.shake = False
         self.shake_timer = 0
 
+        # Dirty rectangle rendering: only the regions drawn this frame or the last are pushed.
+        self.dirty_rendering = True
+        self.full_redraw = True  # Set whenever the window holds something other than the canvas.
+        self.drawn_rects = []  # Rects drawn on the canvas in the previous frame.
+        self.pixels_pushed = 0  # Pixels sent to the display in the last frame.
+
     def add_player(self, device_id):
         """
         Create and add a new Player object to the game.
         :param device_id: Identifier for the new player.
         :return: The newly created Player object.
         """
-        new_player = Player(self.WIDTH, self.HEIGHT, device_id)
+        new_player = Player(self.WIDTH, self.HEIGHT, device_id, self.ships)
         self.players[device_id] = new_player
+        self.leaderboard.add(device_id, new_player.score)
+        if self.recorder is not None:
+            self.recorder.join(device_id)
         # Set the first added player as the main (local) player.
         if self.main_player is None:
             self.main_player = new_player
@@ -77,69 +130,254 @@ class Asteroids_Game:
         """
         if device_id in self.players:
             del self.players[device_id]
+            self.ships.release(device_id)
+            self.leaderboard.remove(device_id)
+            self.triggers.pop(device_id, None)
+            self.view_delays.pop(device_id, None)
+            if self.recorder is not None:
+                self.recorder.leave(device_id)
 
-    def reset_game(self):
+    def reset_game(self, seed=None):
         """
         Reset the game state including players, bullets, asteroids, and game timer.
+        :param seed: Seed of the new match; by default it follows from the previous match's seed.
         """
+        self.rng = RandomStreams(seed) if seed is not None else self.rng.next_match()
+        if self.recorder is not None:
+            self.recorder.reset(self.rng.seed)
         # Reinitialize all players while preserving their device IDs.
         for device_id in self.players:
-            self.players[device_id] = Player(self.WIDTH, self.HEIGHT, device_id)
+            self.players[device_id] = Player(self.WIDTH, self.HEIGHT, device_id, self.ships)
         self.main_player = self.players.get("local")
+        self.leaderboard.sync(self.players)
         
         # Reset bullets and asteroid objects.
-        self.bullets = Bullets(self.WIDTH, self.HEIGHT)
-        self.asteroids = Asteroids(self.WIDTH, self.HEIGHT).next_round()
+        self.bullets = Bullets(self.WIDTH, self.HEIGHT, self.MAX_PLAYERS * self.BULLETS_PER_PLAYER)
+        self.asteroids = Asteroids(self.WIDTH, self.HEIGHT, self.rng).next_round()
         self.fire = False
+        self.triggers = {}
         self.time_left = 90.0
         self.game_ended = False
+        self.full_redraw = True
+
+    def set_input(self, thrust=None, fire=None, left=None, right=None):
+        """
+        Set the local player's controls for the following ticks.
+        Arguments left as None keep their current value.
+        :param thrust: Boolean indicating if the ship accelerates.
+        :param fire: Boolean indicating if the fire button is held.
+        :param left: Boolean indicating if the ship turns left.
+        :param right: Boolean indicating if the ship turns right.
+        """
+        if thrust is not None:
+            self.move = thrust
+        if fire is not None:
+            self.fire = fire
+        if left is not None:
+            self.left = left
+        if right is not None:
+            self.right = right
+
+    def update_timer(self):
+        """
+        Count the game clock down by one frame and pick the winner when it runs out.
+        """
+        if self.recorder is not None:
+            self.recorder.timer()
+        # If the game is not over, update the game timer.
+        if not self.game_ended:
+            self.time_left -= 1 / self.SIM_RATE
+            if self.time_left <= 0:
+                self.game_ended = True
+                # When time expires, compute the winner based on highest score.
+                winner_id, winner_score = self.leaderboard.top(1)[0]
+                self.winner_text = f"Winner: {winner_id}  Score: {winner_score}"
+
+    def step(self):
+        """
+        Advance the simulation by one tick: rounds, players, asteroids, collisions, scoring and bullets.
+        Nothing is drawn and no devices are read, so it also runs headless.
+        """
+        if self.recorder is not None:
+            self.recorder.step(self)
+        dt = self.BASE_RATE / self.SIM_RATE  # Tick length in the 60 Hz frames the speeds are given in.
+        # When there are no asteroids left, prepare the next round.
+        if not len(self.asteroids.asteroids):
+            self.asteroids.asteroid_no += 1
+            # Limit the maximum number of asteroids to 6.
+            if self.asteroids.asteroid_no > 6: 
+                self.asteroids.asteroid_no = 6
+            self.asteroids.next_round()
+
+        # Update every ship's state at once (last displacement, safe timer), then run the death animations.
+        self.ships.update(dt)
+        dead = self.ships.dying()
+        for device_id, player in self.players.items():
+            # If a player is dead, process the death animation and possible respawn.
+            if device_id in dead:
+                health, end = player.death(dt, self.rng.stream("debris"))
+                if end:
+                    # Create a new player with the same score and bonus thresholds.
+                    new_player = Player(self.WIDTH, self.HEIGHT, device_id, self.ships)
+                    new_player.score = player.score
+                    new_player.bonus_threshold_count = player.bonus_threshold_count
+                    new_player.safe = True  # Make the new player temporarily safe.
+                    new_player.timer = 300  # Set invulnerability timer.
+                    self.players[device_id] = new_player
+                    # Update the main player reference if necessary.
+                    if device_id == "local":
+                        self.main_player = new_player
+
+        # Move every living ship by its controls: the keyboard for the local player,
+        # the commands given in check_for_new_players() for remote ones.
+        self.main_player.steer(Player.ROTATION*(self.right - self.left), self.move)
+        self.ships.step(dt)
+
+        # Move asteroids and detect collisions with players and bullets.
+        # This function also returns whether a screen shake should occur.
+        self.shake = self.asteroids.move(self.players, self.bullets.bullets, self.game_over, self.shake, dt,
+                                         self.tick_count + 1, self.view_delays)
+        # Move the players whose score changed on the leaderboard.
+        for device_id in self.asteroids.scored:
+            self.leaderboard.update(device_id, self.players[device_id].score)
+        # Handle bullet behavior (firing, collision) for the main player, then fire for remote players.
+        self.bullets.bullet_handler(self.main_player, self.fire, dt)
+        self.bullets.remote_fire(self.players, self.triggers)
+        self.triggers = {}
+
+        self.tick_count += 1
+        # Send the new state to every remote display.
+        if self.snapshot_server is not None:
+            self.snapshot_server.broadcast(self)
 
-    def draw(self):
+    def tick(self):
+        """
+        Run one full simulation tick without drawing or waiting, as used by headless mode.
+        Remote controllers are read first when an input server is attached.
+        :return: False once the game clock has run out.
+        """
+        if self.input_server is not None:
+            self.check_for_new_players()
+        self.update_timer()
+        if self.game_ended:
+            return False
+        self.step()
+        return True
+
+    def draw_objects(self, alpha=1.0):
+        """
+        Draw every game element onto the canvas.
+        :param alpha: How far between the previous and the latest tick to draw, from 0 to 1.
+        :return: List of rects that were drawn to.
+        """
+        drawn = []
+        # Draw each player's sprite onto the canvas.
+        for device_id, player in self.players.items():
+            drawn += player.draw(self.canvas, alpha)
+        
+        # Display the top 3 players of the leaderboard on the scoreboard.
+        for idx, (device_id, score) in enumerate(self.leaderboard.top(3)):
+            text = TEXT_CACHE.render(SMALL_FONT, f"{device_id}: {score}", (255, 255, 255))
+            drawn.append(self.canvas.blit(text, (10, 10 + idx * (SMALL_FONT.get_height() + 2))))
+        
+        # Display remaining game time.
+        time_text = TEXT_CACHE.render(SMALL_FONT, f"Time Left: {int(self.time_left)}", (255, 255, 255))
+        drawn.append(self.canvas.blit(time_text, (self.WIDTH - time_text.get_width() - 10, 10)))
+        
+        # Draw bullets and asteroids onto the canvas.
+        drawn += self.bullets.draw(self.canvas, alpha)
+        drawn += self.asteroids.draw(self.canvas, alpha)
+        return drawn
+
+    def draw(self, alpha=1.0):
         """
         Draw all game elements to the canvas and update the display.
         Includes handling for a screen shake effect.
+        Moving objects are drawn alpha of the way from the previous tick's state to the latest one.
+        With dirty rendering on, only last frame's and this frame's rects are erased and pushed;
+        the whole screen is redrawn while shaking or after another scene used the window.
         """
         # Determine if screen shaking is needed and set a timer for the shake duration.
         if self.shake and self.shake_timer == 0:
             self.shake_timer = 15  # Duration for the shake effect.
+        shaking = self.shake_timer > 0
         # Calculate a random offset for the screen shake if active.
-        roll = [random.randint(-2, 2), random.randint(-2, 2)] if self.shake_timer > 0 else [0, 0]
+        shake = self.rng.stream("shake")
+        roll = [shake.randint(-2, 2), shake.randint(-2, 2)] if self.shake_timer > 0 else [0, 0]
         self.shake_timer = max(0, self.shake_timer - 1)
         self.shake = False  # Reset shake flag after applying effect.
 
-        self.canvas.fill(BLACK)  # Clear the canvas with a black background.
-        
-        # Draw each player's sprite onto the canvas.
-        for device_id, player in self.players.items():
-            player.draw(self.canvas)
-        
-        # Sort players by score and display the top 3 on the scoreboard.
-        top_players = sorted(self.players.items(), key=lambda item: item[1].score, reverse=True)[:3]
-        for idx, (device_id, player) in enumerate(top_players):
-            text = SMALL_FONT.render(f"{device_id}: {player.score}", True, (255, 255, 255))
-            self.canvas.blit(text, (10, 10 + idx * (SMALL_FONT.get_height() + 2)))
-        
-        # Display remaining game time.
-        time_text = SMALL_FONT.render(f"Time Left: {int(self.time_left)}", True, (255, 255, 255))
-        self.canvas.blit(time_text, (self.WIDTH - time_text.get_width() - 10, 10))
-        
-        # Draw bullets and asteroids onto the canvas.
-        self.bullets.draw(self.canvas)
-        self.asteroids.draw(self.canvas)
+        if shaking or self.full_redraw or not self.dirty_rendering:
+            self.canvas.fill(BLACK)  # Clear the canvas with a black background.
+            self.drawn_rects = self.draw_objects(alpha)
+            # Blit the canvas to the game window with any shake offset.
+            self.WIN.blit(self.canvas, (roll[0], roll[1]))
+            pygame.display.update()  # Refresh the display.
+            self.pixels_pushed = self.WIDTH * self.HEIGHT
+            # The window is left offset after a shake, so the frame after it is redrawn in full too.
+            self.full_redraw = shaking
+            return
 
-        # Blit the canvas to the game window with any shake offset.
-        self.WIN.blit(self.canvas, (roll[0], roll[1]))
-        pygame.display.update()  # Refresh the display.
+        # Erase what was drawn last frame, then draw the new frame over it.
+        for rect in self.drawn_rects:
+            self.canvas.fill(BLACK, rect)
+        drawn = self.draw_objects(alpha)
+        dirty = merge_rects(self.drawn_rects + drawn)
+        for rect in dirty:
+            self.WIN.blit(self.canvas, rect, rect)
+        pygame.display.update(dirty)  # Refresh only the changed regions.
+        self.pixels_pushed = sum(rect.width * rect.height for rect in dirty)
+        self.drawn_rects = drawn
 
     def check_for_new_players(self):
+        """
+        Add a player for every remote controller and apply each controller's command for this tick.
+        Players whose controller has timed out are removed.
+        Without an input server, remote players are simulated instead.
+        """
+        if self.input_server is None:
+            self.simulate_remote_players()
+            return
+        commands = self.input_server.commands()
+        # Controllers silent for longer than the server's timeout give their ship up.
+        for device_id in [device_id for device_id in self.players if device_id not in commands]:
+            if device_id != "local":
+                self.remove_player(device_id)
+                self.input_server.forget(device_id)
+                print(f"Remote player left: {device_id}")
+        for device_id, command in commands.items():
+            if device_id == "local":
+                continue  # The keyboard player cannot be taken over from the network.
+            # Add the new player if they don't already exist and there is room.
+            if device_id not in self.players:
+                if len(self.players) >= self.MAX_PLAYERS:
+                    continue
+                self.add_player(device_id)
+                print(f"New remote player joined: {device_id}")
+            # Turn the ship by the controller's tilt averaged over the tick, and thrust while the button is held.
+            if self.recorder is not None:
+                self.recorder.steer(device_id, command.tilt, command.thrust, command.fire)
+            self.players[device_id].steer(Player.tilt_rate(command.tilt), command.thrust)
+            self.triggers[device_id] = command.fire
+            if command.fire:
+                # The player pressed fire looking at the world as it was this many ticks ago.
+                delay = min(round(self.input_server.latency(device_id) * self.SIM_RATE), self.MAX_REWIND,
+                            self.asteroids.history.ticks - 1)
+                if delay != self.view_delays.get(device_id, 0):
+                    self.view_delays[device_id] = delay
+                    if self.recorder is not None:
+                        self.recorder.view_delay(device_id, delay)
+
+    def simulate_remote_players(self):
         """
         Simulate receiving new players via a network JSON message.
         For testing purposes, this dummy logic randomly adds a new player.
         """
-        # Only allow up to 20 players; use a random chance to simulate incoming JSON data.
-        if len(self.players) < 20 and random.random() < 0.01: 
+        # Only allow up to SIMULATED_PLAYERS players; use a random chance to simulate incoming JSON data.
+        joins = self.rng.stream("joins")
+        if len(self.players) < self.SIMULATED_PLAYERS and joins.random() < 0.01: 
             # Example of simulated JSON data: {"device_id": "device_X", "angle": some_value}
-            simulated_json = {"device_id": f"device_{len(self.players)}", "angle": random.choice([15, -15, 0])}
+            simulated_json = {"device_id": f"device_{len(self.players)}", "angle": joins.choice([15, -15, 0])}
             device_id = simulated_json["device_id"]
             angle_value = simulated_json["angle"]
             # Add the new player if they don't already exist.
@@ -147,6 +385,8 @@ class Asteroids_Game:
                 self.add_player(device_id)
                 print(f"New remote player joined: {device_id}")
             # Update the player's tilt based on the received angle value.
+            if self.recorder is not None:
+                self.recorder.tilt(device_id, angle_value)
             self.players[device_id].apply_remote_tilt(angle_value)
 
     def main(self):        
@@ -154,39 +394,35 @@ class Asteroids_Game:
         Main game loop that handles game logic, event processing, and drawing.
         """
         run = True
+        frame_time = 0.0
         while run:
-            # Check for incoming players and update their state.
-            self.check_for_new_players()
+            # Bank the time the last frame took and work out how many fixed ticks are due.
+            timestep = 1 / self.SIM_RATE
+            self.accumulator += frame_time
+            ticks = 0
+            while self.accumulator >= timestep:
+                self.accumulator -= timestep
+                ticks += 1
 
-            # If the game is not over, update the game timer.
-            if not self.game_ended:
-                self.time_left -= 1 / self.FPS
-                if self.time_left <= 0:
-                    self.game_ended = True
-                    # When time expires, compute the winner based on highest score.
-                    winner_id, winner_player = max(self.players.items(), key=lambda item: item[1].score)
-                    self.winner_text = f"Winner: {winner_id}  Score: {winner_player.score}"
+            if self.game_ended or self.menu.menu:
+                # Outside of play the game clock and joining players still advance tick by tick.
+                for tick in range(ticks):
+                    # Check for incoming players and update their state.
+                    self.check_for_new_players()
+                    self.update_timer()
 
             # If the game is over, display the game-over screen and handle reset.
             if self.game_ended:
                 reset = self.game_over.loop(self.WIN, self.winner_text, self.menu)
                 if reset:
                     self.reset_game()
-                self.clock.tick(self.FPS)
-                continue
+                self.full_redraw = True
 
             # If the menu is active, run the menu loop.
-            if self.menu.menu:
+            elif self.menu.menu:
                 self.menu.loop(self.WIN)
+                self.full_redraw = True
             else:
-                # When there are no asteroids left, prepare the next round.
-                if not len(self.asteroids.asteroids):
-                    self.asteroids.asteroid_no += 1
-                    # Limit the maximum number of asteroids to 6.
-                    if self.asteroids.asteroid_no > 6: 
-                        self.asteroids.asteroid_no = 6
-                    self.asteroids.next_round()
-
                 # Event handling.
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
@@ -203,44 +439,85 @@ class Asteroids_Game:
                             reset = self.pause.loop(self.WIN, self.canvas, self.menu, self.clock, self.FPS)
                             if reset:
                                 self.reset_game()
+                            self.full_redraw = True
                     if event.type == KEYUP:
                         if event.key == K_SPACE:
                             self.fire = False  # Stop firing when space is released.
                         if event.key == K_UP:
                             self.move = False  # Stop moving when up arrow is released.
 
-                # Update each player's state (movement, safe timer, death animation).
-                for device_id, player in self.players.items():
-                    player.update()
-                    # If a player is dead, process the death animation and possible respawn.
-                    if player.dead:
-                        health, end = player.death()
-                        if end:
-                            # Create a new player with the same score and bonus thresholds.
-                            new_player = Player(self.WIDTH, self.HEIGHT, device_id)
-                            new_player.score = player.score
-                            new_player.bonus_threshold_count = player.bonus_threshold_count
-                            new_player.safe = True  # Make the new player temporarily safe.
-                            new_player.timer = 300  # Set invulnerability timer.
-                            self.players[device_id] = new_player
-                            # Update the main player reference if necessary.
-                            if device_id == "local":
-                                self.main_player = new_player
-
-                # Handle movement for the main (local) player if they are not dead.
-                if not self.main_player.dead:
-                    self.main_player.move(self.move)
-
-                # Move asteroids and detect collisions with players and bullets.
-                # This function also returns whether a screen shake should occur.
-                self.shake = self.asteroids.move(self.players, self.bullets.bullets, self.game_over, self.shake)
-                # Handle bullet behavior (firing, collision) for the main player.
-                self.bullets.bullet_handler(self.main_player, self.fire)
-                # Render all game objects on the screen.
-                self.draw()
-
-            self.clock.tick(self.FPS)  # Maintain the game loop at the target FPS.
+                # Turning follows the arrow keys that are held down.
+                keys = pygame.key.get_pressed()
+                self.left, self.right = keys[K_LEFT], keys[K_RIGHT]
+                for tick in range(ticks):
+                    # Check for incoming players and update their state.
+                    self.check_for_new_players()
+                    self.update_timer()
+                    if self.game_ended:
+                        break
+                    self.step()
+                # Render all game objects on the screen, between the last two ticks.
+                self.draw(self.accumulator / timestep)
+
+            # Wait to hold the target frame rate and measure how long the frame really took.
+            frame_time = min(self.clock.tick(self.FPS) / 1000, self.MAX_FRAME_TIME)
 
 # Entry point: start the game when the script is run.
 if __name__ == '__main__':
-    Asteroids_Game().main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Asteroids multiplayer")
+    parser.add_argument("--listen", type=int, metavar="PORT",
+                        help="UDP port to receive remote controller packets on")
+    parser.add_argument("--playout-delay", type=float, default=50, metavar="MS",
+                        help="how long remote controller packets are buffered to smooth out jitter")
+    parser.add_argument("--broadcast", type=int, metavar="PORT",
+                        help="UDP port remote displays subscribe to for world snapshots")
+    parser.add_argument("--view-radius", type=int, default=200, metavar="PX",
+                        help="how far around their ship displays following a player are sent entities")
+    parser.add_argument("--max-rewind", type=float, default=200, metavar="MS",
+                        help="longest a remote player's shot is rewound to judge it against what they saw, "
+                             "at most the 516 ms (31 ticks) of asteroid positions that are kept")
+    parser.add_argument("--seed", type=int,
+                        help="seed of the first match, to play it out the same way again")
+    parser.add_argument("--record", metavar="PATH",
+                        help="log every input of the session to PATH, to replay it later")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="play out a recorded session as fast as possible instead of playing")
+    parser.add_argument("--render-every", type=int, default=0, metavar="N",
+                        help="while replaying, draw every Nth tick (by default nothing is drawn)")
+    args = parser.parse_args()
+    if not 0 <= args.max_rewind <= 516:
+        parser.error("--max-rewind must be from 0 to 516 ms, the asteroid positions that are kept")
+    if args.replay is not None:
+        import time
+        from assets.replay import Replay
+        replay = Replay(args.replay)
+        game = Asteroids_Game(headless=not args.render_every, seed=replay.seed)
+        start = time.perf_counter()
+        steps = replay.play(game, args.render_every)
+        elapsed = time.perf_counter() - start
+        print(f"Replayed {steps} ticks in {elapsed:.2f} s, {steps / replay.sim_rate / elapsed:.0f}x real time")
+        print(f"Top scores: {game.leaderboard.top(3)}")
+        sys.exit()
+    server = None
+    if args.listen is not None:
+        from assets.network import InputServer
+        server = InputServer(port=args.listen, playout_delay=args.playout_delay / 1000).start()
+    snapshot_server = None
+    if args.broadcast is not None:
+        from assets.snapshots import SnapshotServer
+        snapshot_server = SnapshotServer(port=args.broadcast)
+    recorder = None
+    if args.record is not None:
+        from assets.replay import Recorder
+        recorder = Recorder(args.record)
+    game = Asteroids_Game(input_server=server, snapshot_server=snapshot_server, seed=args.seed, recorder=recorder)
+    game.MAX_REWIND = round(args.max_rewind / 1000 * game.SIM_RATE)
+    if snapshot_server is not None:
+        from assets.interest import InterestManager
+        snapshot_server.interest = InterestManager(game.WIDTH, game.HEIGHT, radius=args.view_radius)
+    try:
+        game.main()
+    finally:
+        if recorder is not None:
+            recorder.close()